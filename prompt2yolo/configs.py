@@ -14,6 +14,8 @@ class Paths:
     local_data_path: str = os.environ["LOCAL_DATA_PATH"]
     project: str = os.environ["PROJECT"]
     iteration: int = 1
+    # Store local images and labels under hashed-prefix subfolders (`ab/cd/<id>`)
+    sharded_layout: bool = os.getenv("SHARDED_LAYOUT", "false").lower() == "true"
 
     def __post_init__(self):
         # Convert iteration to a string for consistent path naming
@@ -23,6 +25,20 @@ class Paths:
         self.image_folder = os.path.join(self.local_data_path, "images")
         self.label_folder = os.path.join(self.local_data_path, "labels")
         self.yolo_config_folder = os.path.join(self.local_data_path, "yolo", "configs")
+        self.dedup_index_path = os.path.join(
+            self.local_data_path, "dedup", "phash_index.json"
+        )
+        self.quarantine_folder = os.path.join(
+            self.local_data_path, "quarantine", iteration_folder
+        )
+        self.image_store_folder = os.path.join(self.local_data_path, "yolo", "store")
+        # Local mirrors of `s3_image_folder` / `s3_label_folder`, one per iteration and
+        # mode, so that syncs of different prefixes never delete each other's files
+        s3_mirror_folder = os.path.join(
+            self.local_data_path, "s3_mirror", iteration_folder, self.mode
+        )
+        self.s3_mirror_image_folder = os.path.join(s3_mirror_folder, "images")
+        self.s3_mirror_label_folder = os.path.join(s3_mirror_folder, "labels")
         self.yolo_data_init_folder = os.path.join(
             self.local_data_path, "yolo", "data", "iteration_1"
         )
@@ -81,21 +97,103 @@ class Prompt:
     weight: float = 1.0
 
 
+@dataclass
+class GenerationProfile:
+    """Sampling overrides applied on top of `ImageGeneratorConfig`."""
+
+    # Only applies when a distillation LoRA (e.g. SDXL-Lightning) is fused; its
+    # step count then replaces `steps`
+    requires_distillation: bool = False
+    guidance_scale: Optional[float] = None  # None keeps the configured value
+    timestep_spacing: Optional[str] = None  # None keeps the scheduler default
+
+
+GENERATION_PROFILES = {
+    "default": GenerationProfile(),
+    "fast": GenerationProfile(
+        requires_distillation=True, guidance_scale=0.0, timestep_spacing="trailing"
+    ),
+}
+
+
+@dataclass
+class AccelerationConfig:
+    """Inference speedups applied to generator pipelines; failing options are skipped."""
+
+    compile_unet: bool = False  # torch.compile the UNet (paid for during warm-up)
+    channels_last: bool = False  # channels-last memory format for UNet and VAE
+    attention: Optional[str] = "sdpa"  # 'sdpa', 'xformers', 'default' or None to keep
+    inference_mode: bool = True  # Run sampling under torch.inference_mode()
+    warmup: bool = True  # Generate one image before the timed loop
+
+
+@dataclass
+class DeduplicationConfig:
+    """Perceptual-hash near-duplicate filter run between generation and labeling."""
+
+    enabled: bool = False
+    radius: int = 4  # Max Hamming distance between 64-bit hashes to count as duplicate
+    action: str = "quarantine"  # 'drop' or 'quarantine'
+    batch_size: int = 64  # Images hashed per vectorized batch
+
+
+@dataclass
+class QualityGateConfig:
+    """Cheap image statistics used to reject unusable images before labeling."""
+
+    enabled: bool = False
+    min_laplacian_variance: Optional[float] = 20.0  # Sharpness; None disables
+    min_entropy: Optional[float] = 4.0  # Grayscale histogram entropy in bits
+    min_saturation: Optional[float] = None  # Mean HSV saturation in [0, 1]
+    action: str = "quarantine"  # 'drop' or 'quarantine'
+    batch_size: int = 64  # Images scored per vectorized batch
+    num_workers: int = 8  # Threads decoding images
+
+
 @dataclass
 class ImageGeneratorConfig:
     model_path: str = "stabilityai/stable-diffusion-xl-base-1.0"
-    vae_path: str = "madebyollin/sdxl-vae-fp16-fix"
+    vae_path: Optional[str] = "madebyollin/sdxl-vae-fp16-fix"
     image_size: Tuple[int, int] = (1024, 1024)
     guidance_scale: int = 7
     steps: int = 40
+    profile: str = "default"  # Key of GENERATION_PROFILES
+    # 'none', 'vae_slicing', 'vae_tiling', 'attention_slicing', 'model_cpu_offload',
+    # 'sequential_cpu_offload' or 'auto' (least aggressive mode that fits free memory)
+    memory_mode: str = "none"
     num_images: int = 5
     negative_prompt: str = (
         "anime, cartoon, graphic, text, painting, crayon, graphite, abstract"
     )
     generator: Optional[str] = None
+    # S3 folder under `model_checkpoints/` holding the LoRA; defaults to `generator`
+    lora_checkpoint: Optional[str] = None
+    # CPU backend ('cpu' generator) settings
+    cpu_dtype: str = "float32"
+    cpu_runtime: str = "openvino"  # 'openvino' or 'pytorch'
+    num_threads: Optional[int] = None  # Defaults to all available cores
+    cache_dir: str = os.path.join(os.path.expanduser("~"), ".cache", "prompt2yolo")
+    cache_fused_weights: bool = True  # Reuse LoRA-fused weights across runs
     val_ratio: float = 0.1
     test_ratio: float = 0.1
+    # Update the split folders from a manifest instead of rebuilding them each run
+    incremental_split: bool = False
+    # Keep one content-addressed copy of each image and make splits list files and
+    # symlinks into it
+    virtual_splits: bool = False
     prompts: List[Prompt] = field(default_factory=list)  # List of Prompt objects
+    acceleration: AccelerationConfig = field(default_factory=AccelerationConfig)
+    quality_gate: QualityGateConfig = field(default_factory=QualityGateConfig)
+    deduplication: DeduplicationConfig = field(default_factory=DeduplicationConfig)
+
+    def __post_init__(self):
+        # Nested sections arrive as plain dicts when loaded from YAML
+        if isinstance(self.acceleration, dict):
+            self.acceleration = AccelerationConfig(**self.acceleration)
+        if isinstance(self.quality_gate, dict):
+            self.quality_gate = QualityGateConfig(**self.quality_gate)
+        if isinstance(self.deduplication, dict):
+            self.deduplication = DeduplicationConfig(**self.deduplication)
 
 
 @dataclass
@@ -116,6 +214,23 @@ class YoloLabelerConfig:
     image_size: int = 640
     augment: bool = True
     agnostic_nms: bool = True
+    save_annotated: bool = False  # Also render annotated images (debug output)
+    batch_size: int = 16  # Images per model call
+    prefetch_batches: int = 2  # Decoded batches buffered ahead of the model
+    cache_labels: bool = True  # Reuse labels of unchanged images and settings
+    cache_class_embeddings: bool = True  # Reuse CLIP embeddings of the class list
+    backend: str = "pytorch"  # 'pytorch', or a cached 'onnx' / 'openvino' export
+    num_threads: Optional[int] = None  # CPU intra-op threads; None keeps the default
+    # With `augment`, run a fast pass without TTA and rerun only images without
+    # detections or with one below `conf + cascade_margin` with TTA, merged by NMS
+    cascade: bool = False
+    cascade_margin: float = 0.15
+    cascade_audit_fraction: float = 0.05  # Images also run with TTA to report agreement
+    device: Optional[str] = None  # e.g. 'cpu' or '0'; None lets Ultralytics choose
+    # Worker processes, each with its own model and an equal share of the images
+    num_workers: int = 1
+    devices: Optional[List[str]] = None  # Assigned to workers round-robin
+    cache_dir: str = os.path.join(os.path.expanduser("~"), ".cache", "prompt2yolo")
 
 
 @dataclass
@@ -210,6 +325,30 @@ class YoloModelArchitecture(Enum):
         return mapping.get(self, [])
 
 
+@dataclass
+class S3TransferConfig:
+    # Objects transferred in parallel
+    max_concurrency: int = int(os.getenv("S3_MAX_CONCURRENCY", "16"))
+    # HTTP connections kept by the shared client; None matches `max_concurrency`
+    max_pool_connections: Optional[int] = None
+    # Files from this size on (e.g. model weights) are transferred in parts
+    multipart_threshold_mb: int = 64
+    multipart_chunksize_mb: int = 16
+
+    def __post_init__(self):
+        if self.max_concurrency < 1:
+            raise ValueError(
+                f"max_concurrency must be at least 1, but got {self.max_concurrency}"
+            )
+        if self.multipart_chunksize_mb < 5:
+            raise ValueError(
+                "multipart_chunksize_mb must be at least 5 (the S3 minimum part "
+                f"size), but got {self.multipart_chunksize_mb}"
+            )
+        if self.max_pool_connections is None:
+            self.max_pool_connections = self.max_concurrency
+
+
 class S3Config:
     BUCKET_NAME = os.getenv("AWS_S3_BUCKET_NAME")
     if not BUCKET_NAME:
@@ -0,0 +1,69 @@
+import logging
+import os
+from typing import List, Optional
+
+import torch
+from ultralytics import YOLO
+
+from prompt2yolo.utils.logger import setup_logger
+from prompt2yolo.utils.utils import compute_file_hash, compute_hash
+
+
+def checkpoint_identity(model: Optional[YOLO], model_name: str) -> str:
+    """
+    Hash of the checkpoint file, or its name if it is not a local file. Without a
+    loaded `model` only `model_name` is checked, so the identity can be computed
+    before the checkpoint is loaded.
+    """
+    checkpoint_path = getattr(model, "ckpt_path", None) or model_name
+    if os.path.isfile(checkpoint_path):
+        return compute_file_hash(checkpoint_path)
+    return model_name
+
+
+class ClassEmbeddingCache:
+    """
+    Persists YOLO-World class text embeddings (`txt_feats`) under
+    `cache_dir/class_embeddings/<key>.pt`, keyed by the checkpoint and the ordered
+    class list, so later runs skip loading and running the CLIP text encoder.
+    """
+
+    def __init__(
+        self,
+        cache_dir: str,
+        checkpoint: str,
+        classes: List[str],
+        logger: Optional[logging.Logger] = None,
+    ) -> None:
+        self.classes = list(classes)
+        key = compute_hash(checkpoint, *self.classes)[:16]
+        self.path = os.path.join(cache_dir, "class_embeddings", f"{key}.pt")
+        self.logger = logger or setup_logger(__name__)
+
+    def exists(self) -> bool:
+        return os.path.exists(self.path)
+
+    def load_into(self, model: YOLO) -> None:
+        """Install cached embeddings the way `YOLOWorld.set_classes` would."""
+        world_model = model.model
+        device = next(world_model.parameters()).device
+        world_model.txt_feats = torch.load(self.path, map_location=device)
+        world_model.model[-1].nc = len(self.classes)
+        world_model.names = self.classes
+        model.predictor = None
+        self.logger.info(f"Loaded class embeddings from {self.path}")
+
+    def save(self, model: YOLO) -> None:
+        os.makedirs(os.path.dirname(self.path), exist_ok=True)
+        tmp_path = f"{self.path}.tmp-{os.getpid()}"
+        torch.save(model.model.txt_feats.detach().cpu(), tmp_path)
+        os.replace(tmp_path, self.path)
+        self.logger.info(f"Cached class embeddings at {self.path}")
+
+    def set_classes(self, model: YOLO) -> None:
+        """Set the model's classes, computing and caching embeddings on a miss."""
+        if self.exists():
+            self.load_into(model)
+            return
+        model.set_classes(self.classes)
+        self.save(model)
@@ -1,13 +1,51 @@
+import hashlib
+import json
 import logging
 import os
-from shutil import copyfile, rmtree
-from typing import Optional
-
-from sklearn.model_selection import train_test_split
+from typing import Dict, List, Optional
 
 from prompt2yolo.configs import Paths
+from prompt2yolo.data.dataset_layout import DatasetLayout
+from prompt2yolo.data.file_materializer import FileMaterializer
+from prompt2yolo.data.image_store import ImageStore, split_list_path, write_image_list
+from prompt2yolo.data.utils import reset_directory
 from prompt2yolo.utils.logger import setup_logger
 
+SPLITS = ["train", "val", "test"]
+MANIFEST_FILE = "split_manifest.json"
+SOURCE_FIELDS = ("split", "image", "label")
+
+
+def assign_split(image_id: str, val_ratio: float, test_ratio: float) -> str:
+    """
+    Deterministically assign an image to a split from a stable hash of its id.
+
+    The hash maps the id to a uniform value in [0, 1): the first `test_ratio` of the
+    range is test, and `val_ratio` of the remainder is val, so membership never
+    depends on which other images exist.
+    """
+    digest = hashlib.sha256(image_id.encode("utf-8")).digest()
+    value = int.from_bytes(digest[:8], "big") / 2**64
+    if value < test_ratio:
+        return "test"
+    if value < test_ratio + (1 - test_ratio) * val_ratio:
+        return "val"
+    return "train"
+
+
+def _source(entry: Optional[dict]) -> Optional[dict]:
+    """Manifest fields that decide whether an image must be (re)materialized."""
+    if entry is None:
+        return None
+    return {key: entry.get(key) for key in SOURCE_FIELDS}
+
+
+def _file_state(stat: Optional[os.stat_result]) -> Optional[List[int]]:
+    """(size, mtime) of a file, used to detect changed sources; None if missing."""
+    if stat is None:
+        return None
+    return [stat.st_size, stat.st_mtime_ns]
+
 
 class DataSplitter:
     """Splits data into train, val, and test sets and organizes into YOLO format."""
@@ -18,70 +56,189 @@ class DataSplitter:
         val_ratio: float,
         test_ratio: float,
         logger: Optional[logging.Logger] = None,
+        incremental: bool = False,
+        virtual: bool = False,
     ):
+        if not 0 <= test_ratio <= 1:
+            raise ValueError(
+                f"Enter correct test ratio in [0, 1], but got {test_ratio}"
+            )
+        if not 0 <= val_ratio < 1:
+            raise ValueError(f"Enter correct val ratio in [0, 1), but got {val_ratio}")
+
         self.paths = paths
         self.val_ratio = val_ratio
         self.test_ratio = test_ratio
+        self.incremental = incremental
+        self.virtual = virtual
         self.logger = logger or setup_logger(__name__)
+        self.manifest_path = os.path.join(self.paths.yolo_data_folder, MANIFEST_FILE)
+        self.store = (
+            ImageStore(
+                self.paths.image_store_folder,
+                sharded=self.paths.sharded_layout,
+                logger=self.logger,
+            )
+            if virtual
+            else None
+        )
         self._prepare_directories()
 
     def _prepare_directories(self):
-        """Prepare and clear directories for train/val/test splits."""
-        for split in ["train", "val", "test"]:
-            for folder in ["images", "labels"]:
-                dir_path = os.path.join(self.paths.yolo_data_folder, split, folder)
-                rmtree(dir_path, ignore_errors=True)
-                os.makedirs(dir_path, exist_ok=True)
+        """Prepare directories for train/val/test splits."""
+        self.previous = self._load_manifest() if self.incremental else {}
+        # Without a manifest written in the same mode, existing split contents are
+        # unknown and are rebuilt
+        if any(("store" in entry) != self.virtual for entry in self.previous.values()):
+            self.previous = {}
+        # Split folders mirror the flat or sharded layout of the source images
+        self.sharded = DatasetLayout(self.paths.image_folder).sharded
+        dir_paths = [
+            os.path.join(self.paths.yolo_data_folder, split, folder)
+            for split in SPLITS
+            for folder in ["images", "labels"]
+        ]
+        if any(
+            os.path.isdir(dir_path) and DatasetLayout(dir_path).sharded != self.sharded
+            for dir_path in dir_paths
+        ):
+            self.previous = {}
+        clear = not self.previous
+        for dir_path in dir_paths:
+            if clear:
+                reset_directory(dir_path, self.logger)
+            DatasetLayout(dir_path, self.sharded).prepare()
+        for split in SPLITS:
+            list_path = split_list_path(self.paths.yolo_data_folder, split)
+            if clear and os.path.exists(list_path):
+                os.remove(list_path)
+        if clear and os.path.exists(self.manifest_path):
+            os.remove(self.manifest_path)
         self.logger.info("[*] Directories prepared for splits.")
 
-    def _copy_files(self, files, split):
-        """Copy images and labels to the specified split."""
+    @staticmethod
+    def _label_name(image_file: str) -> str:
+        return os.path.splitext(image_file)[0] + ".txt"
+
+    def _split_path(self, split: str, folder: str, file: str) -> str:
+        return DatasetLayout(
+            os.path.join(self.paths.yolo_data_folder, split, folder), self.sharded
+        ).path(file)
+
+    def _load_manifest(self) -> Dict[str, dict]:
+        if not os.path.exists(self.manifest_path):
+            return {}
+        with open(self.manifest_path, "r") as file:
+            return json.load(file)
+
+    def _save_manifest(self, manifest: Dict[str, dict]) -> None:
+        tmp_path = f"{self.manifest_path}.tmp"
+        with open(tmp_path, "w") as file:
+            json.dump(manifest, file, indent=1, sort_keys=True)
+        os.replace(tmp_path, self.manifest_path)
+
+    def _remove_files(self, files, split):
+        """Remove images and labels from the specified split."""
         for file in files:
-            copyfile(
-                os.path.join(self.paths.image_folder, file),
-                os.path.join(self.paths.yolo_data_folder, f"{split}/images", file),
+            for folder, name in [("images", file), ("labels", self._label_name(file))]:
+                path = self._split_path(split, folder, name)
+                if os.path.lexists(path):
+                    os.remove(path)
+
+    def _link_files(
+        self,
+        to_link: Dict[str, List[str]],
+        manifest: Dict[str, dict],
+        materializer: FileMaterializer,
+    ) -> None:
+        """
+        Add new or changed images to the store, link them into their split folders,
+        and write one list file of stored image paths per split.
+        """
+        images = [image for split in SPLITS for image in to_link[split]]
+        pairs = []
+        for image in images:
+            label = materializer.label_for(image)
+            pairs.append(
+                (
+                    materializer.image_layout.path(image),
+                    materializer.label_layout.path(label) if label else None,
+                )
+            )
+        store_paths = self.store.add_all(pairs)
+        for image, store_path in zip(images, store_paths):
+            manifest[image]["store"] = store_path
+            self.store.link(
+                store_path,
+                os.path.join(self.paths.yolo_data_folder, manifest[image]["split"]),
+                image,
             )
-            label = file.replace(".jpg", ".txt").replace(".png", ".txt")
-            label_src = os.path.join(self.paths.label_folder, label)
-            label_dst = os.path.join(
-                self.paths.yolo_data_folder, f"{split}/labels", label
+        for split in SPLITS:
+            write_image_list(
+                split_list_path(self.paths.yolo_data_folder, split),
+                (
+                    entry["store"]
+                    for entry in manifest.values()
+                    if entry["split"] == split
+                ),
             )
-            if os.path.exists(label_src):
-                copyfile(label_src, label_dst)
 
     def split(self):
         """Split data and organize files into train, val, and test directories."""
-        images = [
-            f
-            for f in os.listdir(self.paths.image_folder)
-            if f.endswith((".jpg", ".png"))
-        ]
-        if 0 < self.test_ratio < 1:
-            train_val, test = train_test_split(images, test_size=self.test_ratio)
-        elif self.test_ratio == 1:
-            train_val, test = [], images
-        elif self.test_ratio == 0:
-            train_val, test = images, []
-        else:
-            raise ValueError(
-                f"Enter correct test ratio in [0, 1], but got {self.test_ratio}"
-            )
+        # One scan of each source folder provides names and states for all files
+        materializer = FileMaterializer(
+            self.paths.image_folder, self.paths.label_folder, logger=self.logger
+        )
+        manifest = {}
+        for image in sorted(materializer.images):
+            manifest[image] = {
+                "split": assign_split(
+                    os.path.splitext(image)[0], self.val_ratio, self.test_ratio
+                ),
+                "image": _file_state(materializer.images[image]),
+                "label": _file_state(materializer.labels.get(self._label_name(image))),
+            }
 
-        if train_val:
-            if 0 < self.val_ratio < 1:
-                train, val = train_test_split(train_val, test_size=self.val_ratio)
-            elif self.val_ratio == 0:
-                train, val = images, []
-            else:
-                raise ValueError(
-                    f"Enter correct test ratio in [0, 1), but got {self.val_ratio}"
-                )
-        else:
-            train, val = [], []
+        # Only files whose membership or source changed since the last split are
+        # touched; a full split starts from an empty manifest
+        previous = self.previous
+        to_remove = {split: [] for split in SPLITS}
+        to_copy = {split: [] for split in SPLITS}
+        for image, entry in previous.items():
+            if manifest.get(image, {}).get("split") != entry["split"]:
+                to_remove[entry["split"]].append(image)
+        for image, entry in manifest.items():
+            if _source(previous.get(image)) != entry:
+                if previous.get(image, {}).get("split") == entry["split"]:
+                    # Changed in place; also drops a label removed from the source
+                    to_remove[entry["split"]].append(image)
+                to_copy[entry["split"]].append(image)
+            elif self.virtual:
+                entry["store"] = previous[image]["store"]
 
-        for split, files in zip(["train", "val", "test"], [train, val, test]):
-            self._copy_files(files, split)
+        for split in SPLITS:
+            self._remove_files(set(to_remove[split]), split)
+        if self.virtual:
+            self._link_files(to_copy, manifest, materializer)
+        else:
+            materializer.materialize(
+                {
+                    os.path.join(self.paths.yolo_data_folder, split): to_copy[split]
+                    for split in SPLITS
+                }
+            )
+        self._save_manifest(manifest)
 
+        counts = {
+            split: sum(entry["split"] == split for entry in manifest.values())
+            for split in SPLITS
+        }
         self.logger.info(
-            f"[*] Data split: {len(train)} train, {len(val)} val, {len(test)} test."
+            f"[*] Data split: {counts['train']} train, {counts['val']} val, "
+            f"{counts['test']} test."
         )
+        if self.incremental:
+            self.logger.info(
+                f"[*] Incremental split: {sum(map(len, to_copy.values()))} copied, "
+                f"{sum(map(len, to_remove.values()))} removed."
+            )
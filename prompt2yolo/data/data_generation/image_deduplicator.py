@@ -0,0 +1,220 @@
+import json
+import logging
+import os
+import shutil
+from collections import Counter
+from typing import Dict, List, Optional, Tuple
+
+import cv2
+import numpy as np
+
+from prompt2yolo.configs import DeduplicationConfig
+from prompt2yolo.data.data_generation.utils import prompt_from_image_name
+from prompt2yolo.data.dataset_layout import DatasetLayout
+from prompt2yolo.utils.logger import setup_logger
+
+HASH_SIZE = 8  # 8x8 low-frequency DCT coefficients -> 64-bit hash
+HASH_INPUT_SIZE = 32  # Images are reduced to 32x32 grayscale before the DCT
+
+
+def _dct_matrix(size: int) -> np.ndarray:
+    """Orthonormal DCT-II basis, so that `D @ X @ D.T` is the 2D DCT of X."""
+    k = np.arange(size)[:, None]
+    n = np.arange(size)[None, :]
+    matrix = np.cos(np.pi * (2 * n + 1) * k / (2 * size)) * np.sqrt(2 / size)
+    matrix[0] /= np.sqrt(2)
+    return matrix
+
+
+_DCT = _dct_matrix(HASH_INPUT_SIZE)
+
+
+def compute_phashes(images: np.ndarray) -> np.ndarray:
+    """
+    Compute 64-bit perceptual hashes for a batch of (N, 32, 32) grayscale images.
+
+    Each bit records whether a low-frequency DCT coefficient is above the median of
+    the 8x8 block, which is robust to small shifts in brightness, noise and scale.
+    """
+    dct = np.einsum("ij,njk,lk->nil", _DCT, images.astype(np.float64), _DCT)
+    low_frequencies = dct[:, :HASH_SIZE, :HASH_SIZE].reshape(len(images), -1)
+    medians = np.median(low_frequencies, axis=1, keepdims=True)
+    bits = np.packbits(low_frequencies > medians, axis=1)
+    return bits.view(">u8").ravel().astype(np.uint64)
+
+
+def load_hash_inputs(image_paths: List[str]) -> Tuple[np.ndarray, List[str]]:
+    """Load images as 32x32 grayscale arrays, skipping unreadable files."""
+    images, loaded_paths = [], []
+    for image_path in image_paths:
+        image = cv2.imread(image_path, cv2.IMREAD_GRAYSCALE)
+        if image is None:
+            continue
+        images.append(
+            cv2.resize(
+                image, (HASH_INPUT_SIZE, HASH_INPUT_SIZE), interpolation=cv2.INTER_AREA
+            )
+        )
+        loaded_paths.append(image_path)
+    if not images:
+        return np.empty((0, HASH_INPUT_SIZE, HASH_INPUT_SIZE)), loaded_paths
+    return np.stack(images), loaded_paths
+
+
+def hamming_distance(hash_a: int, hash_b: int) -> int:
+    return (int(hash_a) ^ int(hash_b)).bit_count()
+
+
+class BKTree:
+    """Burkhard-Keller tree over 64-bit hashes for Hamming-radius queries."""
+
+    def __init__(self):
+        # Node layout: (hash, value, {distance: child node})
+        self._root = None
+        self._size = 0
+
+    def __len__(self) -> int:
+        return self._size
+
+    def add(self, hash_value: int, value: str) -> None:
+        node = (int(hash_value), value, {})
+        self._size += 1
+        if self._root is None:
+            self._root = node
+            return
+
+        current = self._root
+        while True:
+            distance = hamming_distance(hash_value, current[0])
+            child = current[2].get(distance)
+            if child is None:
+                current[2][distance] = node
+                return
+            current = child
+
+    def query(self, hash_value: int, radius: int) -> List[Tuple[int, str]]:
+        """Return (distance, value) pairs of all hashes within `radius`."""
+        if self._root is None:
+            return []
+
+        matches, candidates = [], [self._root]
+        while candidates:
+            node_hash, value, children = candidates.pop()
+            distance = hamming_distance(hash_value, node_hash)
+            if distance <= radius:
+                matches.append((distance, value))
+            # Triangle inequality: only subtrees in [d - r, d + r] can match
+            candidates.extend(
+                child
+                for child_distance, child in children.items()
+                if distance - radius <= child_distance <= distance + radius
+            )
+        return matches
+
+
+class ImageDeduplicator:
+    """
+    Drops or quarantines generated images that are near-duplicates of images already
+    in the project's perceptual-hash index (including earlier iterations).
+
+    The index is kept per iteration. The current iteration's entries are rebuilt from
+    the images in the folder on every run, so images removed by a reset of the folder
+    no longer reject their regenerated counterparts.
+    """
+
+    def __init__(
+        self,
+        index_path: str,
+        config: DeduplicationConfig,
+        iteration: int = 1,
+        quarantine_dir: Optional[str] = None,
+        logger: Optional[logging.Logger] = None,
+    ):
+        self.index_path = index_path
+        self.config = config
+        self.iteration_key = f"iteration_{iteration}"
+        self.quarantine_dir = quarantine_dir
+        self.logger = logger or setup_logger(__name__)
+
+        if config.action not in ("drop", "quarantine"):
+            raise ValueError(f"Unknown deduplication action: {config.action}")
+        if config.action == "quarantine" and not quarantine_dir:
+            raise ValueError("A quarantine directory is required to quarantine images.")
+
+        self.index = self._load_index()
+        self.tree = BKTree()
+        for image_hashes in self.index.values():
+            for image_name, hash_hex in image_hashes.items():
+                self.tree.add(int(hash_hex, 16), image_name)
+
+    def _load_index(self) -> Dict[str, Dict[str, str]]:
+        """Load {iteration: {image name: hash}} without the current iteration."""
+        if not os.path.exists(self.index_path):
+            return {}
+        with open(self.index_path, "r") as file:
+            index = json.load(file)
+        index.pop(self.iteration_key, None)
+        return index
+
+    def _save_index(self) -> None:
+        os.makedirs(os.path.dirname(self.index_path) or ".", exist_ok=True)
+        tmp_path = f"{self.index_path}.tmp"
+        with open(tmp_path, "w") as file:
+            json.dump(self.index, file)
+        os.replace(tmp_path, self.index_path)
+
+    def _remove_duplicate(self, image_path: str) -> None:
+        if self.config.action == "drop":
+            os.remove(image_path)
+        else:
+            os.makedirs(self.quarantine_dir, exist_ok=True)
+            shutil.move(
+                image_path,
+                os.path.join(self.quarantine_dir, os.path.basename(image_path)),
+            )
+
+    def deduplicate(self, image_folder: str) -> Dict[str, Tuple[int, int]]:
+        """
+        Hash all images in the folder and remove those within `radius` of an indexed
+        image. Returns {prompt: (kept, duplicates)} and logs the per-prompt rates.
+        """
+        image_paths = [
+            entry.path
+            for entry in sorted(
+                DatasetLayout(image_folder).scan((".jpg", ".png")),
+                key=lambda entry: entry.name,
+            )
+        ]
+        kept, duplicates = Counter(), Counter()
+        current_hashes = self.index.setdefault(self.iteration_key, {})
+
+        for start in range(0, len(image_paths), self.config.batch_size):
+            batch = image_paths[start : start + self.config.batch_size]
+            images, loaded_paths = load_hash_inputs(batch)
+            if not loaded_paths:
+                continue
+
+            for image_path, hash_value in zip(loaded_paths, compute_phashes(images)):
+                image_name = os.path.basename(image_path)
+                prompt = prompt_from_image_name(image_name)
+                if self.tree.query(hash_value, self.config.radius):
+                    self._remove_duplicate(image_path)
+                    duplicates[prompt] += 1
+                else:
+                    self.tree.add(hash_value, image_name)
+                    current_hashes[image_name] = f"{int(hash_value):016x}"
+                    kept[prompt] += 1
+
+        self._save_index()
+
+        report = {
+            prompt: (kept[prompt], duplicates[prompt])
+            for prompt in sorted(set(kept) | set(duplicates))
+        }
+        for prompt, (num_kept, num_duplicates) in report.items():
+            rate = num_duplicates / (num_kept + num_duplicates)
+            self.logger.info(
+                f"[*] Dedup '{prompt}': {num_duplicates} duplicates, "
+                f"{num_kept} kept ({rate:.1%} duplicate rate)"
+            )
+        return report
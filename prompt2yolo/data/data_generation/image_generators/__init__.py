@@ -1,4 +1,9 @@
+from typing import Optional
+
 from prompt2yolo.configs import ImageGeneratorConfig
+from prompt2yolo.data.data_generation.image_generators.cpu_generator import (
+    CpuGenerator,
+)
 from prompt2yolo.data.data_generation.image_generators.pixart_generator import (
     PixartGenerator,
 )
@@ -10,8 +15,12 @@ from prompt2yolo.utils.s3_handler import S3Handler
 
 class GeneratorFactory:
     @staticmethod
-    def get_generator(s3_handler: S3Handler, config: ImageGeneratorConfig):
-        generators = {"pixart": PixartGenerator, "realtek": RealtekGenerator}
+    def get_generator(s3_handler: Optional[S3Handler], config: ImageGeneratorConfig):
+        generators = {
+            "pixart": PixartGenerator,
+            "realtek": RealtekGenerator,
+            "cpu": CpuGenerator,
+        }
         generator_type = config.generator
         if generator_type.lower() in generators:
             return generators[generator_type.lower()](s3_handler, config)
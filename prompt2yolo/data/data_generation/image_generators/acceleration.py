@@ -0,0 +1,78 @@
+import logging
+from typing import List
+
+import torch
+from diffusers import DiffusionPipeline
+from diffusers.models.attention_processor import AttnProcessor, AttnProcessor2_0
+
+from prompt2yolo.configs import AccelerationConfig
+
+
+def _torch_modules(pipe: DiffusionPipeline) -> List[torch.nn.Module]:
+    """UNet and VAE of the pipeline, if they are PyTorch modules (not e.g. OpenVINO)."""
+    modules = [getattr(pipe, name, None) for name in ("unet", "vae")]
+    modules = [module for module in modules if isinstance(module, torch.nn.Module)]
+    if not modules:
+        raise TypeError("pipeline has no PyTorch UNet or VAE")
+    return modules
+
+
+def _set_attention(pipe: DiffusionPipeline, attention: str) -> None:
+    if attention == "xformers":
+        pipe.enable_xformers_memory_efficient_attention()
+        return
+
+    processors = {"sdpa": AttnProcessor2_0, "default": AttnProcessor}
+    if attention not in processors:
+        raise ValueError(f"Unknown attention implementation: {attention}")
+    for module in _torch_modules(pipe):
+        module.set_attn_processor(processors[attention]())
+
+
+def _set_channels_last(pipe: DiffusionPipeline) -> None:
+    for module in _torch_modules(pipe):
+        module.to(memory_format=torch.channels_last)
+
+
+def _compile_unet(pipe: DiffusionPipeline) -> None:
+    if not isinstance(getattr(pipe, "unet", None), torch.nn.Module):
+        raise TypeError("pipeline has no PyTorch UNet")
+    pipe.unet = torch.compile(pipe.unet, mode="reduce-overhead", fullgraph=False)
+
+
+def apply_acceleration(
+    pipe: DiffusionPipeline, config: AccelerationConfig, logger: logging.Logger
+) -> List[str]:
+    """
+    Apply the enabled acceleration options to the pipeline in place.
+
+    Each option is applied independently: one that fails (missing kernel, unsupported
+    runtime, ...) is logged and skipped without affecting the others. Returns the
+    names of the options that were applied.
+    """
+    options = []
+    if config.attention:
+        options.append(("attention", lambda: _set_attention(pipe, config.attention)))
+    if config.channels_last:
+        options.append(("channels_last", lambda: _set_channels_last(pipe)))
+    if config.compile_unet:
+        options.append(("compile_unet", lambda: _compile_unet(pipe)))
+
+    applied = []
+    for name, apply in options:
+        try:
+            apply()
+            applied.append(name)
+        except Exception as e:
+            logger.warning(f"Skipping acceleration option '{name}': {e}")
+    logger.info(f"Applied acceleration options: {applied}")
+    return applied
+
+
+def revert_compile(pipe: DiffusionPipeline) -> bool:
+    """Swap a compiled UNet back to its eager module; returns whether it was compiled."""
+    original = getattr(pipe.unet, "_orig_mod", None)
+    if original is None:
+        return False
+    pipe.unet = original
+    return True
@@ -1,26 +1,53 @@
 import logging
 import os
+import time
+from contextlib import nullcontext
+from dataclasses import replace
 from pathlib import Path
-from typing import Optional
+from typing import Callable, List, Optional, Tuple
 
+import torch
 from botocore.exceptions import ClientError
-from diffusers import DiffusionPipeline
+from diffusers import AutoencoderKL, DiffusionPipeline, EulerDiscreteScheduler
 from dotenv import load_dotenv
+from PIL import Image
 
 from prompt2yolo.utils.logger import setup_logger
 
 load_dotenv()
 
-from prompt2yolo.configs import ImageGeneratorConfig, Paths
+from prompt2yolo.configs import GENERATION_PROFILES, ImageGeneratorConfig, Paths
+from prompt2yolo.data.data_generation.image_generators.acceleration import (
+    apply_acceleration,
+    revert_compile,
+)
+from prompt2yolo.data.data_generation.image_generators.fused_weights_cache import (
+    FusedWeightsCache,
+)
+from prompt2yolo.data.data_generation.image_generators.memory import (
+    MEMORY_MODES,
+    apply_memory_mode,
+    pipeline_weight_bytes,
+    select_memory_mode,
+)
+from prompt2yolo.data.dataset_layout import DatasetLayout
 from prompt2yolo.utils.s3_handler import S3Handler
+from prompt2yolo.utils.utils import compute_hash
 
 LOCAL_IMAGE_FOLDER = Paths().image_folder
 
 
 class DreamBoothGeneratorBase:
+    # Device the pipeline runs on; CPU backends override this.
+    device: str = "cuda"
+    # Step count of a fused distillation LoRA (e.g. SDXL-Lightning), if any
+    distillation_steps: Optional[int] = None
+    # Whether the pipeline cannot be built without the LoRA checkpoint from S3
+    requires_lora: bool = False
+
     def __init__(
         self,
-        s3_handler: S3Handler,
+        s3_handler: Optional[S3Handler],
         config: ImageGeneratorConfig,
         logger: Optional[logging.Logger] = None,
     ) -> None:
@@ -29,31 +56,44 @@ class DreamBoothGeneratorBase:
         self.logger = logger or setup_logger(__name__)
 
         self.s3_base_folder = Paths().s3_image_folder
-        self.lora_path = self.download_lora_checkpoint()
+        if s3_handler is None and self.requires_lora:
+            raise ValueError(
+                f"{type(self).__name__} needs an S3 handler to download its "
+                "LoRA checkpoint."
+            )
+        # Without an S3 handler (e.g. benchmarks) the pipeline runs without LoRA
+        self.lora_path = self.download_lora_checkpoint() if s3_handler else None
 
         # Load the model
         self.pipe = self.load_model()
+        self.num_inference_steps, self.guidance_scale = self.configure_sampling()
+        self.memory_mode = self.place_pipeline()
+
+        acceleration = self.config.acceleration
+        if MEMORY_MODES.index(self.memory_mode) >= MEMORY_MODES.index(
+            "attention_slicing"
+        ):
+            # Swapping attention processors would undo attention slicing
+            acceleration = replace(acceleration, attention=None)
+        self.acceleration_options = apply_acceleration(
+            self.pipe, acceleration, self.logger
+        )
+        self.peak_memory_per_image: List[int] = []
+        if self.config.acceleration.warmup:
+            self.warm_up()
 
     def download_lora_checkpoint(self) -> str:
         """Download all relevant LoRA checkpoint files from S3 and return the main checkpoint path."""
-        # List all files in the specified S3 folder
-        files = self.s3_handler.list_files_in_folder()
-
-        if not files:
-            error_msg = f"No files found in '{self.s3_handler.s3_folder}'."
-            self.logger.error(error_msg)
-            raise ValueError(error_msg)
-
-        self.s3_handler.logger.debug(f"Files returned from S3: {files}")
-
         downloaded_files = []
+        num_files = 0
 
         # Ensure the local directory exists
         local_dir = Path(self.s3_handler.local_dir)
         local_dir.mkdir(parents=True, exist_ok=True)
 
-        # Download each file to the local directory
-        for file in files:
+        # Stream the files in the specified S3 folder and download each one
+        for file in self.s3_handler.iter_keys():
+            num_files += 1
             if not file.strip():
                 self.logger.info("Skipping empty file entry.")
                 continue
@@ -82,6 +122,11 @@ class DreamBoothGeneratorBase:
                 self.logger.error(error_msg)
                 raise ValueError(error_msg) from e
 
+        if not num_files:
+            error_msg = f"No files found in '{self.s3_handler.s3_folder}'."
+            self.logger.error(error_msg)
+            raise ValueError(error_msg)
+
         # Find the specific LoRA weights file (e.g., pytorch_lora_weights.safetensors)
         lora_file = next(
             (
@@ -109,11 +154,210 @@ class DreamBoothGeneratorBase:
             filename = filename.replace(char, "_")
         return filename[:max_length]
 
+    @property
+    def torch_dtype(self) -> torch.dtype:
+        """Half precision on GPU; CPUs lack fast fp16 kernels, so use `cpu_dtype`."""
+        if self.device == "cuda":
+            return torch.float16
+        return getattr(torch, self.config.cpu_dtype)
+
+    def load_base_pipeline(self) -> DiffusionPipeline:
+        """Load the base diffusion pipeline (and optional VAE) for `self.device`."""
+        pipeline_kwargs = {"torch_dtype": self.torch_dtype, "use_safetensors": True}
+        if self.torch_dtype == torch.float16:
+            pipeline_kwargs["variant"] = "fp16"
+        if self.config.vae_path:
+            pipeline_kwargs["vae"] = AutoencoderKL.from_pretrained(
+                self.config.vae_path, torch_dtype=self.torch_dtype
+            )
+        return DiffusionPipeline.from_pretrained(
+            self.config.model_path, **pipeline_kwargs
+        )
+
+    def load_fused_pipeline(
+        self,
+        lora_inputs: List[str],
+        load_loras: Callable[[DiffusionPipeline], None],
+    ) -> DiffusionPipeline:
+        """
+        Load the base pipeline with LoRAs fused in.
+
+        `lora_inputs` must identify every LoRA that `load_loras` loads (e.g. file
+        hashes or hub ETags) without downloading it. With `cache_fused_weights` on,
+        the fused weights are cached under that identity and a hit skips
+        `load_loras` (and any download in it) and fusion.
+        """
+        cache = None
+        if self.config.cache_fused_weights:
+            key = compute_hash(
+                self.config.model_path,
+                self.config.vae_path or "",
+                str(self.torch_dtype),
+                *lora_inputs,
+            )
+            cache = FusedWeightsCache(self.config.cache_dir, key, self.logger)
+            if cache.exists():
+                pipe = self.load_base_pipeline()
+                cache.load_into(pipe)
+                return pipe
+
+        pipe = self.load_base_pipeline()
+        load_loras(pipe)
+        pipe.fuse_lora()
+        # Drop the adapter layers; the fused base weights keep their effect
+        pipe.unload_lora_weights()
+        if cache is not None:
+            cache.save(pipe)
+        return pipe
+
     def load_model(self) -> DiffusionPipeline:
         """Load the diffusion model with the optional LoRA checkpoint(s)."""
         raise NotImplementedError("This method must be implemented in a subclass.")
 
+    def place_pipeline(self) -> str:
+        """Move the pipeline to the device under the configured memory mode."""
+        if self.device != "cuda":
+            # Pipelines are loaded on the CPU; memory modes only bound device memory
+            return "none"
+
+        mode = self.config.memory_mode
+        if mode == "auto":
+            free_bytes, _ = torch.cuda.mem_get_info()
+            weight_bytes, largest_component_bytes = pipeline_weight_bytes(self.pipe)
+            vae_tile_size = getattr(self.pipe.vae, "tile_sample_min_size", 512)
+            mode = select_memory_mode(
+                free_bytes,
+                weight_bytes=weight_bytes,
+                largest_component_bytes=largest_component_bytes,
+                image_size=self.config.image_size,
+                dtype_bytes=torch.finfo(self.torch_dtype).bits // 8,
+                batch_size=2 if self.guidance_scale > 1 else 1,
+                vae_tile_size=vae_tile_size,
+            )
+            self.logger.info(
+                f"Auto memory mode selected '{mode}' "
+                f"with {free_bytes / 2**30:.1f} GiB free"
+            )
+
+        apply_memory_mode(self.pipe, mode, self.device)
+        return mode
+
+    def configure_sampling(self) -> Tuple[int, float]:
+        """Apply the configured generation profile and return (steps, guidance scale)."""
+        if self.config.profile not in GENERATION_PROFILES:
+            raise ValueError(f"Unknown generation profile: {self.config.profile}")
+        profile = GENERATION_PROFILES[self.config.profile]
+
+        if profile.requires_distillation and not self.distillation_steps:
+            self.logger.info(
+                f"Profile '{self.config.profile}' needs a fused distillation LoRA; "
+                "using the configured steps and guidance scale."
+            )
+            return self.config.steps, self.config.guidance_scale
+
+        steps = (
+            self.distillation_steps
+            if profile.requires_distillation
+            else self.config.steps
+        )
+        guidance_scale = (
+            self.config.guidance_scale
+            if profile.guidance_scale is None
+            else profile.guidance_scale
+        )
+        if profile.timestep_spacing:
+            self.pipe.scheduler = EulerDiscreteScheduler.from_config(
+                self.pipe.scheduler.config, timestep_spacing=profile.timestep_spacing
+            )
+        self.logger.info(
+            f"Profile '{self.config.profile}': {steps} steps, "
+            f"guidance scale {guidance_scale}"
+        )
+        return steps, guidance_scale
+
+    def _run_pipeline(
+        self, prompt: str, seed: int, num_inference_steps: Optional[int] = None
+    ) -> Image.Image:
+        """Generate a single image for the prompt with a seeded generator."""
+        generator = torch.Generator(self.device).manual_seed(seed)
+        inference_context = (
+            torch.inference_mode()
+            if self.config.acceleration.inference_mode
+            else nullcontext()
+        )
+        with inference_context:
+            result = self.pipe(
+                prompt=prompt,
+                negative_prompt=self.config.negative_prompt,
+                generator=generator,
+                height=self.config.image_size[1],
+                width=self.config.image_size[0],
+                num_images_per_prompt=1,
+                num_inference_steps=num_inference_steps or self.num_inference_steps,
+                guidance_scale=self.guidance_scale,
+            )
+        return result.images[0]
+
+    def warm_up(self) -> None:
+        """Generate one throwaway image so compilation and allocation happen up front."""
+        start = time.perf_counter()
+        # Same shapes as the real loop (compiled graphs are shape-specialized)
+        warmup_steps = min(2, self.num_inference_steps)
+        try:
+            self._run_pipeline("warm-up", seed=0, num_inference_steps=warmup_steps)
+        except Exception as e:
+            if not revert_compile(self.pipe):
+                self.logger.warning(f"Warm-up failed: {e}")
+                return
+            self.logger.warning(
+                f"Compiled UNet failed during warm-up, using the eager UNet: {e}"
+            )
+            self.acceleration_options.remove("compile_unet")
+            self._run_pipeline("warm-up", seed=0, num_inference_steps=warmup_steps)
+        self.logger.info(f"Warm-up finished in {time.perf_counter() - start:.2f}s")
+
+    def postprocess_image(self, image: Image.Image) -> Image.Image:
+        """Hook for generator-specific post-processing of a generated image."""
+        return image
+
+    def release_memory(self) -> None:
+        """Free cached accelerator memory between prompts."""
+        if self.device == "cuda":
+            torch.cuda.empty_cache()
+
     def generate(
         self, prompt: str, weight: float, output_dir: str = LOCAL_IMAGE_FOLDER
     ) -> None:
-        raise NotImplementedError("This method must be implemented in a subclass.")
+        """Generate `weight * num_images` images for the prompt into `output_dir`."""
+        num_images = max(1, int(weight * self.config.num_images))
+        output_layout = DatasetLayout(output_dir)
+        os.makedirs(output_dir, exist_ok=True)
+
+        seeds = [
+            torch.randint(1000000000000, 9999999999999, (1,)).item()
+            for _ in range(num_images)
+        ]
+        sanitized_prompt = self.sanitize_filename(prompt)
+
+        self.peak_memory_per_image = []
+        for seed in seeds:
+            if self.device == "cuda":
+                torch.cuda.reset_peak_memory_stats()
+            try:
+                image = self.postprocess_image(self._run_pipeline(prompt, seed))
+
+                image_filename = f"{sanitized_prompt}_{seed}.jpg"
+                image_path = output_layout.writable_path(image_filename)
+                image.save(image_path)
+            except Exception as e:
+                self.logger.error(f"Failed to generate image: {e}")
+                continue
+
+            if self.device == "cuda":
+                peak_memory = torch.cuda.max_memory_allocated()
+                self.peak_memory_per_image.append(peak_memory)
+                self.logger.info(
+                    f"Peak memory for {image_filename}: {peak_memory / 2**20:.0f} MiB"
+                )
+
+        self.release_memory()
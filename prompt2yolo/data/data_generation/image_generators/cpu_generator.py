@@ -0,0 +1,114 @@
+import os
+import shutil
+import tempfile
+from pathlib import Path
+
+import torch
+from diffusers import DiffusionPipeline
+
+from prompt2yolo.data.data_generation.image_generators.base_generator import (
+    DreamBoothGeneratorBase,
+)
+from prompt2yolo.utils.utils import compute_file_hash, compute_hash
+
+
+class CpuGenerator(DreamBoothGeneratorBase):
+    """
+    Runs the base pipeline, with the optional LoRA fused in, on CPU-only nodes.
+
+    With `cpu_runtime: "openvino"` and `optimum-intel` installed, the fused pipeline
+    is exported once to OpenVINO IR under `cache_dir` and reused on later runs.
+    Otherwise it falls back to PyTorch with a channels-last UNet.
+    """
+
+    device = "cpu"
+
+    def load_model(self) -> DiffusionPipeline:
+        """CPU-specific loading logic."""
+        num_threads = self.config.num_threads or os.cpu_count()
+        torch.set_num_threads(num_threads)
+        self.logger.info(f"Using {num_threads} CPU threads for generation.")
+
+        try:
+            if self.config.cpu_runtime == "openvino":
+                pipe = self._load_openvino_pipeline(num_threads)
+                if pipe is not None:
+                    return pipe
+            elif self.config.cpu_runtime != "pytorch":
+                raise ValueError(f"Unknown CPU runtime: {self.config.cpu_runtime}")
+
+            pipe = self._load_fused_pipeline()
+            pipe.unet.to(memory_format=torch.channels_last)
+
+        except Exception as e:
+            self.logger.error(f"Failed to load CPU model: {e}")
+            raise RuntimeError(f"Failed to load CPU model: {e}") from e
+
+        return pipe
+
+    def _load_fused_pipeline(self) -> DiffusionPipeline:
+        """Load the base pipeline and fuse the LoRA so inference skips adapter math."""
+        if not self.lora_path:
+            return self.load_base_pipeline()
+        return self.load_fused_pipeline(
+            lora_inputs=[compute_file_hash(self.lora_path)],
+            load_loras=lambda pipe: pipe.load_lora_weights(self.lora_path),
+        )
+
+    def _export_dir(self) -> Path:
+        """Export location keyed by every input that changes the exported graph."""
+        lora_hash = compute_file_hash(self.lora_path) if self.lora_path else ""
+        key = compute_hash(
+            self.config.model_path,
+            self.config.vae_path or "",
+            lora_hash,
+            self.config.cpu_dtype,
+        )
+        return Path(self.config.cache_dir) / "openvino" / key[:16]
+
+    def _load_openvino_pipeline(self, num_threads: int):
+        """Load (exporting on first use) an OpenVINO pipeline, or None if unavailable."""
+        try:
+            from optimum.intel import OVDiffusionPipeline
+        except ImportError:
+            self.logger.warning(
+                "optimum-intel is not installed; falling back to PyTorch on CPU."
+            )
+            return None
+
+        export_dir = self._export_dir()
+        if not export_dir.exists():
+            self.logger.info(f"Exporting pipeline to OpenVINO at {export_dir}")
+            self._export_openvino_pipeline(OVDiffusionPipeline, export_dir)
+        else:
+            self.logger.info(f"Loading cached OpenVINO pipeline from {export_dir}")
+
+        pipe = OVDiffusionPipeline.from_pretrained(
+            export_dir,
+            compile=False,
+            ov_config={"INFERENCE_NUM_THREADS": str(num_threads)},
+        )
+        pipe.compile()
+        return pipe
+
+    def _export_openvino_pipeline(self, ov_pipeline_cls, export_dir: Path) -> None:
+        """
+        Export to a staging folder and publish it atomically, so an interrupted
+        export never leaves a partial pipeline at `export_dir`.
+        """
+        staging_dir = export_dir.with_name(f"{export_dir.name}.tmp-{os.getpid()}")
+        try:
+            with tempfile.TemporaryDirectory(prefix="fused_pipeline_") as tmp_dir:
+                self._load_fused_pipeline().save_pretrained(tmp_dir)
+                ov_pipe = ov_pipeline_cls.from_pretrained(
+                    tmp_dir, export=True, compile=False
+                )
+                ov_pipe.save_pretrained(staging_dir)
+            os.rename(staging_dir, export_dir)
+        except OSError:
+            if not export_dir.exists():
+                raise
+            # Another process published the same export first
+            self.logger.warning(f"OpenVINO export already cached at {export_dir}")
+        finally:
+            shutil.rmtree(staging_dir, ignore_errors=True)
@@ -0,0 +1,67 @@
+import logging
+import os
+import shutil
+from pathlib import Path
+from typing import Optional
+
+from diffusers import DiffusionPipeline
+from safetensors.torch import load_model, save_model
+
+from prompt2yolo.utils.logger import setup_logger
+
+
+class FusedWeightsCache:
+    """
+    Stores the weights of a LoRA-fused pipeline as safetensors under `cache_dir/key`.
+
+    The key must identify every input of the fusion (base model, VAE, dtype and
+    LoRA files), so a hit can be loaded directly into a freshly loaded base
+    pipeline without loading adapters or fusing again.
+    """
+
+    # Pipeline components that LoRA fusion modifies
+    components = ("unet", "text_encoder", "text_encoder_2")
+
+    def __init__(
+        self, cache_dir: str, key: str, logger: Optional[logging.Logger] = None
+    ) -> None:
+        self.path = Path(cache_dir) / "fused" / key
+        self.logger = logger or setup_logger(__name__)
+
+    def _component_file(self, directory: Path, component: str) -> Path:
+        return directory / f"{component}.safetensors"
+
+    def exists(self) -> bool:
+        """A cache entry only exists once it has been completely written."""
+        return self.path.is_dir()
+
+    def load_into(self, pipe: DiffusionPipeline) -> None:
+        """Overwrite the pipeline's component weights with the cached fused ones."""
+        for component in self.components:
+            module = getattr(pipe, component, None)
+            file_path = self._component_file(self.path, component)
+            if module is not None and file_path.exists():
+                device = next(module.parameters()).device
+                load_model(module, str(file_path), device=str(device))
+        self.logger.info(f"Loaded fused weights from {self.path}")
+
+    def save(self, pipe: DiffusionPipeline) -> None:
+        """Write the fused weights to a staging folder and publish it atomically."""
+        staging_path = self.path.with_name(f"{self.path.name}.tmp-{os.getpid()}")
+        staging_path.mkdir(parents=True, exist_ok=True)
+        try:
+            for component in self.components:
+                module = getattr(pipe, component, None)
+                if module is not None:
+                    save_model(
+                        module,
+                        str(self._component_file(staging_path, component)),
+                        force_contiguous=True,
+                    )
+            os.rename(staging_path, self.path)
+            self.logger.info(f"Cached fused weights at {self.path}")
+        except OSError as e:
+            # Another process may have published the same entry first
+            self.logger.warning(f"Could not cache fused weights at {self.path}: {e}")
+        finally:
+            shutil.rmtree(staging_path, ignore_errors=True)
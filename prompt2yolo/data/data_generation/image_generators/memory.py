@@ -0,0 +1,101 @@
+from typing import Tuple
+
+import torch
+from diffusers import DiffusionPipeline
+
+# Ordered from least to most aggressive; each mode also enables the savings of the
+# modes before it (the two offload modes are alternatives to keeping weights on GPU)
+MEMORY_MODES = [
+    "none",
+    "vae_slicing",
+    "vae_tiling",
+    "attention_slicing",
+    "model_cpu_offload",
+    "sequential_cpu_offload",
+]
+
+# Conservative activation footprints (in dtype elements) for SDXL-sized models, used
+# only to rank modes in `auto`: UNet activations per latent pixel per batch item, and
+# VAE decoder activations per output pixel
+UNET_ACTIVATIONS_PER_LATENT_PIXEL = 32768
+VAE_ACTIVATIONS_PER_PIXEL = 1536
+
+
+def estimate_peak_memory(
+    mode: str,
+    weight_bytes: int,
+    largest_component_bytes: int,
+    image_size: Tuple[int, int],
+    dtype_bytes: int,
+    batch_size: int = 2,
+    vae_tile_size: int = 512,
+) -> int:
+    """
+    Estimate the peak device memory of generating one image under a memory mode.
+
+    `batch_size` is the UNet batch (2 with classifier-free guidance). VAE slicing
+    decodes one image at a time, so it only helps when several images are decoded.
+    """
+    level = MEMORY_MODES.index(mode)
+    width, height = image_size
+
+    unet_activations = (
+        (width // 8) * (height // 8) * batch_size * UNET_ACTIVATIONS_PER_LATENT_PIXEL
+    )
+    if level >= MEMORY_MODES.index("attention_slicing"):
+        unet_activations //= 2
+
+    decoded_pixels = width * height
+    if level >= MEMORY_MODES.index("vae_tiling"):
+        decoded_pixels = min(decoded_pixels, vae_tile_size * vae_tile_size)
+    vae_activations = decoded_pixels * VAE_ACTIVATIONS_PER_PIXEL
+
+    if mode == "sequential_cpu_offload":
+        resident_weights = 0  # Only the executing layer is on the device
+    elif mode == "model_cpu_offload":
+        resident_weights = largest_component_bytes
+    else:
+        resident_weights = weight_bytes
+
+    return resident_weights + max(unet_activations, vae_activations) * dtype_bytes
+
+
+def select_memory_mode(
+    free_bytes: int, headroom: float = 0.9, **estimate_kwargs
+) -> str:
+    """Return the least aggressive mode whose estimated peak fits in `free_bytes`."""
+    for mode in MEMORY_MODES:
+        if estimate_peak_memory(mode, **estimate_kwargs) <= free_bytes * headroom:
+            return mode
+    return MEMORY_MODES[-1]
+
+
+def pipeline_weight_bytes(pipe: DiffusionPipeline) -> Tuple[int, int]:
+    """Return the total and the largest per-component parameter size in bytes."""
+    component_bytes = [
+        sum(p.numel() * p.element_size() for p in module.parameters())
+        for module in pipe.components.values()
+        if isinstance(module, torch.nn.Module)
+    ]
+    return sum(component_bytes), max(component_bytes, default=0)
+
+
+def apply_memory_mode(pipe: DiffusionPipeline, mode: str, device: str) -> None:
+    """Enable the savings of `mode` and place the pipeline on `device` accordingly."""
+    if mode not in MEMORY_MODES:
+        raise ValueError(f"Unknown memory mode: {mode}")
+    level = MEMORY_MODES.index(mode)
+
+    if level >= MEMORY_MODES.index("vae_slicing"):
+        pipe.vae.enable_slicing()
+    if level >= MEMORY_MODES.index("vae_tiling"):
+        pipe.vae.enable_tiling()
+    if level >= MEMORY_MODES.index("attention_slicing"):
+        pipe.enable_attention_slicing()
+
+    if mode == "model_cpu_offload":
+        pipe.enable_model_cpu_offload(device=device)
+    elif mode == "sequential_cpu_offload":
+        pipe.enable_sequential_cpu_offload(device=device)
+    else:
+        pipe.to(device)
@@ -1,21 +1,151 @@
 import logging
 import os
+import queue
 import shutil
 import tempfile  # Import tempfile for secure temporary directory handling
-from typing import List, Optional
+import threading
+import time
+from typing import Dict, Iterator, List, Optional, Tuple
 
+import cv2
+import numpy as np
+import torch
 from dotenv import load_dotenv
 
 load_dotenv()
 
 from ultralytics import YOLO
+from ultralytics.engine.results import Results
 
 from prompt2yolo.configs import Paths, YoloLabelerConfig
+from prompt2yolo.data.data_generation.class_embedding_cache import (
+    ClassEmbeddingCache,
+    checkpoint_identity,
+)
+from prompt2yolo.data.data_generation.label_cache import LabelCache
+from prompt2yolo.data.data_generation.label_cascade import (
+    detections_to_labels,
+    extract_detections,
+    label_agreement,
+    merge_detections,
+    needs_escalation,
+)
+from prompt2yolo.data.data_generation.labeler_export import (
+    EXPORT_BACKENDS,
+    LabelerExportCache,
+    set_runtime_threads,
+    warm_up,
+)
+from prompt2yolo.data.dataset_layout import DatasetLayout
+from prompt2yolo.data.utils import write_yolo_labels
 from prompt2yolo.utils.logger import setup_logger
 from prompt2yolo.utils.s3_handler import S3Handler
 
 LOCAL_IMAGE_FOLDER = Paths().image_folder
 LOCAL_LABEL_FOLDER = Paths().label_folder
+IMAGE_EXTENSIONS = (".jpg", ".jpeg", ".png")
+
+
+def list_images(folder: str) -> List[str]:
+    """Return the sorted image paths in a flat or sharded folder."""
+    return sorted(entry.path for entry in DatasetLayout(folder).scan(IMAGE_EXTENSIONS))
+
+
+def prefetch_image_batches(
+    image_paths: List[str],
+    batch_size: int,
+    max_prefetch: int,
+    logger: logging.Logger,
+) -> Iterator[Tuple[List[str], List[np.ndarray]]]:
+    """
+    Yield (paths, BGR images) batches decoded by a background thread.
+
+    At most `max_prefetch` decoded batches are held in memory at once, so memory
+    stays constant regardless of the folder size. Unreadable images are skipped.
+    """
+    batches: queue.Queue = queue.Queue(maxsize=max_prefetch)
+    stop = threading.Event()
+    done = object()
+
+    def _put(item) -> bool:
+        while not stop.is_set():
+            try:
+                batches.put(item, timeout=0.1)
+                return True
+            except queue.Full:
+                continue
+        return False
+
+    def _decode() -> None:
+        try:
+            for start in range(0, len(image_paths), batch_size):
+                paths, images = [], []
+                for image_path in image_paths[start : start + batch_size]:
+                    image = cv2.imread(image_path)
+                    if image is None:
+                        logger.warning(f"Skipping unreadable image: {image_path}")
+                        continue
+                    paths.append(image_path)
+                    images.append(image)
+                if paths and not _put((paths, images)):
+                    return
+            _put(done)
+        except Exception as e:  # Surface decode failures in the consuming thread
+            _put(e)
+
+    thread = threading.Thread(target=_decode, name="label-prefetch", daemon=True)
+    thread.start()
+    try:
+        while True:
+            item = batches.get()
+            if item is done:
+                return
+            if isinstance(item, Exception):
+                raise item
+            yield item
+    finally:
+        stop.set()
+        thread.join()
+
+
+def load_vocabulary_model(
+    config: YoloLabelerConfig, custom_classes: List[str], logger: logging.Logger
+) -> YOLO:
+    """Load the YOLO-World checkpoint with the custom vocabulary set."""
+    model = YOLO(config.yolo_model)
+    if config.cache_class_embeddings:
+        # Skips the CLIP text encoder when this vocabulary was embedded before
+        ClassEmbeddingCache(
+            config.cache_dir,
+            checkpoint_identity(model, config.yolo_model),
+            custom_classes,
+            logger=logger,
+        ).set_classes(model)
+    else:
+        model.set_classes(custom_classes)
+    return model
+
+
+def export_labeler_model(
+    config: YoloLabelerConfig, custom_classes: List[str], logger: logging.Logger
+) -> str:
+    """
+    Return the cached `config.backend` export of the model. The PyTorch model is
+    only loaded and exported on a miss.
+    """
+    cache = LabelerExportCache(
+        config.cache_dir,
+        checkpoint_identity(None, config.yolo_model),
+        custom_classes,
+        config.image_size,
+        config.backend,
+        logger=logger,
+    )
+    cached = cache.cached_model()
+    if cached:
+        logger.info(f"Using cached {config.backend} export: {cached}")
+        return cached
+    return cache.exported_model(load_vocabulary_model(config, custom_classes, logger))
 
 
 class YoloWorldLabeler:
@@ -25,20 +155,48 @@ class YoloWorldLabeler:
         custom_classes: List[str],
         config: YoloLabelerConfig,
         logger: Optional[logging.Logger] = None,
+        model_path: Optional[str] = None,
     ) -> None:
         self.s3_handler = s3_handler
         self.custom_classes = custom_classes
         self.config = config
-        self.model = self._initialize_model()
         self.logger = logger or setup_logger()
+        self.model = self._initialize_model(model_path)
+        self.label_cache = (
+            LabelCache(
+                self.config.cache_dir, config, custom_classes, logger=self.logger
+            )
+            if config.cache_labels
+            else None
+        )
 
         # Create a secure, unique temporary directory
         self._run_path = tempfile.mkdtemp(prefix="yolo_run_")
 
-    def _initialize_model(self) -> YOLO:
+    def _initialize_model(self, model_path: Optional[str] = None) -> YOLO:
         """Private method to initialize and customize the YOLO model."""
-        model = YOLO(self.config.yolo_model)
-        model.set_classes(self.custom_classes)
+        start = time.perf_counter()
+        if self.config.backend in EXPORT_BACKENDS:
+            # Sharded workers pass the export their parent made, so only it exports
+            model_path = model_path or export_labeler_model(
+                self.config, self.custom_classes, self.logger
+            )
+            model = YOLO(model_path, task="detect")
+            warm_up(model, self.config.image_size)
+            if self.config.num_threads:
+                set_runtime_threads(
+                    model,
+                    self.config.backend,
+                    model_path,
+                    self.config.num_threads,
+                    self.logger,
+                )
+        else:
+            model = load_vocabulary_model(self.config, self.custom_classes, self.logger)
+            if self.config.num_threads:
+                torch.set_num_threads(self.config.num_threads)
+        self.startup_time = time.perf_counter() - start
+        self.logger.info(f"Labeler model ready in {self.startup_time:.2f}s")
         return model
 
     def _prepare_run_directory(self) -> None:
@@ -48,34 +206,184 @@ class YoloWorldLabeler:
             shutil.rmtree(self._run_path)
         os.makedirs(self._run_path, exist_ok=True)
 
-    def label(
-        self,
-        local_image_path: str = LOCAL_IMAGE_FOLDER,
-        output_dir: str = LOCAL_LABEL_FOLDER,
-    ) -> None:
-        self._prepare_run_directory()
+    @staticmethod
+    def extract_labels(result: Results) -> np.ndarray:
+        """Return (N, 5) YOLO labels `class x y w h` (normalized) of a prediction."""
+        return detections_to_labels(extract_detections(result))
 
-        # Run the YOLO model prediction
-        _ = self.model.predict(
-            local_image_path,
-            save=True,
-            save_txt=True,
+    def _predict(self, images: List[np.ndarray], augment: bool) -> List[Results]:
+        return self.model.predict(
+            images,
             imgsz=self.config.image_size,
             conf=self.config.conf,
             iou=self.config.iou,
             max_det=self.config.max_det,
-            augment=self.config.augment,
+            augment=augment,
             agnostic_nms=self.config.agnostic_nms,
-            project=self._run_path,
-            name="predict",
+            device=self.config.device,
+            verbose=False,
         )
 
-        # Process the output labels and upload them to S3
-        labels_path = os.path.join(self._run_path, "predict", "labels")
+    def _label_batch(
+        self, images: List[np.ndarray], first_index: int
+    ) -> Tuple[List[Results], List[np.ndarray]]:
+        """
+        Predict a batch and return (fast-pass results, final detections).
+
+        With the cascade, the fast pass runs without TTA and only uncertain images
+        are rerun with TTA and merged. A sample of the other images is also run
+        with TTA to measure how well the cascade agrees with full TTA.
+        """
+        cascade = self.config.cascade and self.config.augment
+        results = self._predict(images, augment=self.config.augment and not cascade)
+        detections = [extract_detections(result) for result in results]
+        if not cascade:
+            return results, detections
+
+        escalated = [
+            i
+            for i, image_detections in enumerate(detections)
+            if needs_escalation(
+                image_detections, self.config.conf, self.config.cascade_margin
+            )
+        ]
+        audit_every = (
+            round(1 / self.config.cascade_audit_fraction)
+            if self.config.cascade_audit_fraction
+            else 0
+        )
+        audited = [
+            i
+            for i in range(len(images))
+            if audit_every and (first_index + i) % audit_every == 0
+        ]
+        rerun = sorted(set(escalated) | set(audited))
+        if not rerun:
+            return results, detections
+
+        augmented = dict(
+            zip(
+                rerun,
+                map(
+                    extract_detections,
+                    self._predict([images[i] for i in rerun], augment=True),
+                ),
+            )
+        )
+        for i in escalated:
+            detections[i] = merge_detections(
+                detections[i],
+                augmented[i],
+                self.config.iou,
+                self.config.agnostic_nms,
+                self.config.max_det,
+            )
+        for i in audited:
+            self._agreements.append(
+                label_agreement(
+                    detections_to_labels(detections[i]),
+                    detections_to_labels(augmented[i]),
+                )
+            )
+        self._num_escalated += len(escalated)
+        return results, detections
+
+    def _log_cascade_report(self, num_images: int) -> None:
+        if not (self.config.cascade and self.config.augment and num_images):
+            return
+        self.logger.info(
+            f"TTA cascade: escalated {self._num_escalated}/{num_images} images "
+            f"({self._num_escalated / num_images:.1%})"
+        )
+        if self._agreements:
+            self.logger.info(
+                f"TTA cascade: label agreement with full TTA "
+                f"{np.mean(self._agreements):.3f} (F1 over "
+                f"{len(self._agreements)} audited images)"
+            )
+
+    @staticmethod
+    def _write_labels(image_path: str, labels: np.ndarray, output_dir: str) -> bool:
+        """Write an image's labels; like `save_txt`, skip images without detections."""
+        if len(labels) == 0:
+            return False
+        label_name = f"{os.path.splitext(os.path.basename(image_path))[0]}.txt"
+        write_yolo_labels(DatasetLayout(output_dir).writable_path(label_name), labels)
+        return True
+
+    def _apply_cached_labels(
+        self, image_paths: List[str], output_dir: str
+    ) -> Tuple[Dict[str, str], List[str], int]:
+        """Write cached labels and return (image hashes, cache misses, labeled)."""
+        image_hashes = self.label_cache.hash_images(image_paths)
+        misses, num_labeled = [], 0
+        for image_path in image_paths:
+            labels = self.label_cache.get(image_hashes[image_path])
+            if labels is None:
+                misses.append(image_path)
+            else:
+                num_labeled += self._write_labels(image_path, labels, output_dir)
+        self.logger.info(
+            f"Label cache: {len(image_paths) - len(misses)} hits, "
+            f"{len(misses)} misses"
+        )
+        return image_hashes, misses, num_labeled
+
+    def label(
+        self,
+        local_image_path: str = LOCAL_IMAGE_FOLDER,
+        output_dir: str = LOCAL_LABEL_FOLDER,
+    ) -> None:
+        self.label_images(list_images(local_image_path), output_dir)
+
+    def label_images(self, image_paths: List[str], output_dir: str) -> int:
+        """Label the given images into `output_dir`; returns the images labeled."""
         os.makedirs(output_dir, exist_ok=True)
-        for file_name in os.listdir(labels_path):
-            shutil.copy(
-                os.path.join(labels_path, file_name),
-                os.path.join(output_dir, file_name),
+        annotated_dir = os.path.join(self._run_path, "predict")
+        if self.config.save_annotated:
+            self._prepare_run_directory()
+            os.makedirs(annotated_dir, exist_ok=True)
+
+        image_hashes, num_labeled = {}, 0
+        if self.label_cache:
+            # Only images whose content or labeler settings changed reach the model
+            image_hashes, image_paths, num_labeled = self._apply_cached_labels(
+                image_paths, output_dir
             )
-        self.logger.info(f"Copied labels to {output_dir}")
+        num_images, num_processed = len(image_paths), 0
+        self._num_escalated, self._agreements = 0, []
+        next_report, start_time = 0.1, time.perf_counter()
+
+        # Decode the next batches in the background while the model runs on the
+        # current one, and write labels from the returned boxes as batches finish
+        for paths, images in prefetch_image_batches(
+            image_paths,
+            batch_size=self.config.batch_size,
+            max_prefetch=self.config.prefetch_batches,
+            logger=self.logger,
+        ):
+            results, detections = self._label_batch(images, num_processed)
+            for image_path, result, image_detections in zip(paths, results, detections):
+                image_name = os.path.basename(image_path)
+                if self.config.save_annotated:
+                    result.save(filename=os.path.join(annotated_dir, image_name))
+
+                labels = detections_to_labels(image_detections)
+                if self.label_cache:
+                    self.label_cache.put(image_hashes[image_path], labels)
+                num_labeled += self._write_labels(image_path, labels, output_dir)
+
+            num_processed += len(paths)
+            if num_processed >= next_report * num_images:
+                elapsed = time.perf_counter() - start_time
+                self.logger.info(
+                    f"Labeled {num_processed}/{num_images} images "
+                    f"({num_processed / elapsed:.1f} images/s)"
+                )
+                next_report = (int(num_processed / num_images * 10) + 1) / 10
+
+        self._log_cascade_report(num_images)
+        self.logger.info(f"Wrote labels for {num_labeled} images to {output_dir}")
+        if self.config.save_annotated:
+            self.logger.info(f"Annotated images saved to {annotated_dir}")
+        return num_labeled
@@ -0,0 +1,171 @@
+import logging
+import os
+import shutil
+from collections import Counter
+from concurrent.futures import ThreadPoolExecutor
+from typing import Dict, List, Optional, Tuple
+
+import cv2
+import numpy as np
+
+from prompt2yolo.configs import QualityGateConfig
+from prompt2yolo.data.data_generation.utils import prompt_from_image_name
+from prompt2yolo.data.dataset_layout import DatasetLayout
+from prompt2yolo.utils.logger import setup_logger
+
+# Statistics are computed at a fixed resolution so thresholds do not depend on the
+# generated image size
+ANALYSIS_SIZE = 256
+
+
+def load_analysis_inputs(image_path: str) -> Optional[Tuple[np.ndarray, np.ndarray]]:
+    """Load an image as fixed-size grayscale and HSV saturation planes."""
+    image = cv2.imread(image_path, cv2.IMREAD_COLOR)
+    if image is None:
+        return None
+    image = cv2.resize(
+        image, (ANALYSIS_SIZE, ANALYSIS_SIZE), interpolation=cv2.INTER_AREA
+    )
+    gray = cv2.cvtColor(image, cv2.COLOR_BGR2GRAY)
+    saturation = cv2.cvtColor(image, cv2.COLOR_BGR2HSV)[..., 1]
+    return gray, saturation
+
+
+def compute_quality_statistics(
+    gray: np.ndarray, saturation: np.ndarray
+) -> Dict[str, np.ndarray]:
+    """
+    Compute per-image statistics for a batch of (N, H, W) uint8 planes:
+    variance of the Laplacian (sharpness), grayscale histogram entropy in bits
+    (blank/low-contrast images score low) and mean saturation in [0, 1].
+    """
+    num_images = len(gray)
+    pixels = gray.astype(np.float32)
+    laplacian = (
+        pixels[:, :-2, 1:-1]
+        + pixels[:, 2:, 1:-1]
+        + pixels[:, 1:-1, :-2]
+        + pixels[:, 1:-1, 2:]
+        - 4 * pixels[:, 1:-1, 1:-1]
+    )
+
+    # One bincount over all images, offsetting each image into its own 256 bins
+    offsets = (np.arange(num_images) * 256)[:, None]
+    histograms = np.bincount(
+        (gray.reshape(num_images, -1) + offsets).ravel(), minlength=256 * num_images
+    ).reshape(num_images, 256)
+    probabilities = histograms / histograms.sum(axis=1, keepdims=True)
+    with np.errstate(divide="ignore", invalid="ignore"):
+        entropy = -np.nansum(probabilities * np.log2(probabilities), axis=1)
+
+    return {
+        "laplacian_variance": laplacian.reshape(num_images, -1).var(axis=1),
+        "entropy": entropy,
+        "saturation": saturation.reshape(num_images, -1).mean(axis=1) / 255.0,
+    }
+
+
+class ImageQualityGate:
+    """Drops or quarantines generated images that fail cheap quality thresholds."""
+
+    def __init__(
+        self,
+        config: QualityGateConfig,
+        quarantine_dir: Optional[str] = None,
+        logger: Optional[logging.Logger] = None,
+    ):
+        self.config = config
+        self.quarantine_dir = quarantine_dir
+        self.logger = logger or setup_logger(__name__)
+
+        if config.action not in ("drop", "quarantine"):
+            raise ValueError(f"Unknown quality gate action: {config.action}")
+        if config.action == "quarantine" and not quarantine_dir:
+            raise ValueError("A quarantine directory is required to quarantine images.")
+
+        self.thresholds = {
+            "laplacian_variance": config.min_laplacian_variance,
+            "entropy": config.min_entropy,
+            "saturation": config.min_saturation,
+        }
+
+    def _failed_checks(self, statistics: Dict[str, np.ndarray]) -> List[List[str]]:
+        num_images = len(next(iter(statistics.values())))
+        failed = [[] for _ in range(num_images)]
+        for name, threshold in self.thresholds.items():
+            if threshold is None:
+                continue
+            for i in np.flatnonzero(statistics[name] < threshold):
+                failed[i].append(name)
+        return failed
+
+    def _reject(self, image_path: str) -> None:
+        if self.config.action == "drop":
+            os.remove(image_path)
+        else:
+            os.makedirs(self.quarantine_dir, exist_ok=True)
+            shutil.move(
+                image_path,
+                os.path.join(self.quarantine_dir, os.path.basename(image_path)),
+            )
+
+    def filter(self, image_folder: str) -> Dict[str, Tuple[int, int]]:
+        """
+        Score all images in the folder in batches and reject those below any
+        threshold. Returns {prompt: (kept, rejected)} and logs it per prompt.
+        """
+        image_paths = sorted(
+            entry.path for entry in DatasetLayout(image_folder).scan((".jpg", ".png"))
+        )
+        kept, rejected, reasons = Counter(), Counter(), Counter()
+
+        with ThreadPoolExecutor(max_workers=self.config.num_workers) as executor:
+            for start in range(0, len(image_paths), self.config.batch_size):
+                batch_paths = image_paths[start : start + self.config.batch_size]
+                # OpenCV releases the GIL, so decoding and resizing overlap
+                loaded = list(executor.map(load_analysis_inputs, batch_paths))
+
+                for image_path, inputs in zip(batch_paths, loaded):
+                    if inputs is None:
+                        self.logger.warning(f"Rejecting unreadable image: {image_path}")
+                        self._reject(image_path)
+                        rejected[
+                            prompt_from_image_name(os.path.basename(image_path))
+                        ] += 1
+                valid = [
+                    (path, inputs)
+                    for path, inputs in zip(batch_paths, loaded)
+                    if inputs is not None
+                ]
+                if not valid:
+                    continue
+
+                statistics = compute_quality_statistics(
+                    np.stack([inputs[0] for _, inputs in valid]),
+                    np.stack([inputs[1] for _, inputs in valid]),
+                )
+                for (image_path, _), failed in zip(
+                    valid, self._failed_checks(statistics)
+                ):
+                    prompt = prompt_from_image_name(os.path.basename(image_path))
+                    if failed:
+                        self._reject(image_path)
+                        rejected[prompt] += 1
+                        reasons.update(failed)
+                    else:
+                        kept[prompt] += 1
+
+        report = {
+            prompt: (kept[prompt], rejected[prompt])
+            for prompt in sorted(set(kept) | set(rejected))
+        }
+        for prompt, (num_kept, num_rejected) in report.items():
+            rate = num_rejected / (num_kept + num_rejected)
+            log = self.logger.warning if num_rejected else self.logger.info
+            log(
+                f"[*] Quality gate '{prompt}': {num_rejected} rejected, "
+                f"{num_kept} kept ({rate:.1%} rejection rate)"
+            )
+        if reasons:
+            self.logger.info(f"[*] Quality gate failures by check: {dict(reasons)}")
+        return report
@@ -0,0 +1,79 @@
+import logging
+import os
+from concurrent.futures import ThreadPoolExecutor
+from typing import Dict, List, Optional
+
+import numpy as np
+
+from prompt2yolo.configs import YoloLabelerConfig
+from prompt2yolo.data.utils import write_yolo_labels
+from prompt2yolo.utils.logger import setup_logger
+from prompt2yolo.utils.utils import compute_file_hash, compute_hash
+
+# Labeler settings that change predictions; batching and debug output do not
+PREDICTION_FIELDS = (
+    "yolo_model",
+    "conf",
+    "iou",
+    "max_det",
+    "image_size",
+    "augment",
+    "agnostic_nms",
+    "backend",
+    "cascade",
+    "cascade_margin",
+)
+
+
+def labeler_config_hash(config: YoloLabelerConfig, classes: List[str]) -> str:
+    """Identify everything besides the image that determines its labels."""
+    values = [f"{name}={getattr(config, name)}" for name in PREDICTION_FIELDS]
+    if os.path.isfile(config.yolo_model):
+        # A local checkpoint may be retrained in place under the same name
+        values.append(compute_file_hash(config.yolo_model))
+    return compute_hash(*values, *classes)
+
+
+class LabelCache:
+    """
+    Persistent YOLO labels under `cache_dir/labels/<config hash>/<image hash>.txt`.
+
+    An empty file records that the image had no detections, so those images are
+    not sent to the model again either.
+    """
+
+    def __init__(
+        self,
+        cache_dir: str,
+        config: YoloLabelerConfig,
+        classes: List[str],
+        num_workers: int = 8,
+        logger: Optional[logging.Logger] = None,
+    ) -> None:
+        self.path = os.path.join(
+            cache_dir, "labels", labeler_config_hash(config, classes)[:16]
+        )
+        self.num_workers = num_workers
+        self.logger = logger or setup_logger(__name__)
+
+    def _entry(self, image_hash: str) -> str:
+        return os.path.join(self.path, image_hash[:2], f"{image_hash}.txt")
+
+    def hash_images(self, image_paths: List[str]) -> Dict[str, str]:
+        """Return {image path: content hash}, hashing files in parallel."""
+        with ThreadPoolExecutor(max_workers=self.num_workers) as executor:
+            return dict(zip(image_paths, executor.map(compute_file_hash, image_paths)))
+
+    def get(self, image_hash: str) -> Optional[np.ndarray]:
+        """Return the cached (N, 5) labels of an image, or None on a miss."""
+        entry = self._entry(image_hash)
+        if not os.path.exists(entry):
+            return None
+        if os.path.getsize(entry) == 0:
+            return np.empty((0, 5), dtype=np.float32)
+        return np.loadtxt(entry, dtype=np.float32, ndmin=2)
+
+    def put(self, image_hash: str, labels: np.ndarray) -> None:
+        entry = self._entry(image_hash)
+        os.makedirs(os.path.dirname(entry), exist_ok=True)
+        write_yolo_labels(entry, labels)
@@ -0,0 +1,70 @@
+import numpy as np
+import torch
+from torchvision.ops import batched_nms, box_convert, box_iou, nms
+from ultralytics.engine.results import Results
+
+# Detections are (N, 6) float32 rows of `class confidence x y w h`, with the box
+# normalized to the image size like YOLO labels
+
+
+def extract_detections(result: Results) -> np.ndarray:
+    boxes = result.boxes
+    if boxes is None or len(boxes) == 0:
+        return np.empty((0, 6), dtype=np.float32)
+    return np.column_stack(
+        [boxes.cls.cpu().numpy(), boxes.conf.cpu().numpy(), boxes.xywhn.cpu().numpy()]
+    ).astype(np.float32)
+
+
+def detections_to_labels(detections: np.ndarray) -> np.ndarray:
+    """Drop the confidence column, giving (N, 5) YOLO labels."""
+    return detections[:, [0, 2, 3, 4, 5]]
+
+
+def needs_escalation(detections: np.ndarray, conf: float, margin: float) -> bool:
+    """Escalate images without detections or with any detection close to `conf`."""
+    return len(detections) == 0 or bool((detections[:, 1] < conf + margin).any())
+
+
+def _xyxy(labels: np.ndarray) -> torch.Tensor:
+    return box_convert(torch.from_numpy(labels[:, -4:]), "cxcywh", "xyxy")
+
+
+def merge_detections(
+    fast: np.ndarray, augmented: np.ndarray, iou: float, agnostic: bool, max_det: int
+) -> np.ndarray:
+    """Merge the fast-pass and TTA detections of an image with NMS."""
+    detections = np.concatenate([fast, augmented])
+    if len(detections) == 0:
+        return detections
+
+    # IoU is invariant to the per-axis normalization, so NMS works on normalized boxes
+    boxes, scores = _xyxy(detections), torch.from_numpy(detections[:, 1])
+    if agnostic:
+        keep = nms(boxes, scores, iou)
+    else:
+        keep = batched_nms(boxes, scores, torch.from_numpy(detections[:, 0]), iou)
+    return detections[keep[:max_det].numpy()]
+
+
+def label_agreement(
+    labels: np.ndarray, reference: np.ndarray, iou_threshold: float = 0.5
+) -> float:
+    """
+    F1 score of `labels` against `reference`, greedily matching boxes of the same
+    class with IoU >= `iou_threshold`. Two empty label sets agree fully.
+    """
+    if len(labels) == 0 and len(reference) == 0:
+        return 1.0
+    if len(labels) == 0 or len(reference) == 0:
+        return 0.0
+
+    ious = box_iou(_xyxy(labels), _xyxy(reference)).numpy()
+    ious[labels[:, 0][:, None] != reference[:, 0][None, :]] = 0
+
+    matches = 0
+    while ious.size and ious.max() >= iou_threshold:
+        i, j = np.unravel_index(ious.argmax(), ious.shape)
+        ious[i, :], ious[:, j] = 0, 0
+        matches += 1
+    return 2 * matches / (len(labels) + len(reference))
@@ -0,0 +1,124 @@
+import glob
+import logging
+import os
+import shutil
+from typing import List, Optional
+
+import numpy as np
+from ultralytics import YOLO
+
+from prompt2yolo.utils.logger import setup_logger
+from prompt2yolo.utils.utils import compute_hash
+
+EXPORT_BACKENDS = ("onnx", "openvino")
+
+
+class LabelerExportCache:
+    """
+    Caches YOLO-World exports with the custom vocabulary baked in under
+    `cache_dir/exports/<key>`, keyed by checkpoint, class list, image size and format.
+    """
+
+    def __init__(
+        self,
+        cache_dir: str,
+        checkpoint: str,
+        classes: List[str],
+        image_size: int,
+        backend: str,
+        logger: Optional[logging.Logger] = None,
+    ) -> None:
+        if backend not in EXPORT_BACKENDS:
+            raise ValueError(f"Unsupported export backend: {backend}")
+        self.backend = backend
+        self.image_size = image_size
+        key = compute_hash(checkpoint, backend, str(image_size), *classes)[:16]
+        self.path = os.path.join(cache_dir, "exports", key)
+        self.logger = logger or setup_logger(__name__)
+
+    def _exported_model(self, directory: str) -> Optional[str]:
+        pattern = "*.onnx" if self.backend == "onnx" else "*_openvino_model"
+        matches = glob.glob(os.path.join(directory, pattern))
+        return matches[0] if matches else None
+
+    def cached_model(self) -> Optional[str]:
+        """Path of the cached export, or None on a miss."""
+        return self._exported_model(self.path)
+
+    def exported_model(self, model: YOLO) -> str:
+        """Return the cached export, exporting `model` (classes already set) on a miss."""
+        cached = self.cached_model()
+        if cached:
+            self.logger.info(f"Using cached {self.backend} export: {cached}")
+            return cached
+
+        # Ultralytics writes the export next to the checkpoint; move it into the cache
+        exported = model.export(
+            format=self.backend, imgsz=self.image_size, dynamic=True, verbose=False
+        )
+        staging_path = f"{self.path}.tmp-{os.getpid()}"
+        os.makedirs(staging_path, exist_ok=True)
+        try:
+            shutil.move(exported, staging_path)
+            os.rename(staging_path, self.path)
+            self.logger.info(f"Cached {self.backend} export at {self.path}")
+        except OSError as e:
+            if not self._exported_model(self.path):
+                raise
+            # Another process published the same export first
+            self.logger.warning(f"Could not cache export at {self.path}: {e}")
+        finally:
+            shutil.rmtree(staging_path, ignore_errors=True)
+        return self._exported_model(self.path)
+
+
+def set_runtime_threads(
+    model: YOLO,
+    backend: str,
+    model_path: str,
+    num_threads: int,
+    logger: logging.Logger,
+) -> None:
+    """
+    Rebuild the loaded ONNX Runtime session or OpenVINO compiled model with
+    `num_threads` intra-op threads. Ultralytics exposes no thread setting for
+    exported models, so this must run after the predictor has been set up.
+    """
+    autobackend = getattr(model.predictor, "model", None)
+    # AutoBackend holds the ONNX Runtime session / OpenVINO compiled model itself,
+    # flagged by `onnx` / `xml`; newer Ultralytics releases move them to `backend`
+    runtime = getattr(autobackend, "backend", autobackend)
+    flag = "onnx" if backend == "onnx" else "xml"
+    try:
+        if runtime is autobackend and not getattr(autobackend, flag, False):
+            raise AttributeError(f"the loaded labeler is not a {backend} model")
+        if backend == "onnx":
+            import onnxruntime
+
+            options = onnxruntime.SessionOptions()
+            options.intra_op_num_threads = num_threads
+            runtime.session = onnxruntime.InferenceSession(
+                model_path,
+                options,
+                providers=["CPUExecutionProvider"],
+            )
+        else:
+            import openvino as ov
+
+            runtime.ov_compiled_model = ov.Core().compile_model(
+                glob.glob(os.path.join(model_path, "*.xml"))[0],
+                "CPU",
+                {"PERFORMANCE_HINT": "LATENCY", "INFERENCE_NUM_THREADS": num_threads},
+            )
+        logger.info(f"Running the {backend} labeler with {num_threads} threads")
+    except (AttributeError, ImportError, IndexError) as e:
+        logger.warning(f"Could not set {backend} threads, using defaults: {e}")
+
+
+def warm_up(model: YOLO, image_size: int) -> None:
+    """Run one blank image so the predictor and runtime are initialized."""
+    model.predict(
+        np.zeros((image_size, image_size, 3), dtype=np.uint8),
+        imgsz=image_size,
+        verbose=False,
+    )
@@ -0,0 +1,131 @@
+import logging
+import multiprocessing
+import os
+import time
+from concurrent.futures import ProcessPoolExecutor
+from dataclasses import replace
+from typing import List, Optional, Tuple
+
+from prompt2yolo.configs import YoloLabelerConfig
+from prompt2yolo.data.data_generation.image_labeler import (
+    YoloWorldLabeler,
+    export_labeler_model,
+    list_images,
+)
+from prompt2yolo.data.data_generation.labeler_export import EXPORT_BACKENDS
+from prompt2yolo.utils.logger import setup_logger
+
+_worker_labeler: Optional[YoloWorldLabeler] = None
+
+
+def _initialize_worker(
+    custom_classes: List[str], config: YoloLabelerConfig, model_path: Optional[str]
+) -> None:
+    """Load one model per worker process, pinned to its own thread count."""
+    global _worker_labeler
+    _worker_labeler = YoloWorldLabeler(
+        s3_handler=None,
+        custom_classes=custom_classes,
+        config=config,
+        logger=setup_logger(f"{__name__}.{os.getpid()}"),
+        model_path=model_path,
+    )
+
+
+def _label_shard(image_paths: List[str], output_dir: str) -> Tuple[int, int]:
+    return len(image_paths), _worker_labeler.label_images(image_paths, output_dir)
+
+
+class ShardedYoloWorldLabeler:
+    """
+    Labels a folder with `config.num_workers` processes. Each worker loads its own
+    model with `num_threads` threads (default: an equal share of the cores) and
+    labels an interleaved shard of the images. Label names come from the distinct
+    image names and are written atomically, so workers share `output_dir` safely.
+    """
+
+    def __init__(
+        self,
+        custom_classes: List[str],
+        config: YoloLabelerConfig,
+        logger: Optional[logging.Logger] = None,
+    ) -> None:
+        if config.num_workers < 2:
+            raise ValueError("Sharded labeling requires at least two workers.")
+        self.custom_classes = custom_classes
+        self.config = config
+        self.logger = logger or setup_logger(__name__)
+        self._model_path: Optional[str] = None
+
+    def _export_model(self) -> Optional[str]:
+        """Export once in the parent so workers never race to write the same export."""
+        if self.config.backend not in EXPORT_BACKENDS:
+            return None
+        if self._model_path is None:
+            self._model_path = export_labeler_model(
+                self.config, self.custom_classes, self.logger
+            )
+        return self._model_path
+
+    def _worker_config(self, worker: int) -> YoloLabelerConfig:
+        num_threads = self.config.num_threads or max(
+            1, (os.cpu_count() or 1) // self.config.num_workers
+        )
+        device = (
+            self.config.devices[worker % len(self.config.devices)]
+            if self.config.devices
+            else self.config.device
+        )
+        return replace(
+            self.config, num_workers=1, num_threads=num_threads, device=device
+        )
+
+    def label(self, local_image_path: str, output_dir: str) -> None:
+        image_paths = list_images(local_image_path)
+        num_workers = min(self.config.num_workers, len(image_paths))
+        if num_workers == 0:
+            self.logger.info(f"No images to label in {local_image_path}")
+            return
+        os.makedirs(output_dir, exist_ok=True)
+
+        model_path = self._export_model()
+        # Interleave shards so that every worker sees a mix of prompts
+        shards = [image_paths[worker::num_workers] for worker in range(num_workers)]
+        # Spawn so workers do not inherit the parent's torch threads or CUDA state
+        context = multiprocessing.get_context("spawn")
+        executors = [
+            ProcessPoolExecutor(
+                max_workers=1,
+                mp_context=context,
+                initializer=_initialize_worker,
+                initargs=(
+                    self.custom_classes,
+                    self._worker_config(worker),
+                    model_path,
+                ),
+            )
+            for worker in range(num_workers)
+        ]
+        start = time.perf_counter()
+        try:
+            futures = [
+                executor.submit(_label_shard, shard, output_dir)
+                for executor, shard in zip(executors, shards)
+            ]
+            num_labeled = 0
+            for worker, future in enumerate(futures):
+                num_images, num_worker_labeled = future.result()
+                num_labeled += num_worker_labeled
+                self.logger.info(
+                    f"Worker {worker} labeled {num_worker_labeled}/{num_images} images"
+                )
+        finally:
+            for executor in executors:
+                executor.shutdown()
+
+        elapsed = time.perf_counter() - start
+        self.logger.info(
+            f"Wrote labels for {num_labeled} images to {output_dir} with "
+            f"{num_workers} workers in {elapsed:.1f}s "
+            f"({len(image_paths) / elapsed:.1f} images/s)"
+        )
@@ -1,3 +1,4 @@
+import os
 from typing import Dict, List
 
 from prompt2yolo.configs import Prompt
@@ -9,3 +10,8 @@ def normalize_prompt_weights(prompts: List[Dict[str, float]]) -> List[Prompt]:
         Prompt(text=prompt["text"], weight=prompt.get("weight", 1.0) / total_weight)
         for prompt in prompts
     ]
+
+
+def prompt_from_image_name(image_name: str) -> str:
+    """Recover the sanitized prompt from a generated `<prompt>_<seed>.jpg` name."""
+    return os.path.splitext(image_name)[0].rsplit("_", 1)[0]
@@ -0,0 +1,94 @@
+import hashlib
+import os
+from typing import Iterator, Optional, Tuple
+
+SHARD_MARKER = ".sharded"
+
+
+def shard_prefix(name: str) -> str:
+    """
+    Two-level hashed prefix of a file name (e.g. `ab/cd`). The hash covers the stem
+    only, so an image and its label share a prefix.
+    """
+    digest = hashlib.sha256(os.path.splitext(name)[0].encode("utf-8")).hexdigest()
+    return os.path.join(digest[:2], digest[2:4])
+
+
+def _scan_files(
+    directory: str, extensions: Optional[Tuple[str, ...]]
+) -> Iterator[os.DirEntry]:
+    try:
+        with os.scandir(directory) as entries:
+            for entry in entries:
+                if entry.name.startswith("."):
+                    continue
+                if extensions and not entry.name.lower().endswith(extensions):
+                    continue
+                if entry.is_file():
+                    yield entry
+    except FileNotFoundError:
+        return
+
+
+def _scan_dirs(directory: str) -> Iterator[str]:
+    try:
+        with os.scandir(directory) as entries:
+            for entry in entries:
+                if entry.is_dir() and not entry.name.startswith("."):
+                    yield entry.path
+    except FileNotFoundError:
+        return
+
+
+class DatasetLayout:
+    """
+    Maps file names to paths in a flat or sharded dataset folder.
+
+    A sharded folder keeps each file under a hashed prefix (`<root>/ab/cd/<name>`) so
+    that no directory grows past a few entries. Sharded folders carry a marker file,
+    so readers detect the layout when `sharded` is not given.
+    """
+
+    def __init__(self, root: str, sharded: Optional[bool] = None):
+        self.root = root
+        if sharded is None:
+            sharded = os.path.exists(os.path.join(root, SHARD_MARKER))
+        self.sharded = sharded
+
+    def prepare(self) -> "DatasetLayout":
+        """Create the folder and record its layout for later readers."""
+        os.makedirs(self.root, exist_ok=True)
+        marker = os.path.join(self.root, SHARD_MARKER)
+        if self.sharded:
+            open(marker, "a").close()
+        elif os.path.exists(marker):
+            os.remove(marker)
+        return self
+
+    def path(self, name: str) -> str:
+        if self.sharded:
+            return os.path.join(self.root, shard_prefix(name), name)
+        return os.path.join(self.root, name)
+
+    def writable_path(self, name: str) -> str:
+        """Path for `name`, with its parent directory created."""
+        path = self.path(name)
+        os.makedirs(os.path.dirname(path), exist_ok=True)
+        return path
+
+    def exists(self, name: str) -> bool:
+        return os.path.exists(self.path(name))
+
+    def scan(
+        self, extensions: Optional[Tuple[str, ...]] = None
+    ) -> Iterator[os.DirEntry]:
+        """Lazily yield the folder's files, optionally filtered by extension."""
+        if not self.sharded:
+            yield from _scan_files(self.root, extensions)
+            return
+        for first in _scan_dirs(self.root):
+            for second in _scan_dirs(first):
+                yield from _scan_files(second, extensions)
+
+    def names(self, extensions: Optional[Tuple[str, ...]] = None) -> Iterator[str]:
+        return (entry.name for entry in self.scan(extensions))
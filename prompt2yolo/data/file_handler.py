@@ -1,7 +1,11 @@
 import os
-from typing import List, Tuple
+from typing import List, Optional, Tuple
 
-from prompt2yolo.data.utils import save_visualized_image, write_label_file
+from prompt2yolo.data.utils import (
+    save_image_bytes,
+    save_visualized_image,
+    write_label_file,
+)
 
 
 class FileHandler:
@@ -16,10 +20,17 @@ class FileHandler:
         result_path: str,
         width: int,
         height: int,
+        image_bytes: Optional[bytes] = None,
     ):
-        """Saves labeled files and corresponding images."""
+        """
+        Saves labeled files and corresponding images. Images without a local copy are
+        written from `image_bytes`.
+        """
         if boxes:
             new_labels_path = os.path.join(result_path, f"{category}/labels")
             new_images_path = os.path.join(result_path, f"{category}/images")
             write_label_file(new_labels_path, image_file, boxes, width, height)
-            save_visualized_image(image_path, new_images_path)
+            if image_bytes is not None:
+                save_image_bytes(image_bytes, image_file, new_images_path)
+            else:
+                save_visualized_image(image_path, new_images_path)
@@ -0,0 +1,160 @@
+import logging
+import os
+import shutil
+import time
+from concurrent.futures import ThreadPoolExecutor
+from dataclasses import dataclass
+from typing import Dict, Iterable, List, Optional, Tuple
+
+from prompt2yolo.data.dataset_layout import DatasetLayout
+from prompt2yolo.utils.logger import setup_logger
+
+IMAGE_EXTENSIONS = (".jpg", ".png")
+# Copies are I/O bound, so use more threads than cores
+DEFAULT_NUM_WORKERS = min(32, (os.cpu_count() or 1) * 4)
+
+
+def scan_directory(
+    directory: str, extensions: Optional[Tuple[str, ...]] = None
+) -> Dict[str, os.stat_result]:
+    """
+    List a flat or sharded directory once, returning {file name: stat} of its
+    files.
+    """
+    return {
+        entry.name: entry.stat() for entry in DatasetLayout(directory).scan(extensions)
+    }
+
+
+def label_name(image_name: str) -> str:
+    return os.path.splitext(image_name)[0] + ".txt"
+
+
+@dataclass
+class MaterializationStats:
+    files: int = 0
+    bytes: int = 0
+    seconds: float = 0.0
+
+    def __str__(self) -> str:
+        seconds = max(self.seconds, 1e-9)
+        return (
+            f"{self.files} files ({self.bytes / 2**20:.1f} MiB) in {self.seconds:.2f}s "
+            f"({self.files / seconds:.0f} files/s, "
+            f"{self.bytes / 2**20 / seconds:.1f} MiB/s)"
+        )
+
+
+class FileMaterializer:
+    """
+    Copies image/label pairs into YOLO `images`/`labels` folders.
+
+    The source folders are scanned once with `os.scandir`, images are paired with
+    their labels in memory, and copies run on a bounded thread pool. Destinations
+    get the same flat or sharded layout as the image folder.
+    """
+
+    def __init__(
+        self,
+        image_folder: str,
+        label_folder: str,
+        num_workers: int = DEFAULT_NUM_WORKERS,
+        logger: Optional[logging.Logger] = None,
+    ):
+        self.image_folder = image_folder
+        self.label_folder = label_folder
+        self.num_workers = num_workers
+        self.logger = logger or setup_logger(__name__)
+        self.image_layout = DatasetLayout(image_folder)
+        self.label_layout = DatasetLayout(label_folder)
+        self.images = scan_directory(image_folder, IMAGE_EXTENSIONS)
+        self.labels = scan_directory(label_folder, (".txt",))
+
+    def label_for(self, image_name: str) -> Optional[str]:
+        """Name of the image's label file, or None if it has no label."""
+        name = label_name(image_name)
+        return name if name in self.labels else None
+
+    def _copy_jobs(
+        self, destinations: Dict[str, Iterable[str]]
+    ) -> List[Tuple[str, str, int]]:
+        jobs = []
+        for destination, image_names in destinations.items():
+            image_layout = DatasetLayout(
+                os.path.join(destination, "images"), self.image_layout.sharded
+            ).prepare()
+            label_layout = DatasetLayout(
+                os.path.join(destination, "labels"), self.image_layout.sharded
+            ).prepare()
+            for image_name in image_names:
+                jobs.append(
+                    (
+                        self.image_layout.path(image_name),
+                        image_layout.writable_path(image_name),
+                        self.images[image_name].st_size,
+                    )
+                )
+                label = self.label_for(image_name)
+                if label:
+                    jobs.append(
+                        (
+                            self.label_layout.path(label),
+                            label_layout.writable_path(label),
+                            self.labels[label].st_size,
+                        )
+                    )
+        return jobs
+
+    def materialize(
+        self, destinations: Dict[str, Iterable[str]]
+    ) -> MaterializationStats:
+        """
+        Copy the given images, and their labels when present, into each destination
+        root's `images` and `labels` folders ({destination root: image names}).
+        """
+        return copy_files(self._copy_jobs(destinations), self.num_workers, self.logger)
+
+
+def _copy_file(source: str, target: str) -> None:
+    """Copy a file, recreating symbolic links instead of copying their targets."""
+    if os.path.islink(source):
+        if os.path.lexists(target):
+            os.remove(target)
+        os.symlink(os.readlink(source), target)
+    else:
+        shutil.copyfile(source, target)
+
+
+def copy_files(
+    jobs: List[Tuple[str, str, int]],
+    num_workers: int = DEFAULT_NUM_WORKERS,
+    logger: Optional[logging.Logger] = None,
+) -> MaterializationStats:
+    """Run (source, target, size) copies on a thread pool and log throughput."""
+    start = time.perf_counter()
+    with ThreadPoolExecutor(max_workers=num_workers) as executor:
+        # Consume the iterator so that copy errors are raised here
+        list(executor.map(lambda job: _copy_file(job[0], job[1]), jobs))
+    stats = MaterializationStats(
+        files=len(jobs),
+        bytes=sum(size for _, _, size in jobs),
+        seconds=time.perf_counter() - start,
+    )
+    (logger or setup_logger(__name__)).info(f"[*] Materialized {stats}")
+    return stats
+
+
+def copy_directory_files(
+    source: str,
+    target: str,
+    num_workers: int = DEFAULT_NUM_WORKERS,
+    logger: Optional[logging.Logger] = None,
+) -> MaterializationStats:
+    """Copy the files of one directory into another in parallel, keeping links."""
+    source_layout = DatasetLayout(source)
+    target_layout = DatasetLayout(target, source_layout.sharded).prepare()
+    jobs = [
+        (entry.path, target_layout.writable_path(entry.name), entry.stat().st_size)
+        for entry in source_layout.scan()
+    ]
+    return copy_files(jobs, num_workers, logger)
@@ -0,0 +1,134 @@
+import logging
+import os
+import shutil
+from concurrent.futures import ThreadPoolExecutor
+from typing import Iterable, List, Optional, Tuple
+
+from prompt2yolo.data.dataset_layout import DatasetLayout
+from prompt2yolo.data.file_materializer import DEFAULT_NUM_WORKERS, label_name
+from prompt2yolo.utils.logger import setup_logger
+from prompt2yolo.utils.utils import compute_file_hash, compute_hash
+
+
+def split_list_path(yolo_data_folder: str, split: str) -> str:
+    return os.path.join(yolo_data_folder, f"{split}.txt")
+
+
+def split_source(yolo_data_folder: str, split: str) -> str:
+    """
+    Path to reference a split from a dataset config: its list file when the split is
+    virtual, otherwise its image folder.
+    """
+    list_path = split_list_path(yolo_data_folder, split)
+    if os.path.exists(list_path):
+        return list_path
+    return os.path.join(yolo_data_folder, split, "images")
+
+
+def read_image_list(list_path: str) -> List[str]:
+    with open(list_path, "r") as file:
+        return [line.strip() for line in file if line.strip()]
+
+
+def write_image_list(list_path: str, image_paths: Iterable[str]) -> None:
+    tmp_path = f"{list_path}.tmp"
+    with open(tmp_path, "w") as file:
+        file.writelines(f"{path}\n" for path in image_paths)
+    os.replace(tmp_path, list_path)
+
+
+class ImageStore:
+    """
+    Project-wide content-addressed store of image/label pairs.
+
+    Files are named by the hash of the image and label contents and live in sibling
+    `images` and `labels` folders, so YOLO finds each label from its image path.
+    Keying on both files keeps a relabeled image from changing earlier iterations.
+    A new store is flat or sharded as requested; an existing store keeps its layout.
+    """
+
+    def __init__(
+        self,
+        root: str,
+        sharded: bool = False,
+        num_workers: int = DEFAULT_NUM_WORKERS,
+        logger: Optional[logging.Logger] = None,
+    ):
+        self.root = os.path.abspath(root)
+        self.image_dir = os.path.join(self.root, "images")
+        self.label_dir = os.path.join(self.root, "labels")
+        self.num_workers = num_workers
+        self.logger = logger or setup_logger(__name__)
+        if os.path.isdir(self.image_dir):
+            sharded = DatasetLayout(self.image_dir).sharded
+        self.image_layout = DatasetLayout(self.image_dir, sharded).prepare()
+        self.label_layout = DatasetLayout(self.label_dir, sharded).prepare()
+
+    def label_path(self, store_image_path: str) -> str:
+        return self.label_layout.path(label_name(os.path.basename(store_image_path)))
+
+    @staticmethod
+    def _store_file(source: str, target: str) -> bool:
+        if os.path.exists(target):
+            return False
+        tmp_path = f"{target}.tmp-{os.getpid()}"
+        shutil.copyfile(source, tmp_path)
+        os.replace(tmp_path, target)
+        return True
+
+    def _add(self, image_path: str, label_path: Optional[str]) -> Tuple[str, bool]:
+        key = compute_hash(
+            compute_file_hash(image_path),
+            compute_file_hash(label_path) if label_path else "",
+        )
+        extension = os.path.splitext(image_path)[1].lower()
+        store_image_path = self.image_layout.writable_path(f"{key}{extension}")
+        # The label goes in first so that a stored image always has its label
+        if label_path:
+            store_label_path = self.label_path(store_image_path)
+            os.makedirs(os.path.dirname(store_label_path), exist_ok=True)
+            self._store_file(label_path, store_label_path)
+        return store_image_path, self._store_file(image_path, store_image_path)
+
+    def add(self, image_path: str, label_path: Optional[str] = None) -> str:
+        """Store an image and its optional label; return the stored image path."""
+        return self._add(image_path, label_path)[0]
+
+    def add_all(self, pairs: List[Tuple[str, Optional[str]]]) -> List[str]:
+        """Store (image, label) pairs in parallel, preserving their order."""
+        with ThreadPoolExecutor(max_workers=self.num_workers) as executor:
+            results = list(executor.map(lambda pair: self._add(*pair), pairs))
+        if pairs:
+            self.logger.info(
+                f"[*] Image store: {sum(new for _, new in results)} new of "
+                f"{len(pairs)} images added to {self.root}"
+            )
+        return [store_path for store_path, _ in results]
+
+    def link(self, store_image_path: str, destination: str, image_name: str) -> None:
+        """
+        Link a stored image, and its label if any, into a destination's `images` and
+        `labels` folders under the image's original name, following their layout.
+        """
+        links = [
+            (
+                store_image_path,
+                DatasetLayout(os.path.join(destination, "images")).writable_path(
+                    image_name
+                ),
+            )
+        ]
+        store_label_path = self.label_path(store_image_path)
+        if os.path.exists(store_label_path):
+            links.append(
+                (
+                    store_label_path,
+                    DatasetLayout(os.path.join(destination, "labels")).writable_path(
+                        label_name(image_name)
+                    ),
+                )
+            )
+        for target, link_path in links:
+            if os.path.lexists(link_path):
+                os.remove(link_path)
+            os.symlink(target, link_path)
@@ -1,4 +1,4 @@
-from typing import List, Tuple
+from typing import Iterable, List, Tuple
 
 
 class LabelLoader:
@@ -9,14 +9,21 @@ class LabelLoader:
         label_path: str, width: int, height: int
     ) -> List[Tuple[int, int, int, int, int]]:
         """Loads bounding boxes from a label file and converts normalized coordinates to pixel coordinates."""
-        boxes = []
         with open(label_path, "r") as label_file:
-            for line in label_file:
-                class_id, x, y, w, h = map(float, line.strip().split())
-                class_id = int(class_id)
-                x1 = int((x - w / 2) * width)
-                y1 = int((y - h / 2) * height)
-                x2 = int((x + w / 2) * width)
-                y2 = int((y + h / 2) * height)
-                boxes.append((class_id, x1, y1, x2, y2))
+            return LabelLoader.parse_labels(label_file, width, height)
+
+    @staticmethod
+    def parse_labels(
+        lines: Iterable[str], width: int, height: int
+    ) -> List[Tuple[int, int, int, int, int]]:
+        """Converts YOLO label lines to pixel-coordinate bounding boxes."""
+        boxes = []
+        for line in lines:
+            class_id, x, y, w, h = map(float, line.strip().split())
+            class_id = int(class_id)
+            x1 = int((x - w / 2) * width)
+            y1 = int((y - h / 2) * height)
+            x2 = int((x + w / 2) * width)
+            y2 = int((y + h / 2) * height)
+            boxes.append((class_id, x1, y1, x2, y2))
         return boxes
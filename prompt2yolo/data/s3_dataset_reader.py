@@ -0,0 +1,130 @@
+import logging
+import os
+from collections import deque
+from concurrent.futures import ThreadPoolExecutor
+from dataclasses import dataclass
+from typing import Dict, Iterator, Optional
+
+import cv2
+import numpy as np
+
+from prompt2yolo.configs import S3TransferConfig
+from prompt2yolo.data.file_materializer import IMAGE_EXTENSIONS
+from prompt2yolo.utils.logger import setup_logger
+from prompt2yolo.utils.s3_clients import get_s3_client
+from prompt2yolo.utils.s3_listing import iter_objects
+
+DEFAULT_PREFETCH = 32
+
+
+@dataclass
+class DatasetSample:
+    name: str  # Image file name, e.g. `a_cat_1.jpg`
+    data: bytes  # Encoded image
+    image: Optional[np.ndarray]  # Decoded BGR image; None when decoding is disabled
+    label: Optional[bytes]  # YOLO label file; None when the image has no label
+
+
+class S3DatasetReader:
+    """
+    Iterates over the images of an S3 prefix paired with their labels, without a local
+    copy. Images are fetched by a pool of workers at most `prefetch` samples ahead of
+    the consumer, so the first samples arrive after one listing page and memory stays
+    bounded. Images and labels are paired by file stem at any depth, so flat and
+    sharded uploads both work.
+    """
+
+    def __init__(
+        self,
+        s3_image_folder: str,
+        s3_label_folder: Optional[str] = None,
+        decode: bool = True,
+        prefetch: int = DEFAULT_PREFETCH,
+        transfer_config: Optional[S3TransferConfig] = None,
+        logger: Optional[logging.Logger] = None,
+    ):
+        if prefetch < 1:
+            raise ValueError(f"prefetch must be at least 1, but got {prefetch}")
+        self.bucket_name = os.getenv("AWS_S3_BUCKET_NAME")
+        if not self.bucket_name:
+            raise ValueError("Missing AWS_S3_BUCKET_NAME in .env.")
+
+        self.s3_image_folder = s3_image_folder.rstrip("/")
+        self.s3_label_folder = s3_label_folder and s3_label_folder.rstrip("/")
+        self.decode = decode
+        self.prefetch = prefetch
+        self.transfer_config = transfer_config or S3TransferConfig()
+        self.logger = logger or setup_logger(__name__)
+        self.s3_client = get_s3_client(
+            max_pool_connections=self.transfer_config.max_pool_connections
+        )
+
+    def _label_keys(self) -> Dict[str, str]:
+        """Label keys by file stem. Keys are small, so they are listed up front."""
+        if not self.s3_label_folder:
+            return {}
+        return {
+            os.path.splitext(os.path.basename(obj["Key"]))[0]: obj["Key"]
+            for obj in iter_objects(
+                self.s3_client,
+                self.bucket_name,
+                f"{self.s3_label_folder}/",
+                suffixes=(".txt",),
+            )
+        }
+
+    def _get(self, key: str) -> bytes:
+        response = self.s3_client.get_object(Bucket=self.bucket_name, Key=key)
+        return response["Body"].read()
+
+    def _fetch(self, image_key: str, label_key: Optional[str]) -> DatasetSample:
+        data = self._get(image_key)
+        image = None
+        if self.decode:
+            image = cv2.imdecode(np.frombuffer(data, np.uint8), cv2.IMREAD_COLOR)
+            if image is None:
+                raise ValueError(f"Unable to decode image: {image_key}")
+        return DatasetSample(
+            name=os.path.basename(image_key),
+            data=data,
+            image=image,
+            label=self._get(label_key) if label_key else None,
+        )
+
+    def __iter__(self) -> Iterator[DatasetSample]:
+        label_keys = self._label_keys()
+        image_objects = iter_objects(
+            self.s3_client,
+            self.bucket_name,
+            f"{self.s3_image_folder}/",
+            suffixes=IMAGE_EXTENSIONS,
+        )
+
+        executor = ThreadPoolExecutor(
+            max_workers=min(self.transfer_config.max_concurrency, self.prefetch)
+        )
+        pending = deque()
+        try:
+            for obj in image_objects:
+                stem = os.path.splitext(os.path.basename(obj["Key"]))[0]
+                pending.append(
+                    (
+                        obj["Key"],
+                        executor.submit(self._fetch, obj["Key"], label_keys.get(stem)),
+                    )
+                )
+                if len(pending) >= self.prefetch:
+                    yield from self._next_sample(pending)
+            while pending:
+                yield from self._next_sample(pending)
+        finally:
+            # Also reached when the consumer stops early
+            executor.shutdown(wait=False, cancel_futures=True)
+
+    def _next_sample(self, pending: deque) -> Iterator[DatasetSample]:
+        """Yield the oldest pending sample in listing order, skipping failures."""
+        key, future = pending.popleft()
+        try:
+            yield future.result()
+        except Exception as e:
+            self.logger.error(f"Failed to fetch {key}: {e}")
@@ -1,10 +1,19 @@
 import os
 import shutil
-from typing import List, Tuple
+import threading
+import uuid
+from typing import List, Optional, Set, Tuple
+
+import numpy as np
 
 from prompt2yolo.utils.logger import setup_logger
 
 LOGGER = setup_logger(__name__)
+# Directories reset by this process are moved here, next to the directory
+TRASH_FOLDER = ".trash"
+# Trash paths being deleted by this process, which startup purges must skip
+_PENDING_TRASH: Set[str] = set()
+_PENDING_TRASH_LOCK = threading.Lock()
 
 
 def write_label_file(
@@ -39,6 +48,22 @@ def write_label_file(
         LOGGER.error(f"Failed to write label file for {image_file}: {e}")
 
 
+def write_yolo_labels(label_file_path: str, labels: np.ndarray) -> None:
+    """
+    Write (N, 5) rows of `class x_center y_center width height` (normalized).
+
+    The file is written under a process-private name and renamed into place, so
+    concurrent writers and readers never see a partial label file.
+    """
+    tmp_path = f"{label_file_path}.tmp-{os.getpid()}"
+    with open(tmp_path, "w") as label_file:
+        for class_id, *box in labels:
+            label_file.write(
+                f"{int(class_id)} " + " ".join(f"{v:g}" for v in box) + "\n"
+            )
+    os.replace(tmp_path, label_file_path)
+
+
 def save_visualized_image(image_file: str, images_path: str) -> None:
     os.makedirs(images_path, exist_ok=True)
     output_image_path = os.path.join(images_path, os.path.basename(image_file))
@@ -51,12 +76,83 @@ def save_visualized_image(image_file: str, images_path: str) -> None:
         )
 
 
-def clean_directory(dir_path: str, logger):
-    """Clean the specified directory by removing all its contents."""
-    if os.path.exists(dir_path):
-        logger.info(f"Cleaning directory: {dir_path}")
-        shutil.rmtree(dir_path)  # Remove all contents
-        os.makedirs(dir_path)  # Recreate the directory
-    else:
+def save_image_bytes(image_bytes: bytes, image_file: str, images_path: str) -> None:
+    """Write an encoded image that has no local copy, e.g. one streamed from S3."""
+    os.makedirs(images_path, exist_ok=True)
+    output_image_path = os.path.join(images_path, image_file)
+    with open(output_image_path, "wb") as f:
+        f.write(image_bytes)
+    LOGGER.info(f"Image file saved: {output_image_path}")
+
+
+def _delete_in_background(path: str) -> threading.Thread:
+    with _PENDING_TRASH_LOCK:
+        _PENDING_TRASH.add(path)
+
+    def delete():
+        shutil.rmtree(path, ignore_errors=True)
+        with _PENDING_TRASH_LOCK:
+            _PENDING_TRASH.discard(path)
+
+    # Not a daemon, so that the interpreter finishes the deletion before exiting
+    thread = threading.Thread(target=delete, name=f"delete-{os.path.basename(path)}")
+    thread.start()
+    return thread
+
+
+def purge_trash(parent_dir: str, logger=None) -> List[threading.Thread]:
+    """
+    Delete, in the background, trash that earlier resets in `parent_dir` left behind,
+    e.g. because the process was killed before the deletion finished.
+    """
+    trash_dir = os.path.join(parent_dir, TRASH_FOLDER)
+    if not os.path.isdir(trash_dir):
+        return []
+    with _PENDING_TRASH_LOCK:
+        leftovers = [
+            entry.path
+            for entry in os.scandir(trash_dir)
+            if entry.path not in _PENDING_TRASH
+        ]
+    if leftovers:
+        (logger or LOGGER).info(
+            f"Deleting {len(leftovers)} leftover trash folders in {trash_dir}"
+        )
+    return [_delete_in_background(path) for path in leftovers]
+
+
+def reset_directory(dir_path: str, logger=None) -> Optional[threading.Thread]:
+    """
+    Replace a directory with an empty one without waiting for its contents to be
+    deleted: the directory is renamed into a sibling trash folder, recreated, and
+    the trash is deleted in a background thread, which is returned.
+    """
+    logger = logger or LOGGER
+    dir_path = os.path.abspath(dir_path)
+    parent_dir = os.path.dirname(dir_path)
+    purge_trash(parent_dir, logger)
+    if not os.path.exists(dir_path):
         logger.info(f"Directory does not exist, creating: {dir_path}")
         os.makedirs(dir_path)
+        return None
+
+    trash_dir = os.path.join(parent_dir, TRASH_FOLDER)
+    trash_path = os.path.join(
+        trash_dir, f"{os.path.basename(dir_path)}-{uuid.uuid4().hex}"
+    )
+    try:
+        os.makedirs(trash_dir, exist_ok=True)
+        os.rename(dir_path, trash_path)
+    except OSError as e:
+        logger.warning(f"Could not move {dir_path} to trash ({e}); deleting in place")
+        shutil.rmtree(dir_path)
+        os.makedirs(dir_path)
+        return None
+    os.makedirs(dir_path)
+    logger.info(f"Reset directory: {dir_path} (old contents deleted in background)")
+    return _delete_in_background(trash_path)
+
+
+def clean_directory(dir_path: str, logger):
+    """Clean the specified directory by removing all its contents."""
+    reset_directory(dir_path, logger)
@@ -1,12 +1,15 @@
 import logging
 import os
-from typing import Dict, List, Optional, Tuple
+from functools import partial
+from typing import Dict, Iterable, List, Optional, Tuple
 
 import cv2
 import numpy as np
 
+from prompt2yolo.data.dataset_layout import DatasetLayout
 from prompt2yolo.data.file_handler import FileHandler
 from prompt2yolo.data.label_loader import LabelLoader
+from prompt2yolo.data.s3_dataset_reader import DatasetSample
 from prompt2yolo.enums import Category
 from prompt2yolo.evaluation.label_categorizer import LabelCategorizer
 from prompt2yolo.evaluation.prompt_weight_calculator import PromptWeightCalculator
@@ -31,6 +34,10 @@ class LabelEvaluator:
         self.images_folder = images_folder
         self.ground_truth_labels_folder = ground_truth_labels_folder
         self.model_detect_labels_folder = model_detect_labels_folder
+        # Each folder may be flat or sharded
+        self.image_layout = DatasetLayout(images_folder)
+        self.ground_truth_layout = DatasetLayout(ground_truth_labels_folder)
+        self.model_detect_layout = DatasetLayout(model_detect_labels_folder)
         self.result_path = result_path
         self.label_categorizer = LabelCategorizer(iou_threshold)
         self.prompt_weight_calculator = prompt_weight_calculator
@@ -41,14 +48,46 @@ class LabelEvaluator:
     def process_single_image(self, image_file: str) -> None:
         image = self._load_image(image_file)
         gt_boxes, det_boxes, width, height = self._load_boxes(image_file, image.shape)
+        self._evaluate(image_file, gt_boxes, det_boxes, width, height)
+
+    def process_sample(self, sample: DatasetSample) -> None:
+        """Evaluate an image streamed with its ground truth labels, e.g. from S3."""
+        if sample.image is None:
+            raise ValueError(f"Sample {sample.name} was read without decoding")
+        height, width = sample.image.shape[:2]
+        gt_boxes = (
+            self.label_loader.parse_labels(
+                sample.label.decode("utf-8").splitlines(), width, height
+            )
+            if sample.label
+            else []
+        )
+        if not gt_boxes:
+            self.logger.info(f"No ground truth labels for {sample.name}")
+        det_boxes = self._load_detection_boxes(sample.name, width, height)
+        self._evaluate(
+            sample.name, gt_boxes, det_boxes, width, height, image_bytes=sample.data
+        )
+
+    def _evaluate(
+        self,
+        image_file: str,
+        gt_boxes: List[BoundingBox],
+        det_boxes: List[BoundingBox],
+        width: int,
+        height: int,
+        image_bytes: Optional[bytes] = None,
+    ) -> None:
         tps, fps, fns = self.label_categorizer.categorize(gt_boxes, det_boxes)
         self.prompt_weight_calculator.update_counts(fps, det_boxes, image_file)
         category, boxes = self._decide_category(tps, fps, fns)
-        self._save_image_and_boxes(category, image_file, boxes, width, height)
+        self._save_image_and_boxes(
+            category, image_file, boxes, width, height, image_bytes
+        )
         self.logger.info(f"Processed {image_file}")
 
     def _load_image(self, image_file: str) -> np.ndarray:
-        image_path = os.path.join(self.images_folder, image_file)
+        image_path = self.image_layout.path(image_file)
         image = cv2.imread(image_path)
         if image is None:
             raise ValueError(f"Unable to read image: {image_path}")
@@ -58,12 +97,8 @@ class LabelEvaluator:
         self, image_file: str, shape: Tuple[int, int, int]
     ) -> Tuple[List[BoundingBox], List[BoundingBox], int, int]:
         height, width, _ = shape
-        gt_label_path = os.path.join(
-            self.ground_truth_labels_folder, image_file.replace(".jpg", ".txt")
-        )
-        det_label_path = os.path.join(
-            self.model_detect_labels_folder, image_file.replace(".jpg", ".txt")
-        )
+        label_file = image_file.replace(".jpg", ".txt")
+        gt_label_path = self.ground_truth_layout.path(label_file)
 
         gt_boxes = (
             self.label_loader.load_labels(gt_label_path, width, height)
@@ -73,6 +108,15 @@ class LabelEvaluator:
         if not gt_boxes:
             self.logger.info(f"No ground truth labels for {image_file}")
 
+        det_boxes = self._load_detection_boxes(image_file, width, height)
+        return gt_boxes, det_boxes, width, height
+
+    def _load_detection_boxes(
+        self, image_file: str, width: int, height: int
+    ) -> List[BoundingBox]:
+        det_label_path = self.model_detect_layout.path(
+            image_file.replace(".jpg", ".txt")
+        )
         det_boxes = (
             self.label_loader.load_labels(det_label_path, width, height)
             if os.path.exists(det_label_path)
@@ -80,8 +124,7 @@ class LabelEvaluator:
         )
         if not det_boxes:
             self.logger.warning(f"No detection labels for {image_file}")
-
-        return gt_boxes, det_boxes, width, height
+        return det_boxes
 
     def _decide_category(
         self, tps: List[BoundingBox], fps: List[BoundingBox], fns: List[BoundingBox]
@@ -101,8 +144,9 @@ class LabelEvaluator:
         boxes: List[BoundingBox],
         width: int,
         height: int,
+        image_bytes: Optional[bytes] = None,
     ) -> None:
-        image_path = os.path.join(self.images_folder, image_file)
+        image_path = self.image_layout.path(image_file)
         self.file_handler.save_labels_and_images(
             category.value,
             image_path,
@@ -111,16 +155,36 @@ class LabelEvaluator:
             self.result_path,
             width,
             height,
+            image_bytes=image_bytes,
         )
 
-    def process_all_images(self) -> None:
-        for image_file in os.listdir(self.images_folder):
+    def process_all_images(
+        self, samples: Optional[Iterable[DatasetSample]] = None
+    ) -> int:
+        """
+        Evaluate the images in the local images folder, or the given `samples` (e.g. an
+        `S3DatasetReader`) as they arrive. Returns the number of images seen.
+        """
+        if samples is not None:
+            jobs = (
+                (sample.name, partial(self.process_sample, sample))
+                for sample in samples
+            )
+        else:
+            jobs = (
+                (image_file, partial(self.process_single_image, image_file))
+                for image_file in self.image_layout.names()
+            )
+        num_images = 0
+        for image_file, process in jobs:
+            num_images += 1
             try:
-                self.process_single_image(image_file)
+                process()
             except FileNotFoundError:
                 self.logger.warning(f"File not found: {image_file}")
             except Exception as e:
                 self.logger.error(f"Error processing {image_file}: {e}")
+        return num_images
 
     def calculate_prompt_weights(self) -> Dict[str, float]:
         return self.prompt_weight_calculator.calculate_weights()
@@ -5,16 +5,23 @@ from dotenv import load_dotenv
 
 from prompt2yolo.configs import ImageGeneratorConfig, Paths, YoloLabelerConfig
 from prompt2yolo.data.data_generation.data_splitter import DataSplitter
+from prompt2yolo.data.data_generation.image_deduplicator import ImageDeduplicator
 from prompt2yolo.data.data_generation.image_generators import GeneratorFactory
 from prompt2yolo.data.data_generation.image_labeler import YoloWorldLabeler
+from prompt2yolo.data.data_generation.image_quality_gate import ImageQualityGate
+from prompt2yolo.data.data_generation.sharded_labeler import ShardedYoloWorldLabeler
 from prompt2yolo.data.data_generation.utils import normalize_prompt_weights
-from prompt2yolo.data.utils import clean_directory
+from prompt2yolo.data.dataset_layout import DatasetLayout
+from prompt2yolo.data.utils import purge_trash, reset_directory
 from prompt2yolo.utils.logger import setup_logger
 from prompt2yolo.utils.s3_handler import S3Handler
 from prompt2yolo.utils.utils import load_yaml_config
 
 load_dotenv()
 
+# Seconds a LoRA checkpoint folder listing is reused
+LISTING_TTL_SECONDS = 60.0
+
 
 def parse_args():
     """Parse command-line arguments."""
@@ -71,9 +78,16 @@ def main():
         image_generator_config.test_ratio = 0
 
     # Initialize S3Handler
-    lora_s3_path = f"model_checkpoints/{image_generator_config.generator}"
+    lora_checkpoint = (
+        image_generator_config.lora_checkpoint or image_generator_config.generator
+    )
+    lora_s3_path = f"model_checkpoints/{lora_checkpoint}"
+    # The listing logged below is reused when the generator downloads the checkpoint
     s3_handler = S3Handler(
-        s3_folder=lora_s3_path, local_dir=args.local_dir, logger=logger
+        s3_folder=lora_s3_path,
+        local_dir=args.local_dir,
+        logger=logger,
+        listing_ttl=LISTING_TTL_SECONDS,
     )
     os.makedirs(s3_handler.local_dir, exist_ok=True)
     logger.info(f"Using local directory: {s3_handler.local_dir}")
@@ -88,8 +102,12 @@ def main():
         local_data_path=os.getenv("LOCAL_DATA_PATH"), iteration=args.iteration
     )
 
-    clean_directory(paths.image_folder, logger)
-    clean_directory(paths.label_folder, logger)
+    # Delete trash that resets of an interrupted earlier run left behind
+    purge_trash(paths.local_data_path, logger)
+    reset_directory(paths.image_folder, logger)
+    reset_directory(paths.label_folder, logger)
+    DatasetLayout(paths.image_folder, paths.sharded_layout).prepare()
+    DatasetLayout(paths.label_folder, paths.sharded_layout).prepare()
     generator = GeneratorFactory.get_generator(
         s3_handler=s3_handler, config=image_generator_config
     )
@@ -102,13 +120,38 @@ def main():
             f"Generated images for prompt: '{prompt.text}' with weight: {prompt.weight}"
         )
 
+    # Reject blank, low-contrast or blurred images before they reach the index below
+    if image_generator_config.quality_gate.enabled:
+        ImageQualityGate(
+            config=image_generator_config.quality_gate,
+            quarantine_dir=os.path.join(paths.quarantine_folder, "rejected"),
+            logger=logger,
+        ).filter(paths.image_folder)
+
+    # Drop near-duplicate images before they are labeled, uploaded and trained on
+    if image_generator_config.deduplication.enabled:
+        ImageDeduplicator(
+            index_path=paths.dedup_index_path,
+            config=image_generator_config.deduplication,
+            iteration=paths.iteration,
+            quarantine_dir=os.path.join(paths.quarantine_folder, "duplicates"),
+            logger=logger,
+        ).deduplicate(paths.image_folder)
+
     # Label images
-    image_labeler = YoloWorldLabeler(
-        s3_handler=s3_handler,
-        custom_classes=input_config.get("classes"),
-        config=image_labeler_config,
-        logger=logger,
-    )
+    if image_labeler_config.num_workers > 1:
+        image_labeler = ShardedYoloWorldLabeler(
+            custom_classes=input_config.get("classes"),
+            config=image_labeler_config,
+            logger=logger,
+        )
+    else:
+        image_labeler = YoloWorldLabeler(
+            s3_handler=s3_handler,
+            custom_classes=input_config.get("classes"),
+            config=image_labeler_config,
+            logger=logger,
+        )
     image_labeler.label(
         local_image_path=paths.image_folder, output_dir=paths.label_folder
     )
@@ -120,6 +163,8 @@ def main():
         val_ratio=image_generator_config.val_ratio,
         test_ratio=image_generator_config.test_ratio,
         logger=logger,
+        incremental=image_generator_config.incremental_split,
+        virtual=image_generator_config.virtual_splits,
     ).split()
 
 
@@ -0,0 +1,151 @@
+import argparse
+import itertools
+import tempfile
+import time
+from dataclasses import replace
+
+from dotenv import load_dotenv
+
+from prompt2yolo.configs import AccelerationConfig, ImageGeneratorConfig
+from prompt2yolo.data.data_generation.image_generators import GeneratorFactory
+from prompt2yolo.data.dataset_layout import DatasetLayout
+from prompt2yolo.utils.logger import setup_logger
+
+load_dotenv()
+
+
+def parse_args():
+    """Parse command-line arguments."""
+    parser = argparse.ArgumentParser(description="Image generator throughput benchmark")
+    parser.add_argument(
+        "--generator",
+        type=str,
+        default="cpu",
+        choices=["realtek", "cpu"],
+        help="Generator type to benchmark. Options: 'realtek' or 'cpu' "
+        "(Pixart needs its LoRA checkpoint from S3)",
+    )
+    parser.add_argument(
+        "--model_path",
+        type=str,
+        default="hf-internal-testing/tiny-stable-diffusion-xl-pipe",
+        help="Diffusion model to load. Defaults to a tiny test pipeline.",
+    )
+    parser.add_argument(
+        "--vae_path",
+        type=str,
+        default=None,
+        help="Optional VAE to load instead of the pipeline's own.",
+    )
+    parser.add_argument(
+        "--image_size", type=int, default=64, help="Width and height of the images"
+    )
+    parser.add_argument("--steps", type=int, default=2, help="Inference steps")
+    parser.add_argument(
+        "--profile",
+        type=str,
+        default="default",
+        help="Generation profile. Options: 'default' or 'fast'",
+    )
+    parser.add_argument(
+        "--num_images", type=int, default=8, help="Number of images to time"
+    )
+    parser.add_argument(
+        "--memory_mode",
+        type=str,
+        default="none",
+        help="Memory mode, e.g. 'none', 'vae_tiling', 'model_cpu_offload' or 'auto'",
+    )
+    parser.add_argument(
+        "--cpu_runtime",
+        type=str,
+        default="pytorch",
+        help="CPU runtime for the 'cpu' generator: 'pytorch' or 'openvino'",
+    )
+    parser.add_argument(
+        "--num_threads", type=int, default=None, help="CPU intra-op threads"
+    )
+    parser.add_argument(
+        "--prompt", type=str, default="a person walking in a park", help="Prompt"
+    )
+    parser.add_argument(
+        "--sweep_acceleration",
+        action="store_true",
+        help="Benchmark every combination of acceleration options.",
+    )
+    return parser.parse_args()
+
+
+def benchmark(config: ImageGeneratorConfig, prompt: str, logger) -> float:
+    """Load a generator for the config and return its images/s after warm-up."""
+    start = time.perf_counter()
+    # No S3 handler: the benchmark runs the base pipeline without LoRA weights
+    generator = GeneratorFactory.get_generator(s3_handler=None, config=config)
+    logger.info(f"Model loaded and warmed up in {time.perf_counter() - start:.2f}s")
+
+    with tempfile.TemporaryDirectory(prefix="generator_benchmark_") as output_dir:
+        start = time.perf_counter()
+        generator.generate(prompt, weight=1.0, output_dir=output_dir)
+        elapsed = time.perf_counter() - start
+        num_generated = len(list(DatasetLayout(output_dir).names()))
+
+    images_per_second = num_generated / elapsed
+    logger.info(
+        f"[{config.generator}] {num_generated} images in {elapsed:.2f}s "
+        f"({images_per_second:.3f} images/s)"
+    )
+    if generator.peak_memory_per_image:
+        logger.info(
+            f"[{config.generator}] memory mode '{generator.memory_mode}': peak "
+            f"{max(generator.peak_memory_per_image) / 2**20:.0f} MiB per image"
+        )
+    return images_per_second
+
+
+def main():
+    args = parse_args()
+    logger = setup_logger(__name__)
+
+    config = ImageGeneratorConfig(
+        model_path=args.model_path,
+        vae_path=args.vae_path,
+        generator=args.generator,
+        image_size=(args.image_size, args.image_size),
+        steps=args.steps,
+        profile=args.profile,
+        memory_mode=args.memory_mode,
+        num_images=args.num_images,
+        cpu_runtime=args.cpu_runtime,
+        num_threads=args.num_threads,
+    )
+    if not args.sweep_acceleration:
+        benchmark(config, args.prompt, logger)
+        return
+
+    results = []
+    for compile_unet, channels_last, attention, inference_mode in itertools.product(
+        [False, True], [False, True], ["sdpa", "default"], [False, True]
+    ):
+        acceleration = AccelerationConfig(
+            compile_unet=compile_unet,
+            channels_last=channels_last,
+            attention=attention,
+            inference_mode=inference_mode,
+        )
+        config = replace(config, acceleration=acceleration)
+        results.append((acceleration, benchmark(config, args.prompt, logger)))
+
+    logger.info("Images/s per acceleration option combination:")
+    for acceleration, images_per_second in sorted(
+        results, key=lambda result: result[1], reverse=True
+    ):
+        logger.info(
+            f"  {images_per_second:8.3f}  compile_unet={acceleration.compile_unet} "
+            f"channels_last={acceleration.channels_last} "
+            f"attention={acceleration.attention} "
+            f"inference_mode={acceleration.inference_mode}"
+        )
+
+
+if __name__ == "__main__":
+    main()
@@ -6,6 +6,7 @@ from dataclasses import asdict
 from dotenv import load_dotenv
 
 from prompt2yolo.configs import EvaluationConfig, Paths
+from prompt2yolo.data.s3_dataset_reader import S3DatasetReader
 from prompt2yolo.evaluation.label_evaluator import LabelEvaluator
 from prompt2yolo.evaluation.prompt_weight_calculator import PromptWeightCalculator
 from prompt2yolo.evaluation.utils import (
@@ -26,6 +27,12 @@ def parse_args():
     parser.add_argument(
         "--iteration", type=int, default=1, help="Pipeline iteration number"
     )
+    parser.add_argument(
+        "--stream_from_s3",
+        action="store_true",
+        help="Stream test images and ground truth labels from S3 instead of the "
+        "local copy. Later iterations stream the iteration 1 test set they reuse.",
+    )
     return parser.parse_args()
 
 
@@ -59,7 +66,20 @@ def main():
         logger=logger,
     )
 
-    evaluator.process_all_images()
+    # Streamed samples are evaluated as they arrive, without a local test set
+    samples = None
+    if args.stream_from_s3:
+        # Iterations after the first generate no test split (test_ratio is 0) and
+        # reuse the iteration 1 test set, as copy_from_initial_iteration does locally
+        test_paths = Paths(local_data_path=local_dir, mode="test", iteration=1)
+        samples = S3DatasetReader(
+            test_paths.s3_image_folder, test_paths.s3_label_folder, logger=logger
+        )
+    num_images = evaluator.process_all_images(samples)
+    if samples is not None and not num_images:
+        raise ValueError(
+            f"No test samples found in S3 folder '{samples.s3_image_folder}'"
+        )
     prompt_weights = evaluator.calculate_prompt_weights()
     fp_rates = evaluator.prompt_weight_calculator.calculate_fp_rate()
 
@@ -0,0 +1,144 @@
+import argparse
+import os
+import tempfile
+import time
+from dataclasses import replace
+
+from dotenv import load_dotenv
+
+from prompt2yolo.configs import YoloLabelerConfig
+from prompt2yolo.data.data_generation.image_labeler import YoloWorldLabeler, list_images
+from prompt2yolo.data.data_generation.sharded_labeler import ShardedYoloWorldLabeler
+from prompt2yolo.utils.logger import setup_logger
+from prompt2yolo.utils.utils import load_yaml_config
+
+load_dotenv()
+
+
+def parse_args():
+    """Parse command-line arguments."""
+    parser = argparse.ArgumentParser(description="YOLO-World labeler benchmark")
+    parser.add_argument(
+        "--image_labeler_yaml",
+        type=str,
+        default=None,
+        help="Optional Image Labeler YAML configuration file",
+    )
+    parser.add_argument(
+        "--classes",
+        type=str,
+        nargs="+",
+        default=["person", "car", "dog", "bicycle", "traffic light"],
+        help="Class vocabulary to set on the model",
+    )
+    parser.add_argument(
+        "--image_folder",
+        type=str,
+        default=None,
+        help="Folder of images for the throughput comparison; skipped if omitted",
+    )
+    parser.add_argument(
+        "--backends",
+        type=str,
+        nargs="+",
+        default=["pytorch", "onnx", "openvino"],
+        help="Labeler backends to compare on the image folder",
+    )
+    parser.add_argument(
+        "--num_threads", type=int, default=None, help="CPU intra-op threads"
+    )
+    parser.add_argument(
+        "--num_workers",
+        type=int,
+        default=None,
+        help="Also compare N sharded worker processes with one process using all cores",
+    )
+    return parser.parse_args()
+
+
+def measure_startup(config: YoloLabelerConfig, classes, logger) -> float:
+    """Construct a labeler and return its model startup time in seconds."""
+    labeler = YoloWorldLabeler(
+        s3_handler=None, custom_classes=classes, config=config, logger=logger
+    )
+    return labeler.startup_time
+
+
+def measure_throughput(
+    config: YoloLabelerConfig, classes, image_folder: str, logger
+) -> float:
+    """Label the folder once and return images/s (sharded runs include startup)."""
+    if config.num_workers > 1:
+        labeler = ShardedYoloWorldLabeler(
+            custom_classes=classes, config=config, logger=logger
+        )
+    else:
+        labeler = YoloWorldLabeler(
+            s3_handler=None, custom_classes=classes, config=config, logger=logger
+        )
+    num_images = len(list_images(image_folder))
+    with tempfile.TemporaryDirectory(prefix="labeler_benchmark_") as output_dir:
+        start = time.perf_counter()
+        labeler.label(local_image_path=image_folder, output_dir=output_dir)
+        elapsed = time.perf_counter() - start
+    return num_images / elapsed
+
+
+def main():
+    args = parse_args()
+    logger = setup_logger(__name__)
+    config = YoloLabelerConfig(
+        **(load_yaml_config(args.image_labeler_yaml) if args.image_labeler_yaml else {})
+    )
+
+    # A fresh cache directory so the first cached run is a guaranteed miss
+    with tempfile.TemporaryDirectory(prefix="labeler_benchmark_") as cache_dir:
+        startup_config = replace(config, cache_dir=cache_dir)
+        uncached = measure_startup(
+            replace(startup_config, cache_class_embeddings=False), args.classes, logger
+        )
+        first_run = measure_startup(startup_config, args.classes, logger)
+        cached = measure_startup(startup_config, args.classes, logger)
+
+    logger.info(f"Startup with {len(args.classes)} classes:")
+    logger.info(f"  set_classes every run:      {uncached:.2f}s")
+    logger.info(f"  cache miss (embed + save):  {first_run:.2f}s")
+    logger.info(f"  cache hit (load embeddings): {cached:.2f}s")
+
+    if not args.image_folder:
+        return
+
+    # Exports are kept in the default cache; labels are not, so every image is run
+    config = replace(config, cache_labels=False, num_threads=args.num_threads)
+    results = {
+        backend: measure_throughput(
+            replace(config, backend=backend), args.classes, args.image_folder, logger
+        )
+        for backend in args.backends
+    }
+    logger.info(f"Labeling throughput on {args.image_folder}:")
+    for backend, images_per_second in results.items():
+        logger.info(f"  {backend:10s} {images_per_second:8.2f} images/s")
+
+    if not args.num_workers:
+        return
+
+    num_cores = os.cpu_count() or 1
+    single = measure_throughput(
+        replace(config, num_threads=num_cores), args.classes, args.image_folder, logger
+    )
+    sharded = measure_throughput(
+        replace(config, num_workers=args.num_workers, num_threads=None),
+        args.classes,
+        args.image_folder,
+        logger,
+    )
+    logger.info(f"1 process x {num_cores} threads: {single:8.2f} images/s")
+    logger.info(
+        f"{args.num_workers} processes x {num_cores // args.num_workers} threads: "
+        f"{sharded:8.2f} images/s ({sharded / single:.2f}x)"
+    )
+
+
+if __name__ == "__main__":
+    main()
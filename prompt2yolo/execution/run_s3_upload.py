@@ -0,0 +1,61 @@
+import argparse
+import sys
+
+from dotenv import load_dotenv
+
+from prompt2yolo.utils.logger import setup_logger
+from prompt2yolo.utils.s3_handler import S3Handler
+
+load_dotenv()
+
+
+def parse_args():
+    parser = argparse.ArgumentParser(description="Upload a local folder to S3")
+    parser.add_argument(
+        "--local_dir", type=str, required=True, help="Local folder to upload"
+    )
+    parser.add_argument(
+        "--s3_path",
+        type=str,
+        required=True,
+        help="Destination as s3://<bucket>/<prefix> or a prefix in AWS_S3_BUCKET_NAME",
+    )
+    parser.add_argument(
+        "--include",
+        type=str,
+        nargs="*",
+        default=None,
+        help="Glob patterns of relative paths to upload. Defaults to all files.",
+    )
+    parser.add_argument(
+        "--skip_unchanged",
+        action="store_true",
+        help="Skip files whose ETag matches the existing object.",
+    )
+    return parser.parse_args()
+
+
+def main():
+    args = parse_args()
+    logger = setup_logger(__name__)
+
+    bucket, s3_folder = None, args.s3_path
+    if s3_folder.startswith("s3://"):
+        bucket, _, s3_folder = s3_folder[len("s3://") :].partition("/")
+
+    handler = S3Handler(s3_folder=s3_folder, local_dir=args.local_dir, logger=logger)
+    if bucket and bucket != handler.bucket_name:
+        logger.error(
+            f"Bucket '{bucket}' does not match AWS_S3_BUCKET_NAME '{handler.bucket_name}'"
+        )
+        sys.exit(1)
+
+    stats = handler.upload_directory(
+        includes=args.include, skip_unchanged=args.skip_unchanged
+    )
+    if stats.errors:
+        sys.exit(1)
+
+
+if __name__ == "__main__":
+    main()
@@ -5,7 +5,7 @@ import yaml
 from dotenv import load_dotenv
 
 from prompt2yolo.configs import Paths, YoloV5Hyperparameters
-from prompt2yolo.data.utils import clean_directory
+from prompt2yolo.data.utils import purge_trash, reset_directory
 from prompt2yolo.model.yolo_v5.training_preparer import YoloV5Preparer
 from prompt2yolo.utils.logger import setup_logger
 from prompt2yolo.utils.s3_data_downloader import S3DataDownloader
@@ -34,6 +34,12 @@ def fetch_args() -> argparse.Namespace:
         action="store_true",
         help="Download images and labels from S3.",
     )
+    parser.add_argument(
+        "--sync_from_s3",
+        action="store_true",
+        help="Only download new or changed S3 objects and delete local files removed "
+        "from S3, instead of re-downloading everything.",
+    )
     parser.add_argument(
         "--iteration",
         type=int,
@@ -61,6 +67,9 @@ def run(args: argparse.Namespace) -> None:
         mode="train",
         iteration=args.iteration,
     )
+    # Delete trash that resets of an interrupted earlier run left behind
+    purge_trash(paths.local_data_path, logger)
+    purge_trash(os.path.dirname(paths.s3_mirror_image_folder), logger)
 
     data_preparer = YoloV5Preparer(
         class_names=classes,
@@ -71,15 +80,19 @@ def run(args: argparse.Namespace) -> None:
     )
 
     if args.does_download_data_from_s3:
-        clean_directory(paths.image_folder, logger)
-        clean_directory(paths.label_folder, logger)
+        if not args.sync_from_s3:
+            reset_directory(paths.s3_mirror_image_folder, logger)
+            reset_directory(paths.s3_mirror_label_folder, logger)
         S3DataDownloader(
             s3_image_folder=paths.s3_image_folder,
             s3_label_folder=paths.s3_label_folder,
-            image_folder=paths.image_folder,
-            label_folder=paths.label_folder,
+            image_folder=paths.s3_mirror_image_folder,
+            label_folder=paths.s3_mirror_label_folder,
             logger=logger,
-        ).download_images_and_labels()
+            sharded=paths.sharded_layout,
+        ).download_images_and_labels(
+            sync=args.sync_from_s3, delete_removed=args.sync_from_s3
+        )
 
     data_preparer.create_yaml_files(YoloV5Hyperparameters())
 
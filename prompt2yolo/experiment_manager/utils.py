@@ -7,6 +7,7 @@ import streamlit as st
 from dotenv import load_dotenv
 
 from prompt2yolo.utils.logger import setup_logger
+from prompt2yolo.utils.s3_clients import get_s3_client
 
 # Load environment variables from .env file
 load_dotenv()
@@ -14,14 +15,9 @@ LOCK_FILE_PATH = Path(".training_lock")
 
 LOGGER = setup_logger(__name__)
 
-# Initialize S3 client
+# Initialize S3 client; shared with the rest of the process through the registry
 def initialize_s3_client() -> boto3.client:
-    return boto3.client(
-        "s3",
-        aws_access_key_id=os.getenv("AWS_ACCESS_KEY_ID"),
-        aws_secret_access_key=os.getenv("AWS_SECRET_ACCESS_KEY"),
-        endpoint_url=os.getenv("AWS_S3_ENDPOINT"),
-    )
+    return get_s3_client(endpoint_url=os.getenv("AWS_S3_ENDPOINT"))
 
 
 def create_lock_file(pid: int):
@@ -9,6 +9,12 @@ from prompt2yolo.configs import (
     YoloV3TinyDataConfig,
     YoloV3TinyHyperparameters,
 )
+from prompt2yolo.data.dataset_layout import DatasetLayout
+from prompt2yolo.data.image_store import (
+    read_image_list,
+    split_list_path,
+    write_image_list,
+)
 from prompt2yolo.utils.logger import setup_logger
 
 
@@ -52,13 +58,21 @@ class YoloV3TinyPreparer:
         self.logger.info("[*] Train directories are ready.")
 
     def create_train_txt(self, train_txt_path: str):
-        """Create train.txt file listing image paths."""
-        image_dir = os.path.join(self.paths.yolo_data_folder, "train/images")
-        with open(train_txt_path, "w") as file:
-            for img_name in os.listdir(image_dir):
-                if img_name.endswith((".jpg", ".jpeg", ".png")):
-                    img_path = os.path.join(image_dir, img_name)
-                    file.write(img_path + "\n")
+        """
+        Create train.txt file listing image paths. A virtual train split already
+        lists image store paths, whose labels Darknet finds in the sibling `labels`
+        folder.
+        """
+        list_path = split_list_path(self.paths.yolo_data_folder, "train")
+        if os.path.exists(list_path):
+            image_paths = read_image_list(list_path)
+        else:
+            image_dir = os.path.join(self.paths.yolo_data_folder, "train/images")
+            image_paths = [
+                entry.path
+                for entry in DatasetLayout(image_dir).scan((".jpg", ".jpeg", ".png"))
+            ]
+        write_image_list(train_txt_path, image_paths)
         self.logger.info(f"[*] Created 'train.txt' at {train_txt_path}.")
 
     def create_obj_files(
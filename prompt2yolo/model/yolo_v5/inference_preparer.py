@@ -1,10 +1,12 @@
 import logging
 import os
 import shutil
-from shutil import copyfile
 from typing import List, Optional
 
 from prompt2yolo.configs import Paths, YoloV5DataConfig
+from prompt2yolo.data.file_materializer import FileMaterializer, copy_directory_files
+from prompt2yolo.data.image_store import split_list_path, split_source
+from prompt2yolo.data.utils import reset_directory
 from prompt2yolo.model.utils import save_yaml
 from prompt2yolo.utils.logger import setup_logger
 
@@ -22,47 +24,46 @@ class YoloV5Preparer:
         self.testing_data_yaml_filename = testing_data_yaml_filename
         self.logger = logger or setup_logger(__name__)
 
+    def _remove_virtual_test_split(self) -> None:
+        """Drop a test list file left by a virtual split; it would shadow test/images."""
+        list_path = split_list_path(self.paths.yolo_data_folder, "test")
+        if os.path.exists(list_path):
+            os.remove(list_path)
+            self.logger.info(f"[*] Removed stale test split list: {list_path}")
+
     def prepare_test_data(self):
         """Copy all images and corresponding labels to the test directory. Only used when we download data from S3"""
-        image_list = [
-            img
-            for img in os.listdir(self.paths.image_folder)
-            if img.endswith((".jpg", ".png"))
-        ]
-
-        self._copy_files(image_list, "test")
-        self.logger.info(f"[*] Prepared test data: {len(image_list)} images")
-
-    def _copy_files(self, file_list: List[str], split_type: str):
-        """Copy image and corresponding label files to the target directory."""
-        for file in file_list:
-            src_image = os.path.join(self.paths.image_folder, file)
-            dst_image = os.path.join(
-                self.paths.yolo_data_folder, f"{split_type}/images", file
-            )
-            copyfile(src_image, dst_image)
-
-            # Copy corresponding label file if it exists
-            label_file = os.path.splitext(file)[0] + ".txt"
-            src_label = os.path.join(self.paths.label_folder, label_file)
-            dst_label = os.path.join(
-                self.paths.yolo_data_folder, f"{split_type}/labels", label_file
+        # Replace the previous test split, which may hold symlinks into the image store
+        self._remove_virtual_test_split()
+        for subdir in ["test/images", "test/labels"]:
+            reset_directory(
+                os.path.join(self.paths.yolo_data_folder, subdir), self.logger
             )
-            if os.path.exists(src_label):
-                copyfile(src_label, dst_label)
+        materializer = FileMaterializer(
+            self.paths.s3_mirror_image_folder,
+            self.paths.s3_mirror_label_folder,
+            logger=self.logger,
+        )
+        materializer.materialize(
+            {os.path.join(self.paths.yolo_data_folder, "test"): materializer.images}
+        )
+        self.logger.info(f"[*] Prepared test data: {len(materializer.images)} images")
 
     def copy_from_initial_iteration(self):
         """Copy test data from the initial iteration."""
         for subdir in ["test/images", "test/labels"]:
-            src_dir = os.path.join(self.paths.yolo_data_init_folder, subdir)
-            tgt_dir = os.path.join(self.paths.yolo_data_folder, subdir)
-            os.makedirs(tgt_dir, exist_ok=True)
-
-            for file_name in os.listdir(src_dir):
-                src_path = os.path.join(src_dir, file_name)
-                tgt_path = os.path.join(tgt_dir, file_name)
-                if os.path.isfile(src_path):
-                    shutil.copy(src_path, tgt_path)
+            copy_directory_files(
+                os.path.join(self.paths.yolo_data_init_folder, subdir),
+                os.path.join(self.paths.yolo_data_folder, subdir),
+                logger=self.logger,
+            )
+        # Virtual test splits are symlinks into the image store plus a list file
+        init_list_path = split_list_path(self.paths.yolo_data_init_folder, "test")
+        self._remove_virtual_test_split()
+        if os.path.exists(init_list_path):
+            shutil.copyfile(
+                init_list_path, split_list_path(self.paths.yolo_data_folder, "test")
+            )
         self.logger.info(
             f"[*] Copied test data from '{self.paths.yolo_data_init_folder}' to '{self.paths.yolo_data_folder}'."
         )
@@ -70,8 +71,8 @@ class YoloV5Preparer:
     def create_yaml_files(self):
         """Create dataset configuration YAML file."""
         testing_data_config = YoloV5DataConfig(
-            train_dir=os.path.join(self.paths.yolo_data_folder, "train/images"),
-            val_dir=os.path.join(self.paths.yolo_data_folder, "test/images"),
+            train_dir=split_source(self.paths.yolo_data_folder, "train"),
+            val_dir=split_source(self.paths.yolo_data_folder, "test"),
             class_names=self.class_names,
         )
 
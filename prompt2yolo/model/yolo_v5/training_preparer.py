@@ -3,6 +3,7 @@ import os
 from typing import List, Optional
 
 from prompt2yolo.configs import Paths, YoloV5DataConfig, YoloV5Hyperparameters
+from prompt2yolo.data.image_store import split_source
 from prompt2yolo.model.utils import save_yaml
 from prompt2yolo.utils.logger import setup_logger
 
@@ -31,8 +32,8 @@ class YoloV5Preparer:
         """Create dataset and hyperparameter configuration files."""
 
         training_data_config = YoloV5DataConfig(
-            train_dir=os.path.join(self.paths.yolo_data_folder, "train/images"),
-            val_dir=os.path.join(self.paths.yolo_data_folder, "val/images"),
+            train_dir=split_source(self.paths.yolo_data_folder, "train"),
+            val_dir=split_source(self.paths.yolo_data_folder, "val"),
             class_names=self.class_names,
         )
 
@@ -0,0 +1,113 @@
+import os
+import threading
+from typing import Callable, Dict, Optional, Tuple
+
+import boto3
+from botocore.config import Config
+from botocore.exceptions import ClientError
+
+# botocore's default of 10 connections starves concurrent transfers
+DEFAULT_MAX_POOL_CONNECTIONS = 32
+
+_LOCK = threading.Lock()
+# Registry key -> (client or resource, its connection pool size)
+_CLIENTS: Dict[Tuple, Tuple[object, int]] = {}
+_RESOURCES: Dict[Tuple, Tuple[object, int]] = {}
+_EXISTING_BUCKETS = set()
+
+
+# Session arguments that identify a shared client, read from the environment
+_KEY_FIELDS = (
+    ("endpoint_url", "AWS_S3_ENDPOINT"),
+    ("region_name", "AWS_DEFAULT_REGION"),
+    ("aws_access_key_id", "AWS_ACCESS_KEY_ID"),
+    ("aws_secret_access_key", "AWS_SECRET_ACCESS_KEY"),
+    ("aws_session_token", "AWS_SESSION_TOKEN"),
+)
+
+
+def _registry_key(endpoint_url: Optional[str], region_name: Optional[str]) -> Tuple:
+    """Clients are shared per endpoint, region and credentials."""
+    given = {"endpoint_url": endpoint_url, "region_name": region_name}
+    return tuple(given.get(field) or os.getenv(env) for field, env in _KEY_FIELDS)
+
+
+def _shared(
+    registry: Dict[Tuple, Tuple[object, int]],
+    factory: Callable[..., object],
+    endpoint_url: Optional[str],
+    region_name: Optional[str],
+    max_pool_connections: Optional[int],
+):
+    """
+    Return the registered client or resource for the key, rebuilding it when a larger
+    connection pool than its own is requested, so it fits the largest request.
+    """
+    key = _registry_key(endpoint_url, region_name)
+    with _LOCK:
+        entry = registry.get(key)
+        if entry is not None and entry[1] >= (max_pool_connections or 0):
+            return entry[0]
+        pool_size = max_pool_connections or DEFAULT_MAX_POOL_CONNECTIONS
+        kwargs = {field: value for (field, _), value in zip(_KEY_FIELDS, key)}
+        shared = factory("s3", config=Config(max_pool_connections=pool_size), **kwargs)
+        registry[key] = (shared, pool_size)
+        return shared
+
+
+def get_s3_client(
+    endpoint_url: Optional[str] = None,
+    region_name: Optional[str] = None,
+    max_pool_connections: Optional[int] = None,
+):
+    """
+    Process-wide S3 client for the endpoint, region and credentials (from the
+    environment when not given). Clients are thread-safe, so one is shared by every
+    caller and its connection pool is reused. The pool holds at least
+    `max_pool_connections` (default `DEFAULT_MAX_POOL_CONNECTIONS`) connections.
+    """
+    return _shared(
+        _CLIENTS, boto3.client, endpoint_url, region_name, max_pool_connections
+    )
+
+
+def get_s3_resource(
+    endpoint_url: Optional[str] = None,
+    region_name: Optional[str] = None,
+    max_pool_connections: Optional[int] = None,
+):
+    """
+    Process-wide S3 resource, keyed like `get_s3_client`. Unlike clients, resources
+    are not thread-safe, so worker threads should use the client.
+    """
+    return _shared(
+        _RESOURCES, boto3.resource, endpoint_url, region_name, max_pool_connections
+    )
+
+
+def bucket_exists(client, bucket_name: str) -> bool:
+    """
+    Check the bucket with `head_bucket`. Found buckets are remembered for the process;
+    missing ones are checked again on the next call. Raises the client's error if the
+    check fails.
+    """
+    key = (client, bucket_name)
+    if key in _EXISTING_BUCKETS:
+        return True
+    try:
+        client.head_bucket(Bucket=bucket_name)
+    except ClientError as e:
+        if e.response.get("Error", {}).get("Code") in ("404", "NoSuchBucket"):
+            return False
+        raise
+    with _LOCK:
+        _EXISTING_BUCKETS.add(key)
+    return True
+
+
+def clear_s3_clients() -> None:
+    """Drop the shared clients and remembered buckets, e.g. after credentials change."""
+    with _LOCK:
+        _CLIENTS.clear()
+        _RESOURCES.clear()
+        _EXISTING_BUCKETS.clear()
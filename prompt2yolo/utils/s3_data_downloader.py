@@ -1,6 +1,8 @@
 import logging
 from typing import List, Optional
 
+from prompt2yolo.configs import S3TransferConfig
+from prompt2yolo.data.dataset_layout import DatasetLayout
 from prompt2yolo.utils.logger import setup_logger
 from prompt2yolo.utils.s3_handler import S3Handler
 
@@ -13,18 +15,28 @@ class S3DataDownloader:
         image_folder: str,
         label_folder: str,
         logger: Optional[logging.Logger] = None,
+        sharded: bool = False,
+        transfer_config: Optional[S3TransferConfig] = None,
     ):
         self.s3_image_folder = s3_image_folder
         self.s3_label_folder = s3_label_folder
         self.image_folder = image_folder
         self.label_folder = label_folder
+        DatasetLayout(image_folder, sharded).prepare()
+        DatasetLayout(label_folder, sharded).prepare()
 
         # Create S3Handler instances for images and labels
         self.image_downloader = S3Handler(
-            s3_folder=s3_image_folder, local_dir=image_folder, logger=logger
+            s3_folder=s3_image_folder,
+            local_dir=image_folder,
+            logger=logger,
+            transfer_config=transfer_config,
         )
         self.label_downloader = S3Handler(
-            s3_folder=s3_label_folder, local_dir=label_folder, logger=logger
+            s3_folder=s3_label_folder,
+            local_dir=label_folder,
+            logger=logger,
+            transfer_config=transfer_config,
         )
         self.logger = logger or setup_logger(__name__)
 
@@ -32,15 +44,25 @@ class S3DataDownloader:
         self,
         image_extensions: List[str] = ["jpg", "png"],
         label_extensions: List[str] = ["txt"],
+        sync: bool = False,
+        delete_removed: bool = False,
     ):
-        """Download images and labels from S3 to the desired local paths."""
+        """
+        Download images and labels from S3 to the desired local paths. With `sync`,
+        only objects that are new or changed since the last sync are downloaded, and
+        `delete_removed` deletes local files whose objects were removed from S3.
+        """
         self.logger.info(f"[*] Downloading image and labels")
 
         self.image_downloader.download_files_by_extension(
-            file_extensions=image_extensions
+            file_extensions=image_extensions,
+            sync=sync,
+            delete_removed=delete_removed,
         )
         self.label_downloader.download_files_by_extension(
-            file_extensions=label_extensions
+            file_extensions=label_extensions,
+            sync=sync,
+            delete_removed=delete_removed,
         )
 
 
@@ -50,27 +72,37 @@ class S3ModelDownloader:
         s3_model_folder: str,
         model_folder: str,
         logger: Optional[logging.Logger] = None,
+        transfer_config: Optional[S3TransferConfig] = None,
     ):
         self.s3_model_folder = s3_model_folder
         self.model_folder = model_folder
 
         # Create S3Handler instance for the model folder
         self.model_downloader = S3Handler(
-            s3_folder=s3_model_folder, local_dir=model_folder, logger=logger
+            s3_folder=s3_model_folder,
+            local_dir=model_folder,
+            logger=logger,
+            transfer_config=transfer_config,
         )
         self.logger = logger or setup_logger(__name__)
 
     def download_model_files(
         self,
         model_extensions: List[str] = ["pt", "onnx", "h5"],
+        sync: bool = False,
+        delete_removed: bool = False,
     ):
         """Download model files from S3 to the desired local path."""
         self.logger.info("[*] Downloading models.")
         self.model_downloader.download_files_by_extension(
-            file_extensions=model_extensions
+            file_extensions=model_extensions,
+            sync=sync,
+            delete_removed=delete_removed,
         )
 
-    def download_entire_folder(self):
+    def download_entire_folder(self, sync: bool = False, delete_removed: bool = False):
         """Download all files from the specified S3 folder to the local path."""
         self.logger.info(f"[*] Downloading entire folder: {self.s3_model_folder}")
-        self.model_downloader.download_all_files()
+        self.model_downloader.download_all_files(
+            sync=sync, delete_removed=delete_removed
+        )
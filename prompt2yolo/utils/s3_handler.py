@@ -1,21 +1,74 @@
+import base64
+import fnmatch
+import hashlib
+import json
 import os
+import time
+from concurrent.futures import ThreadPoolExecutor, as_completed
+from dataclasses import dataclass, field
+from functools import partial
 from io import BytesIO
-from typing import List
+from typing import Callable, Dict, Iterator, List, Optional, Set, Tuple
 
-import boto3
+from boto3.s3.transfer import TransferConfig
 from botocore.exceptions import ClientError
 from dotenv import load_dotenv
 
+from prompt2yolo.configs import S3TransferConfig
+from prompt2yolo.data.dataset_layout import DatasetLayout
 from prompt2yolo.utils.logger import setup_logger
+from prompt2yolo.utils.s3_clients import bucket_exists, get_s3_client, get_s3_resource
+from prompt2yolo.utils.s3_listing import iter_objects, iter_prefixes
 
 load_dotenv()
 
+# Listing metadata of the last sync, kept in the local folder; dot-files are skipped
+# by dataset scans
+SYNC_STATE_FILE = ".s3_sync.json"
+
+MB = 1024 * 1024
+
+
+@dataclass
+class TransferStats:
+    objects: int = 0
+    bytes: int = 0
+    seconds: float = 0.0
+    errors: Dict[str, str] = field(default_factory=dict)  # {key: error}
+
+    def __str__(self) -> str:
+        seconds = max(self.seconds, 1e-9)
+        return (
+            f"{self.objects} objects ({self.bytes / 1e6:.1f} MB) in "
+            f"{self.seconds:.2f}s ({self.objects / seconds:.1f} objects/s, "
+            f"{self.bytes / 1e6 / seconds:.1f} MB/s), {len(self.errors)} failed"
+        )
+
+
+def _object_state(obj: dict, local_path: str) -> dict:
+    return {
+        "etag": obj["ETag"].strip('"'),
+        "size": obj["Size"],
+        "last_modified": obj["LastModified"].isoformat(),
+        "path": local_path,
+    }
+
 
 class S3Handler:
-    def __init__(self, s3_folder: str, local_dir: str, logger=None):
+    def __init__(
+        self,
+        s3_folder: str,
+        local_dir: str,
+        logger=None,
+        transfer_config: Optional[S3TransferConfig] = None,
+        listing_ttl: float = 0.0,
+    ):
         self.s3_folder = s3_folder.rstrip("/")
         self.local_dir = local_dir
         self.logger = logger or setup_logger(__name__)
+        self.transfer_config = transfer_config or S3TransferConfig()
+        # Seconds a complete folder listing is reused by `iter_keys`/`iter_prefixes`
+        self.listing_ttl = listing_ttl
 
         # Load endpoint URL and bucket name from environment variables
         self.endpoint_url = os.getenv("AWS_S3_ENDPOINT")
@@ -25,41 +78,77 @@ class S3Handler:
         if not self.bucket_name or not self.endpoint_url:
             raise ValueError("Missing AWS_S3_BUCKET_NAME or AWS_S3_ENDPOINT in .env.")
 
-        # Initialize boto3 resource and client with endpoint URL
-        self.s3_resource = boto3.resource(
-            "s3", endpoint_url=self.endpoint_url, region_name=self.region_name
+        # The client comes from the process-wide registry, so handlers for the same
+        # endpoint share it. It is thread-safe and used by all transfer workers, so
+        # its connection pool must be as large as the worker pool
+        self.s3_client = get_s3_client(
+            self.endpoint_url,
+            self.region_name,
+            self.transfer_config.max_pool_connections,
+        )
+
+        # Objects below the multipart threshold take one request each, so the pool's
+        # parallelism comes from moving many objects at once; larger ones are split
+        # into parts transferred in parallel
+        self.multipart_threshold = self.transfer_config.multipart_threshold_mb * MB
+        self.multipart_chunksize = self.transfer_config.multipart_chunksize_mb * MB
+        self.small_object_transfer = TransferConfig(
+            multipart_threshold=self.multipart_threshold, use_threads=False
         )
-        self.s3_client = boto3.client(
-            "s3", endpoint_url=self.endpoint_url, region_name=self.region_name
+        self.large_object_transfer = TransferConfig(
+            multipart_threshold=self.multipart_threshold,
+            multipart_chunksize=self.multipart_chunksize,
+            max_concurrency=self.transfer_config.max_concurrency,
         )
-        self.bucket = self.s3_resource.Bucket(self.bucket_name)
 
         # Check if the bucket exists
         if not self.check_bucket_exists():
             raise ValueError(f"Bucket '{self.bucket_name}' does not exist.")
 
-    def list_files_in_folder(self) -> List[str]:
+    def iter_keys(self, suffixes: Optional[Tuple[str, ...]] = None) -> Iterator[str]:
+        """Lazily yield the keys in the S3 folder, optionally filtered by suffix."""
+        for obj in iter_objects(
+            self.s3_client, self.bucket_name, self.s3_folder, suffixes, self.listing_ttl
+        ):
+            yield obj["Key"]
+
+    def iter_prefixes(self) -> Iterator[str]:
+        """Lazily yield the sub-folder prefixes directly under the S3 folder."""
+        yield from iter_prefixes(
+            self.s3_client,
+            self.bucket_name,
+            f"{self.s3_folder}/" if self.s3_folder else "",
+            ttl=self.listing_ttl,
+        )
+
+    def list_files_in_folder(
+        self, suffixes: Optional[Tuple[str, ...]] = None
+    ) -> List[str]:
         """List files in the specified S3 folder."""
         try:
-            # List objects in the specified folder
-            response = self.s3_client.list_objects_v2(
-                Bucket=self.bucket_name, Prefix=self.s3_folder
-            )
-
-            # Extract filenames
-            files = [obj["Key"] for obj in response.get("Contents", [])]
-            return files
+            return list(self.iter_keys(suffixes))
         except ClientError as e:
             self.logger.error(
                 f"Error listing files in S3 folder '{self.s3_folder}': {e}"
             )
             return []
 
+    @property
+    def s3_resource(self):
+        return get_s3_resource(
+            self.endpoint_url,
+            self.region_name,
+            self.transfer_config.max_pool_connections,
+        )
+
+    @property
+    def bucket(self):
+        return self.s3_resource.Bucket(self.bucket_name)
+
     def check_bucket_exists(self) -> bool:
-        """Check if the bucket exists."""
+        """Check if the bucket exists. Found buckets are remembered for the process."""
         try:
-            self.s3_resource.meta.client.head_bucket(Bucket=self.bucket_name)
-            return True
+            return bucket_exists(self.s3_client, self.bucket_name)
         except ClientError as e:
             self.logger.error(f"Bucket check failed: {e}")
             return False
@@ -74,40 +163,341 @@ class S3Handler:
             self.logger.error(f"Failed to download file to stream: {e}")
             raise
 
-    def download_files_by_extension(self, file_extensions: List[str]) -> None:
-        """Download files from the S3 folder based on specific file extensions."""
+    def _download_object(self, key: str, local_path: str, size: int) -> None:
+        os.makedirs(os.path.dirname(local_path), exist_ok=True)
+        transfer = (
+            self.small_object_transfer
+            if size < self.multipart_threshold
+            else self.large_object_transfer
+        )
+        self.s3_client.download_file(self.bucket_name, key, local_path, Config=transfer)
+
+    def _transfer(
+        self,
+        jobs: List[Tuple[str, str, int]],
+        transfer: Callable[[str, str, int], None],
+        summary: str,
+        verb: str,
+    ) -> TransferStats:
+        """
+        Run `transfer(key, local path, size)` for each job on a bounded pool of
+        workers. Failures are collected instead of stopping the other transfers, and
+        the throughput is logged.
+        """
+        stats = TransferStats()
+        start = time.perf_counter()
+        with ThreadPoolExecutor(
+            max_workers=self.transfer_config.max_concurrency
+        ) as executor:
+            futures = {}
+            for key, local_path, size in jobs:
+                future = executor.submit(transfer, key, local_path, size)
+                futures[future] = (key, size)
+            for future in as_completed(futures):
+                key, size = futures[future]
+                try:
+                    future.result()
+                except Exception as e:
+                    stats.errors[key] = str(e)
+                else:
+                    stats.objects += 1
+                    stats.bytes += size
+        stats.seconds = time.perf_counter() - start
+
+        self.logger.info(f"[*] {summary}: {stats}")
+        if stats.errors:
+            examples = "; ".join(
+                f"{key}: {error}" for key, error in list(stats.errors.items())[:5]
+            )
+            self.logger.error(
+                f"Failed to {verb} {len(stats.errors)} of {len(jobs)} objects "
+                f"(first failures: {examples})"
+            )
+        return stats
+
+    def download_objects(self, objects: List[Tuple[str, str, int]]) -> TransferStats:
+        """Download (key, local path, size) objects concurrently."""
+        return self._transfer(
+            objects,
+            self._download_object,
+            f"Downloaded from s3://{self.bucket_name}",
+            "download",
+        )
+
+    def _list_objects(self) -> List[dict]:
+        # Transfers always compare against a fresh listing
+        return list(iter_objects(self.s3_client, self.bucket_name, self.s3_folder))
+
+    def _load_sync_state(self, state_path: str) -> Dict[str, dict]:
         try:
-            paginator = self.s3_client.get_paginator("list_objects_v2")
-            files_to_download = []
-
-            for page in paginator.paginate(
-                Bucket=self.bucket_name, Prefix=self.s3_folder
-            ):
-                files_to_download.extend(
-                    obj["Key"]
-                    for obj in page.get("Contents", [])
-                    if any(obj["Key"].endswith(ext) for ext in file_extensions)
+            with open(state_path, "r") as f:
+                state = json.load(f)
+        except FileNotFoundError:
+            return {}
+        except ValueError as e:
+            self.logger.warning(f"Ignoring unreadable sync state {state_path}: {e}")
+            return {}
+        if state.get("s3_folder") != self.s3_folder:
+            # Written by a sync of another prefix into the same folder
+            self.logger.warning(
+                f"Ignoring sync state {state_path} of s3 folder "
+                f"'{state.get('s3_folder')}'"
+            )
+            return {}
+        return state.get("objects", {})
+
+    def _remove_untracked_files(self, tracked: Set[str]) -> int:
+        """Delete local files outside `tracked` relative paths, except dotfiles."""
+        removed = 0
+        for directory, subdirectories, files in os.walk(self.local_dir):
+            subdirectories[:] = [d for d in subdirectories if not d.startswith(".")]
+            for file in files:
+                if file.startswith("."):
+                    continue
+                path = os.path.join(directory, file)
+                if os.path.relpath(path, self.local_dir) not in tracked:
+                    os.remove(path)
+                    removed += 1
+        return removed
+
+    def sync_objects(
+        self, objects: List[Tuple[dict, str]], delete_removed: bool = False
+    ) -> TransferStats:
+        """
+        Download only the listed (object, local path) pairs whose size, ETag or
+        modification time changed since the last sync, or whose local file is missing.
+        With `delete_removed`, the local directory becomes an exact mirror of the
+        listing: every other file is deleted, including files the sync state never
+        recorded. The directory should therefore only hold this S3 folder's objects.
+        """
+        state_path = os.path.join(self.local_dir, SYNC_STATE_FILE)
+        previous = self._load_sync_state(state_path)
+
+        current = {}
+        to_download = []
+        for obj, local_path in objects:
+            key = obj["Key"]
+            relative_path = os.path.relpath(local_path, self.local_dir)
+            current[key] = _object_state(obj, relative_path)
+            if current[key] == previous.get(key) and os.path.exists(local_path):
+                continue
+            to_download.append((key, local_path, obj["Size"]))
+            # Drop the copy left at a previous path, e.g. after a layout change
+            if key in previous and previous[key]["path"] != relative_path:
+                self._remove_local_file(previous[key]["path"])
+
+        stats = self.download_objects(to_download) if to_download else TransferStats()
+        for key in stats.errors:
+            # Retried on the next sync
+            current.pop(key)
+
+        num_removed = 0
+        if delete_removed:
+            num_removed = self._remove_untracked_files(
+                {
+                    os.path.relpath(local_path, self.local_dir)
+                    for _, local_path in objects
+                }
+            )
+
+        os.makedirs(self.local_dir, exist_ok=True)
+        temp_path = f"{state_path}.tmp"
+        with open(temp_path, "w") as f:
+            json.dump({"s3_folder": self.s3_folder, "objects": current}, f)
+        os.replace(temp_path, state_path)
+
+        self.logger.info(
+            f"[*] Synced s3://{self.bucket_name}/{self.s3_folder}: "
+            f"{len(objects) - len(to_download)} unchanged, {stats.objects} downloaded, "
+            f"{num_removed} deleted"
+        )
+        return stats
+
+    def _remove_local_file(self, relative_path: str) -> None:
+        path = os.path.join(self.local_dir, relative_path)
+        if os.path.lexists(path):
+            os.remove(path)
+
+    def download_files_by_extension(
+        self,
+        file_extensions: List[str],
+        sync: bool = False,
+        delete_removed: bool = False,
+    ) -> TransferStats:
+        """
+        Download files from the S3 folder based on specific file extensions. With
+        `sync`, only new or changed objects are downloaded (see `sync_objects`).
+        """
+        try:
+            files_to_download = list(
+                iter_objects(
+                    self.s3_client,
+                    self.bucket_name,
+                    self.s3_folder,
+                    suffixes=tuple(file_extensions),
                 )
+            )
 
             if not files_to_download:
                 self.logger.warning(
                     f"No files with extensions {file_extensions} found in {self.s3_folder}."
                 )
-                return  # Exit gracefully if no files match
-
-            for key in files_to_download:
-                local_path = os.path.join(self.local_dir, os.path.basename(key))
-                os.makedirs(os.path.dirname(local_path), exist_ok=True)
+                if not sync:
+                    return TransferStats()  # Exit gracefully if no files match
 
-                try:
-                    self.s3_client.download_file(self.bucket_name, key, local_path)
-                    self.logger.info(f"Downloaded {key} to {local_path}")
-                except Exception as e:
-                    self.logger.error(f"Failed to download {key}: {e}")
+            # Files land in the local folder's flat or sharded layout
+            layout = DatasetLayout(self.local_dir)
+            objects = [
+                (obj, layout.path(os.path.basename(obj["Key"])))
+                for obj in files_to_download
+            ]
+            if sync:
+                return self.sync_objects(objects, delete_removed)
+            return self.download_objects(
+                [(obj["Key"], path, obj["Size"]) for obj, path in objects]
+            )
         except Exception as e:
             self.logger.error(f"Error during file download: {e}")
             raise
 
+    def _local_etag(self, local_path: str, size: int) -> str:
+        """ETag S3 gives the file when uploaded by `_upload_object`."""
+        with open(local_path, "rb") as f:
+            if size < self.multipart_threshold:
+                return hashlib.md5(f.read()).hexdigest()
+            digests = [
+                hashlib.md5(chunk).digest()
+                for chunk in iter(lambda: f.read(self.multipart_chunksize), b"")
+            ]
+        return f"{hashlib.md5(b''.join(digests)).hexdigest()}-{len(digests)}"
+
+    def _upload_part(
+        self, local_path: str, key: str, upload_id: str, part_number: int
+    ) -> dict:
+        with open(local_path, "rb") as f:
+            f.seek((part_number - 1) * self.multipart_chunksize)
+            chunk = f.read(self.multipart_chunksize)
+        response = self.s3_client.upload_part(
+            Bucket=self.bucket_name,
+            Key=key,
+            UploadId=upload_id,
+            PartNumber=part_number,
+            Body=chunk,
+            ContentMD5=base64.b64encode(hashlib.md5(chunk).digest()).decode(),
+        )
+        return {"PartNumber": part_number, "ETag": response["ETag"]}
+
+    def _upload_object(
+        self, key: str, local_path: str, size: int, part_concurrency: int = 1
+    ) -> None:
+        """
+        Upload one file, in parts from the multipart threshold on. The upload is
+        verified by comparing the ETag in the response with the local one, which holds
+        for unencrypted and SSE-S3 objects, instead of issuing a HEAD request.
+        Parts are uploaded serially unless `part_concurrency` is raised; concurrent
+        directory uploads keep it at one so they stay within the connection pool.
+        """
+        if size < self.multipart_threshold:
+            with open(local_path, "rb") as f:
+                body = f.read()
+            digest = hashlib.md5(body)
+            response = self.s3_client.put_object(
+                Bucket=self.bucket_name,
+                Key=key,
+                Body=body,
+                ContentMD5=base64.b64encode(digest.digest()).decode(),
+            )
+            expected = digest.hexdigest()
+        else:
+            upload_id = self.s3_client.create_multipart_upload(
+                Bucket=self.bucket_name, Key=key
+            )["UploadId"]
+            part_numbers = range(1, -(-size // self.multipart_chunksize) + 1)
+            upload_part = partial(self._upload_part, local_path, key, upload_id)
+            try:
+                if part_concurrency > 1:
+                    with ThreadPoolExecutor(max_workers=part_concurrency) as executor:
+                        parts = list(executor.map(upload_part, part_numbers))
+                else:
+                    parts = [upload_part(number) for number in part_numbers]
+                response = self.s3_client.complete_multipart_upload(
+                    Bucket=self.bucket_name,
+                    Key=key,
+                    UploadId=upload_id,
+                    MultipartUpload={"Parts": parts},
+                )
+            except Exception:
+                self.s3_client.abort_multipart_upload(
+                    Bucket=self.bucket_name, Key=key, UploadId=upload_id
+                )
+                raise
+            expected = self._local_etag(local_path, size)
+
+        etag = response["ETag"].strip('"')
+        if etag != expected:
+            raise ValueError(
+                f"ETag mismatch for {key}: expected {expected}, but S3 returned {etag}"
+            )
+
+    def upload_directory(
+        self,
+        includes: Optional[List[str]] = None,
+        skip_unchanged: bool = False,
+    ) -> TransferStats:
+        """
+        Upload the files of the local directory to the S3 folder concurrently, keeping
+        their relative paths. `includes` are glob patterns matched against the relative
+        path (as in `aws s3 cp --include`); all files are uploaded when not given.
+        With `skip_unchanged`, files whose ETag matches the existing object are skipped.
+        Internal dotfiles and folders (layout markers, sync state, trash) are skipped.
+        """
+        jobs = []
+        for directory, subdirectories, files in os.walk(
+            self.local_dir, followlinks=True
+        ):
+            subdirectories[:] = [d for d in subdirectories if not d.startswith(".")]
+            for file in files:
+                if file.startswith("."):
+                    continue
+                local_path = os.path.join(directory, file)
+                relative_path = os.path.relpath(local_path, self.local_dir)
+                relative_path = relative_path.replace(os.sep, "/")
+                if includes and not any(
+                    fnmatch.fnmatch(relative_path, pattern) for pattern in includes
+                ):
+                    continue
+                key = f"{self.s3_folder}/{relative_path}".lstrip("/")
+                jobs.append((key, local_path, os.path.getsize(local_path)))
+
+        if not jobs:
+            self.logger.warning(f"No files to upload from {self.local_dir}.")
+            return TransferStats()
+
+        if skip_unchanged:
+            remote = {
+                obj["Key"]: (obj["Size"], obj["ETag"].strip('"'))
+                for obj in self._list_objects()
+            }
+            changed = []
+            for key, local_path, size in jobs:
+                if key in remote and remote[key] == (
+                    size,
+                    self._local_etag(local_path, size),
+                ):
+                    continue
+                changed.append((key, local_path, size))
+            self.logger.info(f"[*] Skipping {len(jobs) - len(changed)} unchanged files")
+            jobs = changed
+
+        if not jobs:
+            return TransferStats()
+        return self._transfer(
+            jobs,
+            self._upload_object,
+            f"Uploaded to s3://{self.bucket_name}/{self.s3_folder}",
+            "upload",
+        )
+
     def upload_file(self, local_path: str, s3_path: str) -> bool:
         """Upload a file from local storage to the specified S3 path."""
         try:
@@ -119,23 +509,22 @@ class S3Handler:
                 self.logger.error(f"Local file '{local_path}' does not exist.")
                 raise FileNotFoundError(f"Local file '{local_path}' not found.")
 
-            if os.path.getsize(local_path) == 0:
+            size = os.path.getsize(local_path)
+            if size == 0:
                 self.logger.error(f"Local file '{local_path}' is empty.")
                 raise ValueError(
                     f"Local file '{local_path}' is empty and cannot be uploaded."
                 )
 
-            self.s3_client.upload_file(local_path, self.bucket_name, s3_path)
+            # Verified against the ETag in the upload response
+            self._upload_object(
+                s3_path,
+                local_path,
+                size,
+                part_concurrency=self.transfer_config.max_concurrency,
+            )
             self.logger.info(f"Successfully uploaded {local_path} to {s3_path}")
-
-            # Verify upload success by checking if the file exists on S3
-            response = self.s3_client.head_object(Bucket=self.bucket_name, Key=s3_path)
-            if response:
-                self.logger.info(f"File verified on S3 at {s3_path}")
-                return True
-            else:
-                self.logger.error(f"Upload verification failed for {s3_path}")
-                return False
+            return True
 
         except ClientError as e:
             self.logger.error(f"Failed to upload {local_path} to S3: {e}")
@@ -144,31 +533,31 @@ class S3Handler:
             self.logger.error(f"An unexpected error occurred during upload: {e}")
             raise
 
-    def download_all_files(self) -> None:
-        """Download all files recursively from the S3 folder to the local directory."""
+    def download_all_files(
+        self, sync: bool = False, delete_removed: bool = False
+    ) -> TransferStats:
+        """
+        Download all files recursively from the S3 folder to the local directory.
+        With `sync`, only new or changed objects are downloaded (see `sync_objects`).
+        """
         try:
-            paginator = self.s3_client.get_paginator("list_objects_v2")
-            operation_parameters = {
-                "Bucket": self.bucket_name,
-                "Prefix": self.s3_folder,
-            }
-            page_iterator = paginator.paginate(**operation_parameters)
-
-            for page in page_iterator:
-                for obj in page.get("Contents", []):
-                    s3_key = obj["Key"]
-                    local_path = os.path.join(
-                        self.local_dir, os.path.relpath(s3_key, self.s3_folder)
-                    )
-
-                    # Create local directories as needed
-                    os.makedirs(os.path.dirname(local_path), exist_ok=True)
-
-                    # Download the file
-                    self.s3_client.download_file(self.bucket_name, s3_key, local_path)
-                    self.logger.info(f"Downloaded {s3_key} to {local_path}")
+            objects = [
+                (
+                    obj,
+                    os.path.join(
+                        self.local_dir, os.path.relpath(obj["Key"], self.s3_folder)
+                    ),
+                )
+                for obj in self._list_objects()
+            ]
+            if sync:
+                return self.sync_objects(objects, delete_removed)
+            return self.download_objects(
+                [(obj["Key"], path, obj["Size"]) for obj, path in objects]
+            )
         except Exception as e:
             self.logger.error(f"Failed to download files from S3: {e}")
+            return TransferStats()
 
     def _parse_s3_uri(self, s3_uri: str) -> (str, str):
         """Parse the S3 URI into bucket name and key."""
@@ -0,0 +1,80 @@
+import threading
+import time
+from typing import Dict, Iterator, List, Optional, Tuple
+
+# {(client, bucket, prefix, delimiter, field): (listed at, entries)}
+_MEMO: Dict[Tuple, Tuple[float, List]] = {}
+_LOCK = threading.Lock()
+
+
+def _paginate(
+    s3_client,
+    bucket_name: str,
+    prefix: str,
+    delimiter: Optional[str],
+    field: str,
+    ttl: float,
+) -> Iterator:
+    """
+    Stream the `field` entries of a `list_objects_v2` listing page by page. With a
+    positive `ttl`, a complete listing is remembered and replayed for `ttl` seconds.
+    """
+    memo_key = (s3_client, bucket_name, prefix, delimiter, field)
+    if ttl > 0:
+        with _LOCK:
+            cached = _MEMO.get(memo_key)
+        if cached and time.monotonic() - cached[0] < ttl:
+            yield from cached[1]
+            return
+
+    started = time.monotonic()
+    params = {"Bucket": bucket_name, "Prefix": prefix}
+    if delimiter:
+        params["Delimiter"] = delimiter
+    entries = []
+    for page in s3_client.get_paginator("list_objects_v2").paginate(**params):
+        for entry in page.get(field, []):
+            if ttl > 0:
+                entries.append(entry)
+            yield entry
+
+    # Only listings consumed to the end are remembered
+    if ttl > 0:
+        with _LOCK:
+            _MEMO[memo_key] = (started, entries)
+
+
+def iter_objects(
+    s3_client,
+    bucket_name: str,
+    prefix: str = "",
+    suffixes: Optional[Tuple[str, ...]] = None,
+    ttl: float = 0.0,
+) -> Iterator[dict]:
+    """Lazily yield object summaries under `prefix`, optionally filtered by key suffix."""
+    for obj in _paginate(s3_client, bucket_name, prefix, None, "Contents", ttl):
+        if suffixes and not obj["Key"].endswith(tuple(suffixes)):
+            continue
+        yield obj
+
+
+def iter_prefixes(
+    s3_client,
+    bucket_name: str,
+    prefix: str = "",
+    delimiter: str = "/",
+    ttl: float = 0.0,
+) -> Iterator[str]:
+    """
+    Lazily yield the "folders" directly under `prefix`. S3 groups keys by `delimiter`,
+    so each request returns up to 1000 prefixes instead of 1000 objects.
+    """
+    for entry in _paginate(
+        s3_client, bucket_name, prefix, delimiter, "CommonPrefixes", ttl
+    ):
+        yield entry["Prefix"]
+
+
+def clear_listing_memo() -> None:
+    with _LOCK:
+        _MEMO.clear()
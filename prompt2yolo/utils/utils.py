@@ -1,3 +1,4 @@
+import hashlib
 import urllib.request
 import uuid
 from pathlib import Path
@@ -7,6 +8,7 @@ import boto3
 import yaml
 
 from prompt2yolo.utils.logger import setup_logger
+from prompt2yolo.utils.s3_listing import iter_prefixes
 
 LOGGER = setup_logger(__name__)
 
@@ -66,19 +68,31 @@ def list_model_ids(
     """List unique model IDs under projects/{project_name}/models/."""
     prefix = f"projects/{project_name}/models/"
     try:
-        paginator = s3_client.get_paginator("list_objects_v2")
-        operation_parameters = {"Bucket": bucket_name, "Prefix": prefix}
-        page_iterator = paginator.paginate(**operation_parameters)
-
-        model_ids: set = set()
-        for page in page_iterator:
-            for obj in page.get("Contents", []):
-                key_suffix = obj["Key"][len(prefix) :]
-                if "/" in key_suffix:
-                    model_id = key_suffix.split("/")[0]
-                    model_ids.add(model_id)
+        # One request per 1000 model folders rather than per 1000 objects
+        model_ids = [
+            model_prefix[len(prefix) :].rstrip("/")
+            for model_prefix in iter_prefixes(s3_client, bucket_name, prefix)
+        ]
 
         return sorted(model_ids)
     except Exception as e:
         LOGGER.warning(f"Error exception: {e}")
         return []
+
+
+def compute_file_hash(file_path: Union[str, Path], chunk_size: int = 1 << 20) -> str:
+    """Return the SHA-256 hex digest of a file's contents."""
+    digest = hashlib.sha256()
+    with open(file_path, "rb") as file:
+        for chunk in iter(lambda: file.read(chunk_size), b""):
+            digest.update(chunk)
+    return digest.hexdigest()
+
+
+def compute_hash(*values: str) -> str:
+    """Return a SHA-256 hex digest identifying an ordered sequence of strings."""
+    digest = hashlib.sha256()
+    for value in values:
+        digest.update(value.encode("utf-8"))
+        digest.update(b"\0")
+    return digest.hexdigest()
@@ -133,11 +133,10 @@ upload_to_s3() {
     shift 2                   # Remove the first two arguments (path and s3_path)
     local includes=("$@")     # Remaining arguments are inclusion patterns
 
-    for include in "${includes[@]}"; do
-        aws s3 cp "${path}" "${s3_path}" --recursive --exclude "*" --include "${include}" \
-            --endpoint-url "${AWS_S3_ENDPOINT}" || {
-            echo -e "${FG_RED}[!] Failed to upload ${include} to ${s3_path}.${FG_RESET}"
-            exit 1
-        }
-    done
+    # Files are uploaded concurrently; without patterns the whole folder is uploaded
+    python "${PACKAGE_DIR}/prompt2yolo/execution/run_s3_upload.py" \
+        --local_dir "${path}" --s3_path "${s3_path}" --include "${includes[@]}" || {
+        echo -e "${FG_RED}[!] Failed to upload ${includes[*]} to ${s3_path}.${FG_RESET}"
+        exit 1
+    }
 }
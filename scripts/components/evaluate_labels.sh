@@ -39,9 +39,13 @@ mkdir -p "${EVALUATION_OUTPUT_DIR}"
 run_evaluation() {
     echo -e "${FG_BLUE}[*] Running label evaluation for iteration ${ITERATION}...${FG_RESET}"
 
-    python "${PACKAGE_DIR}/prompt2yolo/execution/run_label_evaluation.py" \
-        --input_yaml "${INPUT_YAML}" \
-        --iteration "${ITERATION}"
+    PYTHON_CMD="python \"${PACKAGE_DIR}/prompt2yolo/execution/run_label_evaluation.py\" \
+        --input_yaml \"${INPUT_YAML}\" \
+        --iteration \"${ITERATION}\""
+    # Stream the test set from S3 instead of the local copy when enabled in .env
+    [ "${S3_STREAM_EVALUATION}" == "true" ] && PYTHON_CMD+=" --stream_from_s3"
+
+    eval "${PYTHON_CMD}"
 
     if [ $? -eq 0 ]; then
         echo -e "${FG_GREEN}[*] Label evaluation completed successfully for iteration ${ITERATION}.${FG_RESET}"
@@ -104,9 +108,10 @@ save_results() {
             continue
         fi
 
-        # Directly upload the file without recursive mode
+        # Upload only this plot from the results folder
         echo -e "${FG_BLUE}[*] Uploading plot '${PLOT}' to ${S3_PLOT_PATH}...${FG_RESET}"
-        aws s3 cp "${PLOT_PATH}" "${S3_PLOT_PATH}/${PLOT}" --endpoint-url "${AWS_S3_ENDPOINT}" || {
+        python "${PACKAGE_DIR}/prompt2yolo/execution/run_s3_upload.py" \
+            --local_dir "${PLOTS_DIR}" --s3_path "${S3_PLOT_PATH}" --include "${PLOT}" || {
             echo -e "${FG_RED}[!] Failed to upload plot '${PLOT}' to S3.${FG_RESET}"
             exit 1
         }
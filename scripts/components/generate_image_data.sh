@@ -55,7 +55,8 @@ upload_dataset() {
     local S3_FOLDER=$2
 
     echo -e "${FG_BLUE}[*] Uploading from ${LOCAL_FOLDER} to s3://${AWS_S3_BUCKET_NAME}/${S3_FOLDER}...${FG_RESET}"
-    aws s3 cp "${LOCAL_FOLDER}" "s3://${AWS_S3_BUCKET_NAME}/${S3_FOLDER}" --recursive --endpoint-url "${AWS_S3_ENDPOINT}"
+    python "${PACKAGE_DIR}/prompt2yolo/execution/run_s3_upload.py" \
+        --local_dir "${LOCAL_FOLDER}" --s3_path "${S3_FOLDER}" --skip_unchanged
 
     if [ $? -eq 0 ]; then
         echo -e "${FG_GREEN}[*] Successfully uploaded to s3://${AWS_S3_BUCKET_NAME}/${S3_FOLDER}.${FG_RESET}"
@@ -21,6 +21,7 @@ ITERATION="${3:-1}"
 # Path configurations
 IMAGE_FOLDER_PATH="${PACKAGE_DIR}/${LOCAL_DATA_PATH}/yolo/data/iteration_${ITERATION}/train/images"
 LABEL_FOLDER_PATH="${PACKAGE_DIR}/${LOCAL_DATA_PATH}/yolo/data/iteration_${ITERATION}/train/labels"
+TRAIN_LIST_PATH="${PACKAGE_DIR}/${LOCAL_DATA_PATH}/yolo/data/iteration_${ITERATION}/train.txt"
 DEST_IMAGE_FOLDER_PATH="${PACKAGE_DIR}/darknet/data/iteration_${ITERATION}/images"
 
 # Internal file paths
@@ -54,6 +55,8 @@ prepare_data() {
     # Append S3 download flag if requested
     if [ "${DOES_DOWNLOAD_DATA_FROM_S3}" == "TRUE" ]; then
         PYTHON_CMD+=" --does_download_data_from_s3"
+        # Only fetch changed objects when S3_SYNC is enabled in .env
+        [ "${S3_SYNC}" == "true" ] && PYTHON_CMD+=" --sync_from_s3"
         echo "[*] Downloading data from S3..."
     fi
 
@@ -66,6 +69,13 @@ prepare_data() {
         exit 1
     fi
 
+    # Virtual or sharded splits: train.txt already lists image paths with sibling labels
+    if [ -f "${TRAIN_LIST_PATH}" ] || [ -f "${IMAGE_FOLDER_PATH}/.sharded" ]; then
+        echo "[*] train.txt created at: ${TRAIN_TXT_FILENAME}"
+        echo "[*] YOLOv3-tiny data preparation completed successfully."
+        return
+    fi
+
     # Organize data
     echo "[*] Copying images and labels to training directory..."
     mkdir -p "${DEST_IMAGE_FOLDER_PATH}"
@@ -54,7 +54,8 @@ save_model() {
     S3_PATH="s3://${AWS_S3_BUCKET_NAME}/projects/${PROJECT}/models/${S3_MODEL_NAME}/"
 
     echo -e "${FG_BLUE}[*] Uploading model to S3...${FG_RESET}"
-    aws s3 cp "${SAVE_PATH}" "${S3_PATH}" --recursive --endpoint-url "${AWS_S3_ENDPOINT}"
+    python "${PACKAGE_DIR}/prompt2yolo/execution/run_s3_upload.py" \
+        --local_dir "${SAVE_PATH}" --s3_path "${S3_PATH}"
 
     if [ $? -eq 0 ]; then
         echo -e "${FG_GREEN}[*] Model successfully uploaded to ${S3_PATH}${FG_RESET}"
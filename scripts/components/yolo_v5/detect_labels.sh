@@ -48,13 +48,19 @@ run_detect() {
     DETECTION_OUTPUT_DIR="${PACKAGE_DIR}/yolov5/runs/detect"
     rm -rf "${DETECTION_OUTPUT_DIR}" && mkdir -p "${DETECTION_OUTPUT_DIR}"
 
+    # Sharded test folders keep images in hashed subfolders; YOLOv5 expands recursive globs
+    local SOURCE="${TESTING_DATA_PATH}"
+    if [ -n "$(find "${TESTING_DATA_PATH}" -mindepth 2 \( -type f -o -type l \) -print -quit 2>/dev/null)" ]; then
+        SOURCE="${TESTING_DATA_PATH}/**/*.*"
+    fi
+
     # Run YOLOv5 detection
     python "${PACKAGE_DIR}/yolov5/detect.py" \
       --img "${IMG_SIZE}" \
       --conf "${CONFIDENCE}" \
       --iou "${IOU}" \
       --weights "${DETECTION_MODEL}" \
-      --source "${TESTING_DATA_PATH}" \
+      --source "${SOURCE}" \
       --project "${DETECTION_OUTPUT_DIR}" \
       --save-txt \
       --name "${DETECTION_DIR_NAME}" 2>&1 | tee "detection_${ITERATION}.log"
@@ -82,10 +88,6 @@ save_results() {
     SAVE_PATH="${PACKAGE_DIR}/yolov5/runs/detect/${DETECTION_DIR_NAME}/"
     S3_PATH="s3://${AWS_S3_BUCKET_NAME}/projects/${PROJECT}/models/iteration_${ITERATION}/evaluation/label/detection"
 
-    if ! command -v aws &>/dev/null; then
-        echo -e "\e[31m[!] Error: aws-cli is not installed.\e[0m"
-        exit 1
-    fi
     INCLUDES=("*.png" "*.jpg")  # Define inclusion patterns
 
     upload_to_s3 "${SAVE_PATH}" "${S3_PATH}" "${INCLUDES[@]}" 2>&1 | tee "s3_upload_${ITERATION}.log"
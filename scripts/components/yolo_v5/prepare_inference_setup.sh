@@ -48,6 +48,7 @@ prepare_data() {
 
     [ "${DOES_DOWNLOAD_DATA_FROM_S3}" == "TRUE" ] && PYTHON_CMD+=" --does_download_data_from_s3"
     [ "${DOES_DOWNLOAD_MODEL_FROM_S3}" == "TRUE" ] && PYTHON_CMD+=" --does_download_model_from_s3"
+    [ "${S3_SYNC}" == "true" ] && PYTHON_CMD+=" --sync_from_s3"
 
     eval "${PYTHON_CMD}" && \
         echo -e "${FG_GREEN}[*] Data preparation completed successfully.${FG_RESET}" || \
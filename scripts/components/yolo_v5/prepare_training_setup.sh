@@ -47,6 +47,8 @@ prepare_data() {
     # Append the S3 download flag if specified
     if [ "${DOES_DOWNLOAD_DATA_FROM_S3}" == "TRUE" ]; then
         PYTHON_CMD="${PYTHON_CMD} --does_download_data_from_s3"
+        # Only fetch changed objects when S3_SYNC is enabled in .env
+        [ "${S3_SYNC}" == "true" ] && PYTHON_CMD="${PYTHON_CMD} --sync_from_s3"
         echo -e "${FG_BLUE}[*] Downloading data from S3...${FG_RESET}"
     fi
 
@@ -69,6 +71,13 @@ prepare_directories() {
     TARGET_PATH="${YOLO_DATA_PATH}"
 
     for MODE in "train" "val"; do
+        # Virtual splits list image store paths, so only the list file is needed
+        if [ -f "${SRC_PATH}/${MODE}.txt" ]; then
+            mkdir -p "${TARGET_PATH}"
+            cp "${SRC_PATH}/${MODE}.txt" "${TARGET_PATH}/${MODE}.txt"
+            continue
+        fi
+
         mkdir -p "${TARGET_PATH}/${MODE}/images" "${TARGET_PATH}/${MODE}/labels"
 
         # Copy files from source to target
@@ -0,0 +1,6 @@
+import os
+
+# prompt2yolo.configs reads these at import time; tests never touch real data or S3
+os.environ.setdefault("LOCAL_DATA_PATH", "local_temp/data")
+os.environ.setdefault("PROJECT", "test-project")
+os.environ.setdefault("AWS_S3_BUCKET_NAME", "test-bucket")
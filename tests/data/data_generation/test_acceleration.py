@@ -0,0 +1,50 @@
+import unittest
+from types import SimpleNamespace
+from unittest.mock import MagicMock
+
+import torch
+
+from prompt2yolo.configs import AccelerationConfig
+from prompt2yolo.data.data_generation.image_generators.acceleration import (
+    apply_acceleration,
+    revert_compile,
+)
+
+
+class TestApplyAcceleration(unittest.TestCase):
+    def setUp(self):
+        self.logger = MagicMock()
+
+    def test_failing_option_does_not_block_others(self):
+        """A plain module has no attention processors, but can still be compiled."""
+        unet = torch.nn.Conv2d(4, 4, 1)
+        pipe = SimpleNamespace(unet=unet, vae=None)
+        config = AccelerationConfig(compile_unet=True, channels_last=True)
+
+        applied = apply_acceleration(pipe, config, self.logger)
+
+        self.assertEqual(applied, ["channels_last", "compile_unet"])
+        self.logger.warning.assert_called_once()
+        self.assertIs(pipe.unet._orig_mod, unet)
+
+    def test_non_torch_pipeline_skips_everything(self):
+        """Runtimes without PyTorch modules (e.g. OpenVINO) are left untouched."""
+        pipe = SimpleNamespace(unet=object(), vae=object())
+        config = AccelerationConfig(compile_unet=True, channels_last=True)
+
+        applied = apply_acceleration(pipe, config, self.logger)
+
+        self.assertEqual(applied, [])
+        self.assertEqual(self.logger.warning.call_count, 3)
+
+    def test_revert_compile(self):
+        unet = torch.nn.Conv2d(4, 4, 1)
+        pipe = SimpleNamespace(unet=torch.compile(unet))
+
+        self.assertTrue(revert_compile(pipe))
+        self.assertIs(pipe.unet, unet)
+        self.assertFalse(revert_compile(pipe))
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,67 @@
+import tempfile
+import unittest
+
+import torch
+
+from prompt2yolo.data.data_generation.class_embedding_cache import (
+    ClassEmbeddingCache,
+)
+
+
+class _FakeWorldModel(torch.nn.Module):
+    def __init__(self):
+        super().__init__()
+        self.model = torch.nn.Sequential(torch.nn.Linear(2, 2))
+        self.txt_feats = torch.zeros(1, 80, 4)
+
+
+class _FakeYOLOWorld:
+    """Mimics the parts of `ultralytics.YOLOWorld` touched by `set_classes`."""
+
+    def __init__(self):
+        self.model = _FakeWorldModel()
+        self.predictor = object()
+        self.set_classes_calls = 0
+
+    def set_classes(self, classes):
+        self.set_classes_calls += 1
+        self.model.txt_feats = torch.arange(len(classes) * 4.0).reshape(1, -1, 4)
+        self.model.model[-1].nc = len(classes)
+        self.model.names = list(classes)
+        self.predictor = None
+
+
+class TestClassEmbeddingCache(unittest.TestCase):
+    def setUp(self):
+        self.temp_dir = tempfile.TemporaryDirectory()
+        self.classes = ["person", "dog", "car"]
+
+    def tearDown(self):
+        self.temp_dir.cleanup()
+
+    def test_second_model_loads_embeddings_without_encoding(self):
+        first, second = _FakeYOLOWorld(), _FakeYOLOWorld()
+        for model in (first, second):
+            cache = ClassEmbeddingCache(self.temp_dir.name, "ckpt", self.classes)
+            cache.set_classes(model)
+
+        self.assertEqual(first.set_classes_calls, 1)
+        self.assertEqual(second.set_classes_calls, 0)
+        torch.testing.assert_close(second.model.txt_feats, first.model.txt_feats)
+        self.assertEqual(second.model.model[-1].nc, 3)
+        self.assertEqual(second.model.names, self.classes)
+        self.assertIsNone(second.predictor)
+
+    def test_key_depends_on_checkpoint_and_class_order(self):
+        path = ClassEmbeddingCache(self.temp_dir.name, "ckpt", self.classes).path
+        self.assertNotEqual(
+            path,
+            ClassEmbeddingCache(self.temp_dir.name, "ckpt", self.classes[::-1]).path,
+        )
+        self.assertNotEqual(
+            path, ClassEmbeddingCache(self.temp_dir.name, "other", self.classes).path
+        )
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,163 @@
+import os
+import tempfile
+import unittest
+from collections import Counter
+
+from prompt2yolo.configs import Paths
+from prompt2yolo.data.data_generation.data_splitter import DataSplitter, assign_split
+from prompt2yolo.data.dataset_layout import DatasetLayout
+from prompt2yolo.data.image_store import read_image_list, split_list_path
+
+
+class TestAssignSplit(unittest.TestCase):
+    def test_assignment_is_stable_and_follows_ratios(self):
+        image_ids = [f"a_prompt_{seed}" for seed in range(5000)]
+        splits = [assign_split(image_id, 0.1, 0.2) for image_id in image_ids]
+
+        self.assertEqual(splits, [assign_split(i, 0.1, 0.2) for i in image_ids])
+        counts = Counter(splits)
+        self.assertAlmostEqual(counts["test"] / 5000, 0.2, delta=0.02)
+        self.assertAlmostEqual(counts["val"] / 5000, 0.08, delta=0.02)
+
+    def test_zero_test_ratio_keeps_images_out_of_test(self):
+        self.assertTrue(
+            all(assign_split(f"img_{i}", 0.1, 0) != "test" for i in range(500))
+        )
+
+
+class TestDataSplitter(unittest.TestCase):
+    def setUp(self):
+        self.temp_dir = tempfile.TemporaryDirectory()
+        self.paths = Paths(local_data_path=self.temp_dir.name, iteration=1)
+        os.makedirs(self.paths.image_folder)
+        os.makedirs(self.paths.label_folder)
+        for seed in range(20):
+            self._add_image(f"a_cat_{seed}")
+
+    def tearDown(self):
+        self.temp_dir.cleanup()
+
+    def _add_image(self, image_id, label=True):
+        image_layout = DatasetLayout(self.paths.image_folder)
+        with open(image_layout.writable_path(f"{image_id}.jpg"), "w") as f:
+            f.write(image_id)
+        if label:
+            label_layout = DatasetLayout(self.paths.label_folder)
+            with open(label_layout.writable_path(f"{image_id}.txt"), "w") as f:
+                f.write("0 0.5 0.5 0.1 0.1\n")
+
+    def _split_contents(self):
+        return {
+            split: sorted(
+                DatasetLayout(
+                    os.path.join(self.paths.yolo_data_folder, split, "images")
+                ).names()
+            )
+            for split in ["train", "val", "test"]
+        }
+
+    def _split(self, incremental=False, val_ratio=0.2, test_ratio=0.2, virtual=False):
+        DataSplitter(
+            self.paths, val_ratio, test_ratio, incremental=incremental, virtual=virtual
+        ).split()
+        return self._split_contents()
+
+    def _store_images(self):
+        return os.listdir(os.path.join(self.paths.image_store_folder, "images"))
+
+    def test_split_is_deterministic(self):
+        first = self._split()
+        self.assertEqual(first, self._split())
+        self.assertEqual(sum(map(len, first.values())), 20)
+
+    def test_incremental_split_only_touches_changes(self):
+        before = self._split(incremental=True)
+        untouched = os.path.join(
+            self.paths.yolo_data_folder, "train", "images", before["train"][0]
+        )
+        mtime = os.stat(untouched).st_mtime_ns
+
+        self._add_image("a_dog_1")
+        os.remove(os.path.join(self.paths.image_folder, before["test"][0]))
+        after = self._split(incremental=True)
+
+        self.assertEqual(os.stat(untouched).st_mtime_ns, mtime)
+        self.assertNotIn(before["test"][0], after["test"])
+        self.assertIn("a_dog_1.jpg", sum(after.values(), []))
+        self.assertEqual(after, self._split())
+
+    def test_incremental_split_moves_images_when_ratios_change(self):
+        self._split(incremental=True)
+        after = self._split(incremental=True, test_ratio=0)
+
+        self.assertEqual(after["test"], [])
+        self.assertEqual(after, self._split(test_ratio=0))
+        labels = os.listdir(os.path.join(self.paths.yolo_data_folder, "test", "labels"))
+        self.assertEqual(labels, [])
+
+    def test_virtual_split_links_into_store(self):
+        expected = self._split()
+        self.assertEqual(self._split(virtual=True), expected)
+
+        train_image = os.path.join(
+            self.paths.yolo_data_folder, "train", "images", expected["train"][0]
+        )
+        self.assertTrue(os.path.islink(train_image))
+        listed = read_image_list(split_list_path(self.paths.yolo_data_folder, "train"))
+        self.assertIn(os.readlink(train_image), listed)
+        self.assertEqual(len(listed), len(expected["train"]))
+        store_label = listed[0].replace(
+            f"{os.sep}images{os.sep}", f"{os.sep}labels{os.sep}"
+        )
+        self.assertTrue(os.path.exists(os.path.splitext(store_label)[0] + ".txt"))
+
+        # Another iteration of the same images adds nothing to the store
+        self.paths = Paths(local_data_path=self.temp_dir.name, iteration=2)
+        self._split(virtual=True)
+        self.assertEqual(len(self._store_images()), 20)
+
+    def test_incremental_virtual_split(self):
+        self._split(incremental=True, virtual=True)
+        self._add_image("a_dog_1")
+        after = self._split(incremental=True, virtual=True)
+
+        listed = sum(
+            (
+                read_image_list(split_list_path(self.paths.yolo_data_folder, split))
+                for split in after
+            ),
+            [],
+        )
+        self.assertEqual(len(listed), 21)
+        self.assertEqual(len(self._store_images()), 21)
+        self.assertEqual(after, self._split())
+        # Copied splits replace the virtual ones and their list files
+        self.assertFalse(
+            os.path.exists(split_list_path(self.paths.yolo_data_folder, "train"))
+        )
+
+    def test_sharded_sources_give_sharded_splits(self):
+        expected = self._split()
+        for folder in [self.paths.image_folder, self.paths.label_folder]:
+            for name in os.listdir(folder):
+                os.remove(os.path.join(folder, name))
+            DatasetLayout(folder, sharded=True).prepare()
+        for seed in range(20):
+            self._add_image(f"a_cat_{seed}")
+
+        self.assertEqual(self._split(incremental=True), expected)
+        test_labels = DatasetLayout(
+            os.path.join(self.paths.yolo_data_folder, "test", "labels")
+        )
+        self.assertTrue(test_labels.sharded)
+        self.assertEqual(len(list(test_labels.names())), len(expected["test"]))
+
+    def test_invalid_ratios(self):
+        with self.assertRaises(ValueError):
+            DataSplitter(self.paths, val_ratio=0.1, test_ratio=1.5)
+        with self.assertRaises(ValueError):
+            DataSplitter(self.paths, val_ratio=1, test_ratio=0.1)
+
+
+if __name__ == "__main__":
+    unittest.main()
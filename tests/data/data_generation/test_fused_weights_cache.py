@@ -0,0 +1,52 @@
+import tempfile
+import unittest
+from types import SimpleNamespace
+
+import torch
+
+from prompt2yolo.data.data_generation.image_generators.fused_weights_cache import (
+    FusedWeightsCache,
+)
+
+
+class TestFusedWeightsCache(unittest.TestCase):
+    def setUp(self):
+        self.cache_dir = tempfile.TemporaryDirectory()
+        self.cache = FusedWeightsCache(self.cache_dir.name, "key")
+
+    def tearDown(self):
+        self.cache_dir.cleanup()
+
+    def test_save_and_load_round_trip(self):
+        """Cached weights are loaded into a freshly initialized pipeline."""
+        fused = SimpleNamespace(
+            unet=torch.nn.Linear(4, 4), text_encoder=torch.nn.Linear(2, 2)
+        )
+        self.assertFalse(self.cache.exists())
+        self.cache.save(fused)
+        self.assertTrue(self.cache.exists())
+
+        fresh = SimpleNamespace(
+            unet=torch.nn.Linear(4, 4), text_encoder=torch.nn.Linear(2, 2)
+        )
+        self.cache.load_into(fresh)
+
+        for component in ("unet", "text_encoder"):
+            expected = getattr(fused, component).state_dict()
+            actual = getattr(fresh, component).state_dict()
+            for name, tensor in expected.items():
+                self.assertTrue(torch.equal(tensor, actual[name]))
+
+    def test_missing_components_are_skipped(self):
+        """Pipelines without a second text encoder are cached and loaded."""
+        fused = SimpleNamespace(unet=torch.nn.Linear(4, 4))
+        self.cache.save(fused)
+
+        fresh = SimpleNamespace(unet=torch.nn.Linear(4, 4), text_encoder_2=None)
+        self.cache.load_into(fresh)
+
+        self.assertTrue(torch.equal(fused.unet.weight, fresh.unet.weight))
+
+
+if __name__ == "__main__":
+    unittest.main()
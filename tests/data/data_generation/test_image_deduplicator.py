@@ -0,0 +1,128 @@
+import json
+import os
+import tempfile
+import unittest
+from unittest.mock import ANY
+
+import cv2
+import numpy as np
+
+from prompt2yolo.configs import DeduplicationConfig
+from prompt2yolo.data.data_generation.image_deduplicator import (
+    BKTree,
+    ImageDeduplicator,
+    compute_phashes,
+    hamming_distance,
+)
+
+
+def _pattern(seed: int, size: int = 128) -> np.ndarray:
+    rng = np.random.default_rng(seed)
+    coarse = rng.integers(0, 256, (8, 8), dtype=np.uint8)
+    return cv2.resize(coarse, (size, size), interpolation=cv2.INTER_CUBIC)
+
+
+class TestPerceptualHash(unittest.TestCase):
+    def test_near_duplicates_are_close_and_distinct_images_far(self):
+        image = _pattern(0)
+        brighter = np.clip(image.astype(int) + 10, 0, 255).astype(np.uint8)
+        batch = np.stack(
+            [
+                cv2.resize(img, (32, 32), interpolation=cv2.INTER_AREA)
+                for img in (image, brighter, _pattern(1))
+            ]
+        )
+        original, near, other = compute_phashes(batch)
+        self.assertLessEqual(hamming_distance(original, near), 4)
+        self.assertGreater(hamming_distance(original, other), 10)
+
+
+class TestBKTree(unittest.TestCase):
+    def test_query_returns_hashes_within_radius(self):
+        tree = BKTree()
+        for value, hash_value in enumerate([0b0, 0b1, 0b111, 0b11111111]):
+            tree.add(hash_value, str(value))
+
+        matches = sorted(tree.query(0b0, radius=1))
+        self.assertEqual(matches, [(0, "0"), (1, "1")])
+        self.assertEqual(len(tree), 4)
+        self.assertEqual(BKTree().query(0, radius=64), [])
+
+
+class TestImageDeduplicator(unittest.TestCase):
+    def setUp(self):
+        self.temp_dir = tempfile.TemporaryDirectory()
+        self.image_folder = os.path.join(self.temp_dir.name, "images")
+        self.quarantine_dir = os.path.join(self.temp_dir.name, "quarantine")
+        self.index_path = os.path.join(self.temp_dir.name, "dedup", "index.json")
+        os.makedirs(self.image_folder)
+
+    def tearDown(self):
+        self.temp_dir.cleanup()
+
+    def _write(self, name: str, image: np.ndarray) -> None:
+        cv2.imwrite(os.path.join(self.image_folder, name), image)
+
+    def test_quarantines_duplicates_and_reports_per_prompt(self):
+        self._write("a_cat_1.jpg", _pattern(0))
+        self._write("a_cat_2.jpg", _pattern(0))
+        self._write("a_dog_3.jpg", _pattern(1))
+
+        deduplicator = ImageDeduplicator(
+            index_path=self.index_path,
+            config=DeduplicationConfig(enabled=True),
+            quarantine_dir=self.quarantine_dir,
+        )
+        report = deduplicator.deduplicate(self.image_folder)
+
+        self.assertEqual(report, {"a_cat": (1, 1), "a_dog": (1, 0)})
+        self.assertEqual(
+            sorted(os.listdir(self.image_folder)), ["a_cat_1.jpg", "a_dog_3.jpg"]
+        )
+        self.assertEqual(os.listdir(self.quarantine_dir), ["a_cat_2.jpg"])
+        with open(self.index_path) as file:
+            index = json.load(file)
+        self.assertEqual(sorted(index["iteration_1"]), ["a_cat_1.jpg", "a_dog_3.jpg"])
+
+    def test_index_persists_across_iterations(self):
+        self._write("a_cat_1.jpg", _pattern(0))
+        config = DeduplicationConfig(enabled=True, action="drop")
+        ImageDeduplicator(self.index_path, config, iteration=1).deduplicate(
+            self.image_folder
+        )
+
+        os.remove(os.path.join(self.image_folder, "a_cat_1.jpg"))
+        self._write("a_cat_9.jpg", _pattern(0))
+        report = ImageDeduplicator(self.index_path, config, iteration=2).deduplicate(
+            self.image_folder
+        )
+
+        self.assertEqual(report, {"a_cat": (0, 1)})
+        self.assertEqual(os.listdir(self.image_folder), [])
+
+    def test_image_regenerated_after_reset_is_kept(self):
+        """A rerun of the same iteration does not match images removed by the reset."""
+        config = DeduplicationConfig(enabled=True, action="drop")
+        self._write("a_cat_1.jpg", _pattern(0))
+        self._write("a_dog_2.jpg", _pattern(1))
+        ImageDeduplicator(self.index_path, config).deduplicate(self.image_folder)
+
+        for name in os.listdir(self.image_folder):
+            os.remove(os.path.join(self.image_folder, name))
+        self._write("a_cat_1.jpg", _pattern(0))
+        report = ImageDeduplicator(self.index_path, config).deduplicate(
+            self.image_folder
+        )
+
+        self.assertEqual(report, {"a_cat": (1, 0)})
+        self.assertEqual(os.listdir(self.image_folder), ["a_cat_1.jpg"])
+        with open(self.index_path) as file:
+            self.assertEqual(json.load(file), {"iteration_1": {"a_cat_1.jpg": ANY}})
+
+    def test_quarantine_requires_directory(self):
+        with self.assertRaises(ValueError):
+            ImageDeduplicator(self.index_path, DeduplicationConfig(enabled=True))
+
+
+if __name__ == "__main__":
+    unittest.main()
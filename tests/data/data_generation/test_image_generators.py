@@ -0,0 +1,298 @@
+import os
+import sys
+import tempfile
+import unittest
+from types import SimpleNamespace
+from unittest.mock import Mock, patch
+
+import torch
+from diffusers import DDIMScheduler, EulerDiscreteScheduler
+from PIL import Image
+
+from prompt2yolo.configs import AccelerationConfig, ImageGeneratorConfig
+from prompt2yolo.data.data_generation.image_generators.base_generator import (
+    DreamBoothGeneratorBase,
+)
+from prompt2yolo.data.data_generation.image_generators.cpu_generator import (
+    CpuGenerator,
+)
+from prompt2yolo.data.data_generation.image_generators.pixart_generator import (
+    PixartGenerator,
+)
+
+BASE_GENERATOR = "prompt2yolo.data.data_generation.image_generators.base_generator"
+PIXART_GENERATOR = "prompt2yolo.data.data_generation.image_generators.pixart_generator"
+
+
+class StubPipeline:
+    """Records each call and returns a blank image; the listed calls raise."""
+
+    def __init__(self, failing_calls=()):
+        self.failing_calls = set(failing_calls)
+        self.calls = []
+        self.scheduler = DDIMScheduler()
+
+    def __call__(self, **kwargs):
+        self.calls.append(kwargs)
+        if len(self.calls) in self.failing_calls:
+            raise RuntimeError("stub failure")
+        return SimpleNamespace(images=[Image.new("RGB", (8, 8))])
+
+
+class StubGenerator(DreamBoothGeneratorBase):
+    device = "cpu"
+
+    def load_model(self):
+        return StubPipeline()
+
+
+def make_config(**overrides) -> ImageGeneratorConfig:
+    overrides.setdefault(
+        "acceleration", AccelerationConfig(attention=None, warmup=False)
+    )
+    return ImageGeneratorConfig(image_size=(8, 8), num_images=4, **overrides)
+
+
+class TestGenerationLoop(unittest.TestCase):
+    def setUp(self):
+        self.output_dir = tempfile.TemporaryDirectory()
+
+    def tearDown(self):
+        self.output_dir.cleanup()
+
+    def test_generates_weighted_number_of_images(self):
+        """`weight * num_images` images are generated with the configured sampling."""
+        generator = StubGenerator(None, make_config(steps=3, guidance_scale=5))
+        generator.generate("a person, walking", 0.5, self.output_dir.name)
+
+        files = sorted(os.listdir(self.output_dir.name))
+        self.assertEqual(len(files), 2)
+        self.assertTrue(all(f.startswith("a_person__walking_") for f in files))
+        for call in generator.pipe.calls:
+            self.assertEqual(call["num_inference_steps"], 3)
+            self.assertEqual(call["guidance_scale"], 5)
+            self.assertEqual((call["height"], call["width"]), (8, 8))
+
+    def test_failed_image_is_skipped(self):
+        """A failing pipeline call is logged and the remaining seeds still run."""
+        generator = StubGenerator(None, make_config())
+        generator.pipe = StubPipeline(failing_calls={2})
+        generator.generate("prompt", 1.0, self.output_dir.name)
+
+        self.assertEqual(len(generator.pipe.calls), 4)
+        self.assertEqual(len(os.listdir(self.output_dir.name)), 3)
+
+    def test_warm_up_runs_before_generation(self):
+        """Warm-up generates one image with at most two steps."""
+        config = make_config(
+            steps=10, acceleration=AccelerationConfig(attention=None, warmup=True)
+        )
+        generator = StubGenerator(None, config)
+
+        self.assertEqual(len(generator.pipe.calls), 1)
+        self.assertEqual(generator.pipe.calls[0]["num_inference_steps"], 2)
+
+    def test_lora_generator_requires_s3_handler(self):
+        """Generators that need their S3 LoRA fail early without a handler."""
+        with self.assertRaises(ValueError):
+            PixartGenerator(None, make_config())
+
+
+class DistilledStubGenerator(StubGenerator):
+    distillation_steps = 4
+
+
+class TestGenerationProfiles(unittest.TestCase):
+    def test_default_profile_keeps_configured_sampling(self):
+        generator = DistilledStubGenerator(None, make_config(steps=30))
+
+        self.assertEqual(generator.num_inference_steps, 30)
+        self.assertEqual(generator.guidance_scale, 7)
+        self.assertIsInstance(generator.pipe.scheduler, DDIMScheduler)
+
+    def test_fast_profile_uses_distillation_sampling(self):
+        """The distillation step count, no CFG and trailing Euler timesteps."""
+        config = make_config(steps=30, profile="fast")
+        generator = DistilledStubGenerator(None, config)
+
+        self.assertEqual(generator.num_inference_steps, 4)
+        self.assertEqual(generator.guidance_scale, 0.0)
+        scheduler = generator.pipe.scheduler
+        self.assertIsInstance(scheduler, EulerDiscreteScheduler)
+        self.assertEqual(scheduler.config.timestep_spacing, "trailing")
+
+    def test_fast_profile_without_distillation_falls_back(self):
+        config = make_config(steps=30, profile="fast")
+        generator = StubGenerator(None, config)
+
+        self.assertEqual(generator.num_inference_steps, 30)
+        self.assertEqual(generator.guidance_scale, 7)
+        self.assertIsInstance(generator.pipe.scheduler, DDIMScheduler)
+
+    def test_unknown_profile_raises(self):
+        config = make_config(profile="turbo")
+        with self.assertRaises(ValueError):
+            StubGenerator(None, config)
+
+
+class TestDtype(unittest.TestCase):
+    def test_cpu_uses_configured_dtype(self):
+        generator = StubGenerator(None, make_config(cpu_dtype="bfloat16"))
+        self.assertEqual(generator.torch_dtype, torch.bfloat16)
+
+    def test_cuda_uses_half_precision(self):
+        generator = StubGenerator(None, make_config(cpu_dtype="bfloat16"))
+        generator.device = "cuda"
+        self.assertEqual(generator.torch_dtype, torch.float16)
+
+    def test_base_pipeline_kwargs_follow_dtype(self):
+        """The fp16 weight variant is only requested for half precision."""
+        generator = StubGenerator(None, make_config(vae_path="vae"))
+        with patch(f"{BASE_GENERATOR}.AutoencoderKL") as vae_cls, patch(
+            f"{BASE_GENERATOR}.DiffusionPipeline"
+        ) as pipeline_cls:
+            generator.load_base_pipeline()
+            kwargs = pipeline_cls.from_pretrained.call_args.kwargs
+            self.assertEqual(kwargs["torch_dtype"], torch.float32)
+            self.assertNotIn("variant", kwargs)
+            self.assertIs(kwargs["vae"], vae_cls.from_pretrained.return_value)
+
+            generator.device = "cuda"
+            generator.load_base_pipeline()
+            kwargs = pipeline_cls.from_pretrained.call_args.kwargs
+            self.assertEqual(kwargs["torch_dtype"], torch.float16)
+            self.assertEqual(kwargs["variant"], "fp16")
+
+
+def make_torch_pipeline() -> SimpleNamespace:
+    return SimpleNamespace(
+        unet=torch.nn.Linear(4, 4),
+        text_encoder=torch.nn.Linear(2, 2),
+        fuse_lora=Mock(),
+        unload_lora_weights=Mock(),
+    )
+
+
+class TestFusedPipeline(unittest.TestCase):
+    def setUp(self):
+        self.cache_dir = tempfile.TemporaryDirectory()
+        self.addCleanup(self.cache_dir.cleanup)
+        self.generator = StubGenerator(None, make_config(cache_dir=self.cache_dir.name))
+
+    def test_cache_hit_skips_lora_fusion(self):
+        """A second load with the same LoRA inputs reuses the cached fused weights."""
+        first, second = make_torch_pipeline(), make_torch_pipeline()
+        load_loras = Mock()
+        with patch.object(
+            self.generator, "load_base_pipeline", side_effect=[first, second]
+        ):
+            self.generator.load_fused_pipeline(["lora-hash"], load_loras)
+            self.generator.load_fused_pipeline(["lora-hash"], load_loras)
+
+        load_loras.assert_called_once_with(first)
+        first.fuse_lora.assert_called_once()
+        second.fuse_lora.assert_not_called()
+        self.assertTrue(torch.equal(first.unet.weight, second.unet.weight))
+
+    def make_pixart(self) -> PixartGenerator:
+        lora_path = os.path.join(self.cache_dir.name, "lora.safetensors")
+        with open(lora_path, "wb") as file:
+            file.write(b"lora")
+
+        pixart = PixartGenerator.__new__(PixartGenerator)
+        pixart.lora_path = lora_path
+        pixart.logger = self.generator.logger
+        pixart.load_fused_pipeline = Mock()
+        return pixart
+
+    def test_pixart_cache_key_follows_cached_hub_blob(self):
+        """The distillation LoRA is keyed by its cached blob ETag, without a download."""
+        pixart = self.make_pixart()
+        snapshot = os.path.join(self.cache_dir.name, "snapshot.safetensors")
+
+        lora_inputs = []
+        with patch(f"{PIXART_GENERATOR}.try_to_load_from_cache") as from_cache, patch(
+            f"{PIXART_GENERATOR}.hf_hub_download"
+        ) as download:
+            for etag in ("etag-1", "etag-2"):
+                blob = os.path.join(self.cache_dir.name, etag)
+                open(blob, "wb").close()
+                if os.path.lexists(snapshot):
+                    os.remove(snapshot)
+                os.symlink(blob, snapshot)
+                from_cache.return_value = snapshot
+                pixart.load_model()
+                lora_inputs.append(
+                    pixart.load_fused_pipeline.call_args.kwargs["lora_inputs"]
+                )
+
+        download.assert_not_called()
+        self.assertEqual(lora_inputs[0][0], lora_inputs[1][0])
+        self.assertEqual([inputs[1] for inputs in lora_inputs], ["etag-1", "etag-2"])
+
+    def test_pixart_cache_key_uses_hub_metadata_when_not_cached(self):
+        pixart = self.make_pixart()
+        with patch(
+            f"{PIXART_GENERATOR}.try_to_load_from_cache", return_value=None
+        ), patch(f"{PIXART_GENERATOR}.get_hf_file_metadata") as metadata, patch(
+            f"{PIXART_GENERATOR}.hf_hub_download"
+        ) as download:
+            metadata.return_value.etag = "remote-etag"
+            pixart.load_model()
+
+        download.assert_not_called()
+        lora_inputs = pixart.load_fused_pipeline.call_args.kwargs["lora_inputs"]
+        self.assertEqual(lora_inputs[1], "remote-etag")
+
+
+class TestCpuGenerator(unittest.TestCase):
+    def setUp(self):
+        num_threads = torch.get_num_threads()
+        self.addCleanup(torch.set_num_threads, num_threads)
+
+    def test_openvino_falls_back_to_pytorch(self):
+        """Without optimum-intel the pipeline runs on PyTorch with a channels-last UNet."""
+        unet = torch.nn.Conv2d(4, 4, 3)
+        pipe = SimpleNamespace(unet=unet)
+        config = make_config(cpu_runtime="openvino", num_threads=1)
+        with patch.dict(sys.modules, {"optimum.intel": None}), patch.object(
+            CpuGenerator, "load_base_pipeline", return_value=pipe
+        ):
+            generator = CpuGenerator(None, config)
+
+        self.assertIs(generator.pipe, pipe)
+        self.assertTrue(unet.weight.is_contiguous(memory_format=torch.channels_last))
+
+    def test_interrupted_openvino_export_leaves_no_cache_entry(self):
+        """A failed export is not mistaken for a cached pipeline on the next run."""
+        cache_dir = tempfile.TemporaryDirectory()
+        self.addCleanup(cache_dir.cleanup)
+
+        def failing_save(directory):
+            os.makedirs(directory)
+            open(os.path.join(directory, "openvino_model.xml"), "w").close()
+            raise RuntimeError("export interrupted")
+
+        ov_pipeline = Mock()
+        ov_pipeline.from_pretrained.return_value.save_pretrained = failing_save
+        optimum_intel = SimpleNamespace(OVDiffusionPipeline=ov_pipeline)
+        base_pipe = SimpleNamespace(save_pretrained=Mock())
+        config = make_config(
+            cpu_runtime="openvino", num_threads=1, cache_dir=cache_dir.name
+        )
+        with patch.dict(sys.modules, {"optimum.intel": optimum_intel}), patch.object(
+            CpuGenerator, "load_base_pipeline", return_value=base_pipe
+        ):
+            with self.assertRaises(RuntimeError):
+                CpuGenerator(None, config)
+
+        self.assertEqual(os.listdir(os.path.join(cache_dir.name, "openvino")), [])
+
+    def test_unknown_runtime_raises(self):
+        config = make_config(cpu_runtime="tensorrt", num_threads=1)
+        with self.assertRaises(RuntimeError):
+            CpuGenerator(None, config)
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,168 @@
+import os
+import shutil
+import tempfile
+import unittest
+from types import SimpleNamespace
+from unittest.mock import MagicMock, patch
+
+import cv2
+import numpy as np
+import torch
+
+from prompt2yolo.configs import YoloLabelerConfig
+from prompt2yolo.data.data_generation.image_labeler import YoloWorldLabeler
+from prompt2yolo.data.data_generation.label_cache import labeler_config_hash
+
+
+class _Boxes:
+    """Minimal stand-in for `ultralytics.engine.results.Boxes`."""
+
+    def __init__(self, cls, xywhn, conf=None):
+        self.cls = torch.tensor(cls, dtype=torch.float32)
+        self.xywhn = torch.tensor(xywhn, dtype=torch.float32).reshape(-1, 4)
+        self.conf = torch.tensor(
+            conf if conf is not None else [0.9] * len(cls), dtype=torch.float32
+        )
+
+    def __len__(self):
+        return len(self.cls)
+
+
+def _result(path, cls, xywhn, conf=None):
+    return SimpleNamespace(path=path, boxes=_Boxes(cls, xywhn, conf))
+
+
+class TestYoloWorldLabeler(unittest.TestCase):
+    def setUp(self):
+        self.temp_dir = tempfile.TemporaryDirectory()
+        self.output_dir = os.path.join(self.temp_dir.name, "labels")
+
+        patcher = patch("prompt2yolo.data.data_generation.image_labeler.YOLO")
+        self.model = patcher.start().return_value
+        self.addCleanup(patcher.stop)
+
+        self.labeler = YoloWorldLabeler(
+            s3_handler=None,
+            custom_classes=["person", "dog"],
+            config=YoloLabelerConfig(
+                cache_dir=os.path.join(self.temp_dir.name, "cache"),
+                cache_class_embeddings=False,
+            ),
+            logger=MagicMock(),
+        )
+
+    def tearDown(self):
+        self.temp_dir.cleanup()
+
+    def _write_images(self, names):
+        image_folder = os.path.join(self.temp_dir.name, "images")
+        os.makedirs(image_folder)
+        # Distinct pixel values give every image its own content hash
+        for value, name in enumerate(names):
+            cv2.imwrite(
+                os.path.join(image_folder, name),
+                np.full((8, 8, 3), value * 20, dtype=np.uint8),
+            )
+        return image_folder
+
+    def test_writes_labels_from_results_without_rendering(self):
+        image_folder = self._write_images(["a_cat_1.jpg", "a_cat_2.jpg"])
+        self.model.predict.return_value = [
+            _result("image0.jpg", [1, 0], [[0.5, 0.5, 0.2, 0.4]] * 2),
+            _result("image1.jpg", [], []),
+        ]
+
+        self.labeler.label(local_image_path=image_folder, output_dir=self.output_dir)
+
+        kwargs = self.model.predict.call_args.kwargs
+        self.assertNotIn("save", kwargs)
+        self.assertNotIn("save_txt", kwargs)
+        self.assertEqual(os.listdir(self.output_dir), ["a_cat_1.txt"])
+        with open(os.path.join(self.output_dir, "a_cat_1.txt")) as file:
+            self.assertEqual(file.read(), "1 0.5 0.5 0.2 0.4\n0 0.5 0.5 0.2 0.4\n")
+
+    def test_labels_in_batches_and_skips_unreadable_images(self):
+        image_folder = self._write_images([f"a_dog_{i}.jpg" for i in range(5)])
+        with open(os.path.join(image_folder, "broken_0.jpg"), "w") as file:
+            file.write("not an image")
+        self.labeler.config.batch_size = 2
+        self.model.predict.side_effect = lambda images, **_: [
+            _result("", [0], [[0.5, 0.5, 0.1, 0.1]]) for _ in images
+        ]
+
+        self.labeler.label(local_image_path=image_folder, output_dir=self.output_dir)
+
+        batch_sizes = [len(c.args[0]) for c in self.model.predict.call_args_list]
+        self.assertEqual(batch_sizes, [2, 2, 1])
+        self.assertEqual(
+            sorted(os.listdir(self.output_dir)), [f"a_dog_{i}.txt" for i in range(5)]
+        )
+
+    def test_cached_labels_skip_the_model(self):
+        image_folder = self._write_images(["a_cat_1.jpg", "a_cat_2.jpg"])
+        self.model.predict.side_effect = lambda images, **_: [
+            _result("", [0], [[0.5, 0.5, 0.1, 0.1]]),
+            _result("", [], []),
+        ][: len(images)]
+        self.labeler.label(local_image_path=image_folder, output_dir=self.output_dir)
+        self.assertEqual(self.model.predict.call_count, 1)
+
+        # Unchanged images, including the one without detections, are cache hits
+        cv2.imwrite(
+            os.path.join(image_folder, "a_cat_3.jpg"),
+            np.full((8, 8, 3), 255, dtype=np.uint8),
+        )
+        shutil.rmtree(self.output_dir)
+        self.labeler.label(local_image_path=image_folder, output_dir=self.output_dir)
+
+        self.assertEqual(self.model.predict.call_count, 2)
+        self.assertEqual(len(self.model.predict.call_args.args[0]), 1)
+        self.assertEqual(
+            sorted(os.listdir(self.output_dir)), ["a_cat_1.txt", "a_cat_3.txt"]
+        )
+
+    def test_cache_key_depends_on_prediction_settings_and_classes(self):
+        base = labeler_config_hash(YoloLabelerConfig(), ["person"])
+        self.assertEqual(
+            base, labeler_config_hash(YoloLabelerConfig(batch_size=1), ["person"])
+        )
+        self.assertNotEqual(
+            base, labeler_config_hash(YoloLabelerConfig(conf=0.5), ["person"])
+        )
+        self.assertNotEqual(base, labeler_config_hash(YoloLabelerConfig(), ["dog"]))
+
+    def test_cascade_reruns_only_uncertain_images_with_tta(self):
+        image_folder = self._write_images(["a_cat_1.jpg", "a_cat_2.jpg", "a_cat_3.jpg"])
+        self.labeler.config.cascade = True
+        self.labeler.config.cascade_audit_fraction = 0
+        fast = [
+            _result("", [0], [[0.5, 0.5, 0.2, 0.2]], conf=[0.9]),
+            _result("", [0], [[0.5, 0.5, 0.2, 0.2]], conf=[0.35]),
+            _result("", [], []),
+        ]
+        augmented = [
+            _result("", [0], [[0.5, 0.5, 0.2, 0.2]], conf=[0.6]),
+            _result("", [1], [[0.2, 0.2, 0.1, 0.1]], conf=[0.5]),
+        ]
+        self.model.predict.side_effect = lambda images, augment, **_: (
+            augmented if augment else fast
+        )
+
+        self.labeler.label(local_image_path=image_folder, output_dir=self.output_dir)
+
+        fast_call, tta_call = self.model.predict.call_args_list
+        self.assertFalse(fast_call.kwargs["augment"])
+        self.assertTrue(tta_call.kwargs["augment"])
+        self.assertEqual(len(tta_call.args[0]), 2)
+        self.assertEqual(self.labeler._num_escalated, 2)
+        with open(os.path.join(self.output_dir, "a_cat_2.txt")) as file:
+            self.assertEqual(len(file.readlines()), 1)  # Duplicate box merged by NMS
+        self.assertTrue(os.path.exists(os.path.join(self.output_dir, "a_cat_3.txt")))
+
+    def test_extract_labels_without_detections(self):
+        labels = YoloWorldLabeler.extract_labels(SimpleNamespace(boxes=None))
+        self.assertEqual(labels.shape, (0, 5))
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,77 @@
+import os
+import tempfile
+import unittest
+
+import cv2
+import numpy as np
+
+from prompt2yolo.configs import QualityGateConfig
+from prompt2yolo.data.data_generation.image_quality_gate import (
+    ImageQualityGate,
+    compute_quality_statistics,
+)
+
+
+def _textured(seed: int = 0, size: int = 256) -> np.ndarray:
+    rng = np.random.default_rng(seed)
+    return rng.integers(0, 256, (size, size, 3), dtype=np.uint8)
+
+
+class TestQualityStatistics(unittest.TestCase):
+    def test_blank_image_scores_lowest(self):
+        blank = np.full((256, 256), 128, dtype=np.uint8)
+        textured = cv2.cvtColor(_textured(), cv2.COLOR_BGR2GRAY)
+        statistics = compute_quality_statistics(
+            np.stack([blank, textured]), np.zeros((2, 256, 256), dtype=np.uint8)
+        )
+
+        self.assertEqual(statistics["laplacian_variance"][0], 0)
+        self.assertEqual(statistics["entropy"][0], 0)
+        self.assertGreater(statistics["laplacian_variance"][1], 1000)
+        self.assertGreater(statistics["entropy"][1], 7)
+        np.testing.assert_array_equal(statistics["saturation"], [0, 0])
+
+
+class TestImageQualityGate(unittest.TestCase):
+    def setUp(self):
+        self.temp_dir = tempfile.TemporaryDirectory()
+        self.image_folder = os.path.join(self.temp_dir.name, "images")
+        self.quarantine_dir = os.path.join(self.temp_dir.name, "rejected")
+        os.makedirs(self.image_folder)
+
+        cv2.imwrite(os.path.join(self.image_folder, "a_cat_1.jpg"), _textured(1))
+        cv2.imwrite(
+            os.path.join(self.image_folder, "a_cat_2.jpg"),
+            np.zeros((256, 256, 3), dtype=np.uint8),
+        )
+        blurred = cv2.GaussianBlur(_textured(2), (0, 0), sigmaX=15)
+        cv2.imwrite(os.path.join(self.image_folder, "a_dog_3.jpg"), blurred)
+
+    def tearDown(self):
+        self.temp_dir.cleanup()
+
+    def test_rejects_blank_and_blurred_images_per_prompt(self):
+        gate = ImageQualityGate(
+            QualityGateConfig(enabled=True, batch_size=2, num_workers=2),
+            quarantine_dir=self.quarantine_dir,
+        )
+        report = gate.filter(self.image_folder)
+
+        self.assertEqual(report, {"a_cat": (1, 1), "a_dog": (0, 1)})
+        self.assertEqual(os.listdir(self.image_folder), ["a_cat_1.jpg"])
+        self.assertEqual(
+            sorted(os.listdir(self.quarantine_dir)), ["a_cat_2.jpg", "a_dog_3.jpg"]
+        )
+
+    def test_disabled_thresholds_keep_everything(self):
+        config = QualityGateConfig(
+            enabled=True, min_laplacian_variance=None, min_entropy=None, action="drop"
+        )
+        report = ImageQualityGate(config).filter(self.image_folder)
+
+        self.assertEqual(report, {"a_cat": (2, 0), "a_dog": (1, 0)})
+        self.assertEqual(len(os.listdir(self.image_folder)), 3)
+
+
+if __name__ == "__main__":
+    unittest.main()
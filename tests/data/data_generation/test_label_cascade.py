@@ -0,0 +1,61 @@
+import unittest
+
+import numpy as np
+
+from prompt2yolo.data.data_generation.label_cascade import (
+    label_agreement,
+    merge_detections,
+    needs_escalation,
+)
+
+
+def _detections(*rows):
+    return np.array(rows, dtype=np.float32).reshape(-1, 6)
+
+
+class TestLabelCascade(unittest.TestCase):
+    def test_needs_escalation(self):
+        confident = _detections([0, 0.9, 0.5, 0.5, 0.2, 0.2])
+        uncertain = _detections(
+            [0, 0.9, 0.5, 0.5, 0.2, 0.2], [1, 0.35, 0.2, 0.2, 0.1, 0.1]
+        )
+
+        self.assertFalse(needs_escalation(confident, conf=0.3, margin=0.15))
+        self.assertTrue(needs_escalation(uncertain, conf=0.3, margin=0.15))
+        self.assertTrue(needs_escalation(_detections(), conf=0.3, margin=0.15))
+
+    def test_merge_keeps_best_overlapping_box_and_new_boxes(self):
+        fast = _detections([0, 0.4, 0.5, 0.5, 0.2, 0.2])
+        augmented = _detections(
+            [0, 0.8, 0.51, 0.5, 0.2, 0.2], [1, 0.6, 0.1, 0.1, 0.05, 0.05]
+        )
+
+        merged = merge_detections(fast, augmented, iou=0.5, agnostic=True, max_det=15)
+
+        np.testing.assert_allclose(merged[:, 1], [0.8, 0.6])
+
+    def test_merge_per_class_keeps_overlapping_boxes_of_other_classes(self):
+        fast = _detections([0, 0.4, 0.5, 0.5, 0.2, 0.2])
+        augmented = _detections([1, 0.8, 0.5, 0.5, 0.2, 0.2])
+
+        self.assertEqual(
+            len(merge_detections(fast, augmented, 0.5, agnostic=False, max_det=15)), 2
+        )
+        self.assertEqual(
+            len(merge_detections(fast, augmented, 0.5, agnostic=True, max_det=15)), 1
+        )
+
+    def test_label_agreement(self):
+        labels = np.array([[0, 0.5, 0.5, 0.2, 0.2], [1, 0.1, 0.1, 0.05, 0.05]])
+
+        self.assertEqual(label_agreement(labels, labels), 1.0)
+        self.assertAlmostEqual(label_agreement(labels[:1], labels), 2 / 3)
+        self.assertEqual(label_agreement(labels[:0], labels[:0]), 1.0)
+        self.assertEqual(label_agreement(labels[:0], labels), 0.0)
+        relabeled = labels.copy()
+        relabeled[:, 0] = [1, 0]
+        self.assertEqual(label_agreement(relabeled, labels), 0.0)
+
+
+if __name__ == "__main__":
+    unittest.main()
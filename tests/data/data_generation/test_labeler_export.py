@@ -0,0 +1,143 @@
+import logging
+import os
+import sys
+import tempfile
+import unittest
+from types import SimpleNamespace
+from unittest.mock import Mock, patch
+
+from prompt2yolo.configs import YoloLabelerConfig
+from prompt2yolo.data.data_generation.image_labeler import export_labeler_model
+from prompt2yolo.data.data_generation.labeler_export import (
+    LabelerExportCache,
+    set_runtime_threads,
+)
+
+
+class _FakeExportable:
+    """Writes an `.onnx` file next to a checkpoint, like `YOLO.export`."""
+
+    def __init__(self, directory):
+        self.directory = directory
+        self.export_calls = []
+
+    def export(self, **kwargs):
+        self.export_calls.append(kwargs)
+        path = os.path.join(self.directory, "model.onnx")
+        with open(path, "w") as file:
+            file.write("onnx")
+        return path
+
+
+class TestLabelerExportCache(unittest.TestCase):
+    def setUp(self):
+        self.temp_dir = tempfile.TemporaryDirectory()
+        self.cache_dir = os.path.join(self.temp_dir.name, "cache")
+
+    def tearDown(self):
+        self.temp_dir.cleanup()
+
+    def _cache(self, classes=("person",), image_size=640):
+        return LabelerExportCache(
+            self.cache_dir, "ckpt", list(classes), image_size, "onnx"
+        )
+
+    def test_exports_once_and_reuses_the_cached_model(self):
+        model = _FakeExportable(self.temp_dir.name)
+
+        first = self._cache().exported_model(model)
+        second = self._cache().exported_model(model)
+
+        self.assertEqual(first, second)
+        self.assertTrue(first.startswith(self.cache_dir))
+        self.assertEqual(len(model.export_calls), 1)
+        self.assertEqual(model.export_calls[0]["imgsz"], 640)
+        self.assertFalse(os.path.exists(os.path.join(self.temp_dir.name, "model.onnx")))
+
+    def test_failed_export_move_raises(self):
+        """Errors other than a concurrent publish are not swallowed."""
+        model = _FakeExportable(self.temp_dir.name)
+        model.export = lambda **kwargs: os.path.join(self.temp_dir.name, "missing")
+
+        with self.assertRaises(OSError):
+            self._cache().exported_model(model)
+
+    def test_key_depends_on_classes_and_image_size(self):
+        path = self._cache().path
+        self.assertNotEqual(path, self._cache(classes=("dog",)).path)
+        self.assertNotEqual(path, self._cache(image_size=320).path)
+
+    def test_rejects_unknown_backend(self):
+        with self.assertRaises(ValueError):
+            LabelerExportCache(self.cache_dir, "ckpt", ["person"], 640, "tensorrt")
+
+    @patch("prompt2yolo.data.data_generation.image_labeler.load_vocabulary_model")
+    def test_cached_export_skips_loading_the_model(self, load_vocabulary_model):
+        """The cache key is computed from the checkpoint file, not the loaded model."""
+        checkpoint = os.path.join(self.temp_dir.name, "world.pt")
+        with open(checkpoint, "w") as file:
+            file.write("weights")
+        load_vocabulary_model.return_value = _FakeExportable(self.temp_dir.name)
+        config = YoloLabelerConfig(
+            yolo_model=checkpoint, backend="onnx", cache_dir=self.cache_dir
+        )
+        logger = logging.getLogger(__name__)
+
+        first = export_labeler_model(config, ["person"], logger)
+        second = export_labeler_model(config, ["person"], logger)
+
+        self.assertEqual(first, second)
+        load_vocabulary_model.assert_called_once()
+
+
+class TestSetRuntimeThreads(unittest.TestCase):
+    def setUp(self):
+        self.onnxruntime = Mock()
+        patcher = patch.dict(sys.modules, {"onnxruntime": self.onnxruntime})
+        patcher.start()
+        self.addCleanup(patcher.stop)
+        self.logger = logging.getLogger(__name__)
+
+    def _model(self, autobackend):
+        return SimpleNamespace(predictor=SimpleNamespace(model=autobackend))
+
+    def test_replaces_the_autobackend_session(self):
+        autobackend = SimpleNamespace(onnx=True, xml=False, session=None)
+
+        set_runtime_threads(
+            self._model(autobackend), "onnx", "model.onnx", 2, self.logger
+        )
+
+        self.assertIs(
+            autobackend.session, self.onnxruntime.InferenceSession.return_value
+        )
+        self.assertEqual(
+            self.onnxruntime.SessionOptions.return_value.intra_op_num_threads, 2
+        )
+
+    def test_replaces_the_session_of_a_nested_backend(self):
+        runtime = SimpleNamespace(session=None)
+
+        set_runtime_threads(
+            self._model(SimpleNamespace(backend=runtime)),
+            "onnx",
+            "model.onnx",
+            2,
+            self.logger,
+        )
+
+        self.assertIs(runtime.session, self.onnxruntime.InferenceSession.return_value)
+
+    def test_other_backends_are_left_untouched(self):
+        autobackend = SimpleNamespace(onnx=False, xml=True, session=None)
+
+        with self.assertLogs(self.logger, level="WARNING"):
+            set_runtime_threads(
+                self._model(autobackend), "onnx", "model.onnx", 2, self.logger
+            )
+
+        self.assertIsNone(autobackend.session)
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,48 @@
+import unittest
+
+from prompt2yolo.data.data_generation.image_generators.memory import (
+    MEMORY_MODES,
+    estimate_peak_memory,
+    select_memory_mode,
+)
+
+GIB = 2**30
+
+
+class TestMemoryModes(unittest.TestCase):
+    def setUp(self):
+        # Roughly SDXL in fp16: ~7 GiB of weights, ~5 GiB for the UNet alone
+        self.estimate_kwargs = dict(
+            weight_bytes=7 * GIB,
+            largest_component_bytes=5 * GIB,
+            image_size=(1024, 1024),
+            dtype_bytes=2,
+        )
+
+    def test_estimates_decrease_with_aggressiveness(self):
+        estimates = [
+            estimate_peak_memory(mode, **self.estimate_kwargs) for mode in MEMORY_MODES
+        ]
+        self.assertEqual(estimates, sorted(estimates, reverse=True))
+
+    def test_select_least_aggressive_mode_that_fits(self):
+        self.assertEqual(select_memory_mode(80 * GIB, **self.estimate_kwargs), "none")
+        self.assertEqual(
+            select_memory_mode(10 * GIB, **self.estimate_kwargs), "vae_tiling"
+        )
+        self.assertEqual(
+            select_memory_mode(8 * GIB, **self.estimate_kwargs), "model_cpu_offload"
+        )
+        self.assertEqual(
+            select_memory_mode(4 * GIB, **self.estimate_kwargs),
+            "sequential_cpu_offload",
+        )
+
+    def test_falls_back_to_most_aggressive_mode(self):
+        self.assertEqual(
+            select_memory_mode(0, **self.estimate_kwargs), "sequential_cpu_offload"
+        )
+
+
+if __name__ == "__main__":
+    unittest.main()
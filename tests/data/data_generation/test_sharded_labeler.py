@@ -0,0 +1,112 @@
+import os
+import tempfile
+import unittest
+from unittest.mock import patch
+
+from prompt2yolo.configs import YoloLabelerConfig
+from prompt2yolo.data.data_generation.sharded_labeler import ShardedYoloWorldLabeler
+
+SHARDED_LABELER = "prompt2yolo.data.data_generation.sharded_labeler"
+
+_fake_worker = {}
+
+
+def _fake_initialize_worker(custom_classes, config, model_path):
+    _fake_worker.update(device=config.device, model_path=model_path)
+
+
+def _fake_label_shard(image_paths, output_dir):
+    """Writes '<device> <model path>' as each image's label; fails on 'broken'."""
+    for image_path in image_paths:
+        if "broken" in image_path:
+            raise ValueError(f"cannot label {image_path}")
+        name = os.path.splitext(os.path.basename(image_path))[0]
+        with open(os.path.join(output_dir, f"{name}.txt"), "w") as file:
+            file.write(f"{_fake_worker['device']} {_fake_worker['model_path']}")
+    return len(image_paths), len(image_paths)
+
+
+class TestShardedYoloWorldLabeler(unittest.TestCase):
+    def test_requires_multiple_workers(self):
+        with self.assertRaises(ValueError):
+            ShardedYoloWorldLabeler(["person"], YoloLabelerConfig(num_workers=1))
+
+    @patch("os.cpu_count", return_value=64)
+    def test_workers_split_cores_and_devices(self, _):
+        labeler = ShardedYoloWorldLabeler(
+            ["person"], YoloLabelerConfig(num_workers=4, devices=["0", "1"])
+        )
+
+        configs = [labeler._worker_config(worker) for worker in range(4)]
+
+        self.assertEqual([c.num_threads for c in configs], [16] * 4)
+        self.assertEqual([c.device for c in configs], ["0", "1", "0", "1"])
+        self.assertTrue(all(c.num_workers == 1 for c in configs))
+
+    def test_explicit_threads_are_kept(self):
+        labeler = ShardedYoloWorldLabeler(
+            ["person"], YoloLabelerConfig(num_workers=2, num_threads=3, device="cpu")
+        )
+
+        config = labeler._worker_config(1)
+
+        self.assertEqual((config.num_threads, config.device), (3, "cpu"))
+
+
+@patch(f"{SHARDED_LABELER}._label_shard", _fake_label_shard)
+@patch(f"{SHARDED_LABELER}._initialize_worker", _fake_initialize_worker)
+class TestShardedLabeling(unittest.TestCase):
+    """Runs the real worker processes with fake model loading and labeling."""
+
+    def setUp(self):
+        self.temp_dir = tempfile.TemporaryDirectory()
+        self.image_dir = os.path.join(self.temp_dir.name, "images")
+        self.label_dir = os.path.join(self.temp_dir.name, "labels")
+        os.makedirs(self.image_dir)
+        self.labeler = ShardedYoloWorldLabeler(
+            ["person"],
+            YoloLabelerConfig(num_workers=2, devices=["0", "1"], backend="onnx"),
+        )
+
+    def tearDown(self):
+        self.temp_dir.cleanup()
+
+    def _add_images(self, *names):
+        for name in names:
+            open(os.path.join(self.image_dir, f"{name}.jpg"), "w").close()
+
+    def _label(self, name):
+        with open(os.path.join(self.label_dir, f"{name}.txt")) as file:
+            return file.read()
+
+    @patch(f"{SHARDED_LABELER}.export_labeler_model", return_value="model.onnx")
+    def test_shards_are_labeled_with_the_parent_export(self, export):
+        self._add_images("a", "b", "c", "d", "e")
+
+        self.labeler.label(self.image_dir, self.label_dir)
+
+        self.assertEqual(self.labeler._export_model(), "model.onnx")
+        export.assert_called_once()
+        self.assertEqual(len(os.listdir(self.label_dir)), 5)
+        # Interleaved shards: worker 0 (device '0') gets every other image
+        for name, device in zip("abcde", "01010"):
+            self.assertEqual(self._label(name), f"{device} model.onnx")
+
+    @patch(f"{SHARDED_LABELER}.export_labeler_model", return_value="model.onnx")
+    def test_worker_errors_propagate(self, _):
+        self._add_images("broken")
+
+        with self.assertRaisesRegex(ValueError, "cannot label"):
+            self.labeler.label(self.image_dir, self.label_dir)
+
+    def test_pytorch_backend_skips_the_export(self):
+        self.labeler.config.backend = "pytorch"
+        self._add_images("a")
+
+        self.labeler.label(self.image_dir, self.label_dir)
+
+        self.assertEqual(self._label("a"), "0 None")
+
+
+if __name__ == "__main__":
+    unittest.main()
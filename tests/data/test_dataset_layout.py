@@ -0,0 +1,59 @@
+import os
+import tempfile
+import unittest
+
+from prompt2yolo.data.dataset_layout import SHARD_MARKER, DatasetLayout, shard_prefix
+
+
+class TestDatasetLayout(unittest.TestCase):
+    def setUp(self):
+        self.temp_dir = tempfile.TemporaryDirectory()
+        self.root = os.path.join(self.temp_dir.name, "images")
+
+    def tearDown(self):
+        self.temp_dir.cleanup()
+
+    def _write(self, layout, names):
+        for name in names:
+            with open(layout.writable_path(name), "w") as file:
+                file.write(name)
+
+    def test_flat_layout(self):
+        layout = DatasetLayout(self.root, sharded=False).prepare()
+        self._write(layout, ["a_1.jpg", "a_2.png", "a_1.txt"])
+
+        self.assertEqual(layout.path("a_1.jpg"), os.path.join(self.root, "a_1.jpg"))
+        self.assertEqual(sorted(layout.names((".jpg", ".png"))), ["a_1.jpg", "a_2.png"])
+
+    def test_sharded_layout_is_detected_and_scanned(self):
+        layout = DatasetLayout(self.root, sharded=True).prepare()
+        self._write(layout, ["a_1.jpg", "a_2.jpg", "b_1.jpg"])
+
+        detected = DatasetLayout(self.root)
+        self.assertTrue(detected.sharded)
+        self.assertEqual(
+            detected.path("a_1.jpg"),
+            os.path.join(self.root, shard_prefix("a_1.jpg"), "a_1.jpg"),
+        )
+        self.assertTrue(detected.exists("b_1.jpg"))
+        self.assertEqual(sorted(detected.names()), ["a_1.jpg", "a_2.jpg", "b_1.jpg"])
+        self.assertNotIn(
+            SHARD_MARKER, os.listdir(os.path.dirname(layout.path("a_1.jpg")))
+        )
+
+    def test_image_and_label_share_prefix(self):
+        self.assertEqual(shard_prefix("a_1.jpg"), shard_prefix("a_1.txt"))
+        self.assertEqual(len(shard_prefix("a_1.jpg").split(os.sep)), 2)
+
+    def test_flat_prepare_removes_marker(self):
+        DatasetLayout(self.root, sharded=True).prepare()
+        DatasetLayout(self.root, sharded=False).prepare()
+
+        self.assertFalse(DatasetLayout(self.root).sharded)
+
+    def test_missing_folder_scans_empty(self):
+        self.assertEqual(list(DatasetLayout(self.root, sharded=True).scan()), [])
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,65 @@
+import os
+import tempfile
+import unittest
+
+from prompt2yolo.data.file_materializer import (
+    FileMaterializer,
+    copy_directory_files,
+    scan_directory,
+)
+
+
+class TestFileMaterializer(unittest.TestCase):
+    def setUp(self):
+        self.temp_dir = tempfile.TemporaryDirectory()
+        root = self.temp_dir.name
+        self.image_folder = os.path.join(root, "images")
+        self.label_folder = os.path.join(root, "labels")
+        os.makedirs(self.image_folder)
+        os.makedirs(self.label_folder)
+        for name in ["a_0.jpg", "b_0.png", "notes.txt"]:
+            with open(os.path.join(self.image_folder, name), "wb") as file:
+                file.write(b"x" * 10)
+        with open(os.path.join(self.label_folder, "a_0.txt"), "w") as file:
+            file.write("0 0.5 0.5 0.1 0.1\n")
+
+    def tearDown(self):
+        self.temp_dir.cleanup()
+
+    def test_scan_pairs_images_with_labels(self):
+        materializer = FileMaterializer(self.image_folder, self.label_folder)
+
+        self.assertEqual(set(materializer.images), {"a_0.jpg", "b_0.png"})
+        self.assertEqual(materializer.label_for("a_0.jpg"), "a_0.txt")
+        self.assertIsNone(materializer.label_for("b_0.png"))
+
+    def test_materialize_copies_to_each_destination(self):
+        materializer = FileMaterializer(self.image_folder, self.label_folder)
+        train = os.path.join(self.temp_dir.name, "yolo", "train")
+        val = os.path.join(self.temp_dir.name, "yolo", "val")
+
+        stats = materializer.materialize({train: ["a_0.jpg"], val: ["b_0.png"]})
+
+        self.assertEqual(sorted(os.listdir(os.path.join(train, "images"))), ["a_0.jpg"])
+        self.assertEqual(os.listdir(os.path.join(train, "labels")), ["a_0.txt"])
+        self.assertEqual(os.listdir(os.path.join(val, "images")), ["b_0.png"])
+        self.assertEqual(os.listdir(os.path.join(val, "labels")), [])
+        self.assertEqual(stats.files, 3)
+        self.assertEqual(stats.bytes, 10 + 18 + 10)
+
+    def test_copy_directory_files(self):
+        target = os.path.join(self.temp_dir.name, "copy")
+
+        stats = copy_directory_files(self.image_folder, target)
+
+        self.assertEqual(
+            set(scan_directory(target)), set(os.listdir(self.image_folder))
+        )
+        self.assertEqual(stats.files, 3)
+
+    def test_scan_missing_directory(self):
+        self.assertEqual(scan_directory(os.path.join(self.temp_dir.name, "none")), {})
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,66 @@
+import os
+import tempfile
+import unittest
+
+from prompt2yolo.data.image_store import ImageStore, split_list_path, split_source
+
+
+class TestImageStore(unittest.TestCase):
+    def setUp(self):
+        self.temp_dir = tempfile.TemporaryDirectory()
+        self.root = self.temp_dir.name
+        self.store = ImageStore(os.path.join(self.root, "store"))
+
+    def tearDown(self):
+        self.temp_dir.cleanup()
+
+    def _write(self, name, content):
+        path = os.path.join(self.root, name)
+        with open(path, "w") as file:
+            file.write(content)
+        return path
+
+    def test_identical_pairs_are_stored_once(self):
+        image = self._write("a_0.jpg", "pixels")
+        label = self._write("a_0.txt", "0 0.5 0.5 0.1 0.1\n")
+        copy = self._write("b_0.jpg", "pixels")
+        copy_label = self._write("b_0.txt", "0 0.5 0.5 0.1 0.1\n")
+
+        paths = self.store.add_all([(image, label), (copy, copy_label), (copy, None)])
+
+        self.assertEqual(paths[0], paths[1])
+        self.assertNotEqual(paths[0], paths[2])
+        self.assertEqual(len(os.listdir(self.store.image_dir)), 2)
+        self.assertEqual(
+            os.listdir(self.store.label_dir),
+            [os.path.basename(self.store.label_path(paths[0]))],
+        )
+
+    def test_link_uses_original_names(self):
+        store_path = self.store.add(
+            self._write("a_0.png", "pixels"), self._write("a_0.txt", "0 0 0 1 1\n")
+        )
+        destination = os.path.join(self.root, "test")
+        os.makedirs(os.path.join(destination, "images"))
+        os.makedirs(os.path.join(destination, "labels"))
+
+        self.store.link(store_path, destination, "a_0.png")
+        self.store.link(store_path, destination, "a_0.png")
+
+        link = os.path.join(destination, "labels", "a_0.txt")
+        self.assertEqual(os.readlink(link), self.store.label_path(store_path))
+
+    def test_split_source_prefers_list_file(self):
+        folder = os.path.join(self.root, "iteration_1")
+        self.assertEqual(
+            split_source(folder, "train"), os.path.join(folder, "train", "images")
+        )
+        os.makedirs(folder)
+        self._write(os.path.join("iteration_1", "train.txt"), "")
+        self.assertEqual(
+            split_source(folder, "train"), split_list_path(folder, "train")
+        )
+
+
+if __name__ == "__main__":
+    unittest.main()
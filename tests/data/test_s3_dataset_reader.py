@@ -0,0 +1,74 @@
+import os
+import unittest
+from unittest.mock import patch
+
+import cv2
+import numpy as np
+from moto import mock_aws
+
+from prompt2yolo.data.dataset_layout import shard_prefix
+from prompt2yolo.data.s3_dataset_reader import S3DatasetReader
+from prompt2yolo.utils.s3_clients import clear_s3_clients, get_s3_client
+from tests.utils.test_s3_handler import BUCKET, S3_ENV
+
+
+class TestS3DatasetReader(unittest.TestCase):
+    def setUp(self):
+        env = patch.dict(os.environ, S3_ENV)
+        env.start()
+        self.addCleanup(env.stop)
+        mock = mock_aws()
+        mock.start()
+        self.addCleanup(mock.stop)
+        clear_s3_clients()
+
+        self.client = get_s3_client()
+        self.client.create_bucket(Bucket=BUCKET)
+        _, png = cv2.imencode(".png", np.zeros((8, 16, 3), np.uint8))
+        for i in range(6):
+            # Sharded uploads keep their hashed prefixes
+            folder = shard_prefix(f"img_{i}") if i % 2 else ""
+            self._put(os.path.join("test/images", folder, f"img_{i}.png"), png)
+            if i != 5:
+                self._put(os.path.join("test/labels", folder, f"img_{i}.txt"), b"0")
+
+    def _put(self, key, body):
+        self.client.put_object(Bucket=BUCKET, Key=key, Body=bytes(body))
+
+    def test_pairs_and_decodes_samples(self):
+        samples = list(S3DatasetReader("test/images", "test/labels", prefetch=2))
+
+        self.assertEqual(
+            sorted(sample.name for sample in samples),
+            [f"img_{i}.png" for i in range(6)],
+        )
+        by_name = {sample.name: sample for sample in samples}
+        self.assertEqual(by_name["img_1.png"].image.shape, (8, 16, 3))
+        self.assertEqual(by_name["img_1.png"].label, b"0")
+        self.assertIsNone(by_name["img_5.png"].label)
+
+    def test_raw_bytes_and_early_stop(self):
+        reader = S3DatasetReader("test/images", decode=False, prefetch=2)
+        samples = iter(reader)
+        first = next(samples)
+        samples.close()
+
+        self.assertIsNone(first.image)
+        self.assertIsNone(first.label)
+        self.assertTrue(first.data.startswith(b"\x89PNG"))
+
+    def test_undecodable_images_are_skipped(self):
+        self._put("test/images/broken.jpg", b"not an image")
+        reader = S3DatasetReader("test/images", "test/labels")
+        with self.assertLogs(reader.logger, level="ERROR"):
+            names = [sample.name for sample in reader]
+        self.assertEqual(len(names), 6)
+        self.assertNotIn("broken.jpg", names)
+
+    def test_invalid_prefetch(self):
+        with self.assertRaises(ValueError):
+            S3DatasetReader("test/images", prefetch=0)
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -1,8 +1,15 @@
 import os
+import tempfile
 import unittest
 from unittest.mock import mock_open, patch
 
-from prompt2yolo.data.utils import save_visualized_image, write_label_file
+from prompt2yolo.data.utils import (
+    TRASH_FOLDER,
+    purge_trash,
+    reset_directory,
+    save_visualized_image,
+    write_label_file,
+)
 
 
 class TestWriteLabelFile(unittest.TestCase):
@@ -63,5 +70,39 @@ class TestSaveVisualizedImage(unittest.TestCase):
         )
 
 
+class TestResetDirectory(unittest.TestCase):
+    def setUp(self):
+        self.temp_dir = tempfile.TemporaryDirectory()
+        self.dir_path = os.path.join(self.temp_dir.name, "images")
+        self.trash_dir = os.path.join(self.temp_dir.name, TRASH_FOLDER)
+
+    def tearDown(self):
+        self.temp_dir.cleanup()
+
+    def test_reset_empties_directory_and_deletes_trash(self):
+        os.makedirs(os.path.join(self.dir_path, "nested"))
+        with open(os.path.join(self.dir_path, "a.jpg"), "w") as file:
+            file.write("a")
+
+        thread = reset_directory(self.dir_path)
+
+        self.assertEqual(os.listdir(self.dir_path), [])
+        thread.join()
+        self.assertEqual(os.listdir(self.trash_dir), [])
+
+    def test_missing_directory_is_created(self):
+        self.assertIsNone(reset_directory(self.dir_path))
+        self.assertTrue(os.path.isdir(self.dir_path))
+
+    def test_leftover_trash_is_purged(self):
+        leftover = os.path.join(self.trash_dir, "images-interrupted")
+        os.makedirs(os.path.join(leftover, "nested"))
+
+        for thread in purge_trash(self.temp_dir.name):
+            thread.join()
+
+        self.assertFalse(os.path.exists(leftover))
+
+
 if __name__ == "__main__":
     unittest.main()
@@ -1,6 +1,11 @@
+import os
+import tempfile
 import unittest
 from unittest.mock import patch
 
+import numpy as np
+
+from prompt2yolo.data.s3_dataset_reader import DatasetSample
 from prompt2yolo.evaluation.label_evaluator import LabelEvaluator
 from prompt2yolo.evaluation.prompt_weight_calculator import PromptWeightCalculator
 
@@ -24,11 +29,13 @@ class TestLabelEvaluator(unittest.TestCase):
             self.iou_threshold,
         )
 
-    @patch("os.listdir", return_value=[])
-    def test_process_all_images_no_images(self, mock_listdir):
+    @patch("prompt2yolo.data.dataset_layout.os.scandir", side_effect=FileNotFoundError)
+    def test_process_all_images_no_images(self, mock_scandir):
         """Test process_all_images with no images in the folder."""
-        self.evaluator.process_all_images()
-        mock_listdir.assert_called_once_with(self.images_folder)
+        with patch.object(self.evaluator, "process_single_image") as mock_process:
+            self.assertEqual(self.evaluator.process_all_images(), 0)
+        mock_scandir.assert_called_once_with(self.images_folder)
+        mock_process.assert_not_called()
 
     @patch("prompt2yolo.evaluation.label_evaluator.cv2.imread", return_value=None)
     def test_process_single_image_missing_image(self, mock_imread):
@@ -40,6 +47,28 @@ class TestLabelEvaluator(unittest.TestCase):
 
         mock_imread.assert_called_once_with("test_images/missing_image.jpg")
 
+    def test_process_all_images_from_samples(self):
+        """Test process_all_images with streamed samples and no local images."""
+        sample = DatasetSample(
+            name="a_cat_1.jpg",
+            data=b"encoded",
+            image=np.zeros((100, 200, 3), np.uint8),
+            label=b"0 0.5 0.5 0.2 0.2\n",
+        )
+        with tempfile.TemporaryDirectory() as result_path:
+            self.evaluator.result_path = result_path
+            self.assertEqual(self.evaluator.process_all_images([sample]), 1)
+
+            # Without detections the ground truth box is a false negative
+            saved_image = os.path.join(result_path, "false_negative/images/a_cat_1.jpg")
+            with open(saved_image, "rb") as f:
+                self.assertEqual(f.read(), b"encoded")
+            self.assertTrue(
+                os.path.exists(
+                    os.path.join(result_path, "false_negative/labels/a_cat_1.txt")
+                )
+            )
+
     def test_calculate_prompt_weights(self):
         """Test calculate_prompt_weights function."""
         with patch.object(
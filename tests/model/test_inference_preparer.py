@@ -0,0 +1,77 @@
+import os
+import tempfile
+import unittest
+
+import yaml
+
+from prompt2yolo.configs import Paths
+from prompt2yolo.data.data_generation.data_splitter import DataSplitter
+from prompt2yolo.data.dataset_layout import DatasetLayout
+from prompt2yolo.data.image_store import split_list_path
+from prompt2yolo.model.yolo_v5.inference_preparer import YoloV5Preparer
+
+
+class TestYoloV5Preparer(unittest.TestCase):
+    def setUp(self):
+        self.temp_dir = tempfile.TemporaryDirectory()
+        self.paths = Paths(local_data_path=self.temp_dir.name, iteration=1)
+        os.makedirs(self.paths.yolo_config_folder)
+        self._write_images(
+            self.paths.image_folder, self.paths.label_folder, "a_cat", 20
+        )
+
+    def tearDown(self):
+        self.temp_dir.cleanup()
+
+    @staticmethod
+    def _write_images(image_folder, label_folder, prefix, count):
+        os.makedirs(image_folder, exist_ok=True)
+        os.makedirs(label_folder, exist_ok=True)
+        for seed in range(count):
+            with open(os.path.join(image_folder, f"{prefix}_{seed}.jpg"), "w") as f:
+                f.write(f"{prefix}_{seed}")
+            with open(os.path.join(label_folder, f"{prefix}_{seed}.txt"), "w") as f:
+                f.write("0 0.5 0.5 0.1 0.1\n")
+
+    def _store_contents(self):
+        store_images = os.path.join(self.paths.image_store_folder, "images")
+        contents = {}
+        for name in os.listdir(store_images):
+            with open(os.path.join(store_images, name)) as f:
+                contents[name] = f.read()
+        return contents
+
+    def test_s3_test_data_replaces_a_virtual_test_split(self):
+        """After a virtual split, the YAML validates on the test set from S3."""
+        DataSplitter(self.paths, 0.2, 0.2, virtual=True).split()
+        test_list = split_list_path(self.paths.yolo_data_folder, "test")
+        self.assertTrue(os.path.exists(test_list))
+        store = self._store_contents()
+
+        # Test images downloaded from S3 into the local mirror of the test prefix
+        test_paths = Paths(local_data_path=self.temp_dir.name, mode="test", iteration=1)
+        self._write_images(
+            test_paths.s3_mirror_image_folder,
+            test_paths.s3_mirror_label_folder,
+            "a_dog",
+            5,
+        )
+        preparer = YoloV5Preparer(["cat"], test_paths, "test_data.yaml")
+        preparer.prepare_test_data()
+        preparer.create_yaml_files()
+
+        with open(os.path.join(self.paths.yolo_config_folder, "test_data.yaml")) as f:
+            data_config = yaml.safe_load(f)
+        test_images = os.path.join(self.paths.yolo_data_folder, "test", "images")
+        self.assertEqual(data_config["val"], test_images)
+        self.assertFalse(os.path.exists(test_list))
+        self.assertEqual(
+            sorted(DatasetLayout(test_images).names()),
+            sorted(f"a_dog_{seed}.jpg" for seed in range(5)),
+        )
+        # Files behind the old split's symlinks are left untouched
+        self.assertEqual(self._store_contents(), store)
+
+
+if __name__ == "__main__":
+    unittest.main()
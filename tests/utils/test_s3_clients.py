@@ -0,0 +1,69 @@
+import os
+import unittest
+from unittest.mock import patch
+
+import boto3
+from moto import mock_aws
+
+from prompt2yolo.utils.s3_clients import (
+    bucket_exists,
+    clear_s3_clients,
+    get_s3_client,
+    get_s3_resource,
+)
+from prompt2yolo.utils.s3_handler import S3Handler
+from tests.utils.test_s3_handler import BUCKET, S3_ENV
+
+
+class TestS3Clients(unittest.TestCase):
+    def setUp(self):
+        env = patch.dict(os.environ, S3_ENV)
+        env.start()
+        self.addCleanup(env.stop)
+        mock = mock_aws()
+        mock.start()
+        self.addCleanup(mock.stop)
+        clear_s3_clients()
+        self.addCleanup(clear_s3_clients)
+        boto3.client("s3").create_bucket(Bucket=BUCKET)
+
+    def test_clients_are_shared_per_configuration(self):
+        client = get_s3_client()
+        self.assertIs(get_s3_client(), client)
+        self.assertIs(get_s3_resource(), get_s3_resource())
+        with patch.dict(os.environ, {"AWS_ACCESS_KEY_ID": "other"}):
+            self.assertIsNot(get_s3_client(), client)
+
+    def test_pool_fits_the_largest_request(self):
+        client = get_s3_client(max_pool_connections=16)
+        self.assertIs(get_s3_client(), client)
+        self.assertIs(get_s3_client(max_pool_connections=4), client)
+
+        larger = get_s3_client(max_pool_connections=64)
+        self.assertIsNot(larger, client)
+        self.assertEqual(larger.meta.config.max_pool_connections, 64)
+        self.assertIs(get_s3_client(max_pool_connections=16), larger)
+
+    def test_bucket_check_is_memoized(self):
+        client = get_s3_client()
+        self.assertFalse(bucket_exists(client, "missing"))
+        with patch.object(
+            client, "head_bucket", wraps=client.head_bucket
+        ) as head_bucket:
+            self.assertTrue(bucket_exists(client, BUCKET))
+            self.assertTrue(bucket_exists(client, BUCKET))
+        head_bucket.assert_called_once()
+
+    def test_handlers_share_one_client(self):
+        images = S3Handler("data/images", "images")
+        labels = S3Handler("data/labels", "labels")
+        self.assertIs(images.s3_client, labels.s3_client)
+        # Callers without a pool size, like initialize_s3_client, share it too
+        self.assertIs(get_s3_client(os.getenv("AWS_S3_ENDPOINT")), images.s3_client)
+        with self.assertRaises(ValueError):
+            with patch.dict(os.environ, {"AWS_S3_BUCKET_NAME": "missing"}):
+                S3Handler("data/images", "images")
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,263 @@
+import os
+import tempfile
+import threading
+import unittest
+from unittest.mock import patch
+
+import boto3
+from moto import mock_aws
+
+from prompt2yolo.configs import Paths, S3TransferConfig
+from prompt2yolo.data.dataset_layout import DatasetLayout
+from prompt2yolo.utils.s3_clients import clear_s3_clients
+from prompt2yolo.utils.s3_handler import S3Handler
+
+BUCKET = "test-bucket"
+S3_ENV = {
+    "AWS_S3_ENDPOINT": "https://s3.amazonaws.com",
+    "AWS_DEFAULT_REGION": "us-east-1",
+    "AWS_S3_BUCKET_NAME": BUCKET,
+    "AWS_ACCESS_KEY_ID": "testing",
+    "AWS_SECRET_ACCESS_KEY": "testing",
+}
+
+
+class TestS3Handler(unittest.TestCase):
+    def setUp(self):
+        env = patch.dict(os.environ, S3_ENV)
+        env.start()
+        self.addCleanup(env.stop)
+        mock = mock_aws()
+        mock.start()
+        self.addCleanup(mock.stop)
+        clear_s3_clients()
+        self.temp_dir = tempfile.TemporaryDirectory()
+        self.addCleanup(self.temp_dir.cleanup)
+
+        client = boto3.client("s3", region_name="us-east-1")
+        client.create_bucket(Bucket=BUCKET)
+        for i in range(10):
+            client.put_object(Bucket=BUCKET, Key=f"iter/images/{i}.jpg", Body=b"x" * i)
+            client.put_object(Bucket=BUCKET, Key=f"iter/labels/{i}.txt", Body=b"0")
+        client.put_object(Bucket=BUCKET, Key="iter/labels/nested/a.txt", Body=b"0")
+
+    def _handler(self, s3_folder, **kwargs):
+        return S3Handler(
+            s3_folder,
+            self.temp_dir.name,
+            transfer_config=S3TransferConfig(max_concurrency=4),
+            **kwargs,
+        )
+
+    def test_transfer_config(self):
+        self.assertEqual(S3TransferConfig(max_concurrency=4).max_pool_connections, 4)
+        with self.assertRaises(ValueError):
+            S3TransferConfig(max_concurrency=0)
+
+    def test_listing(self):
+        handler = self._handler("iter")
+        self.assertEqual(len(handler.list_files_in_folder(suffixes=(".txt",))), 11)
+        self.assertEqual(
+            list(handler.iter_prefixes()), ["iter/images/", "iter/labels/"]
+        )
+
+    def test_download_files_by_extension(self):
+        DatasetLayout(self.temp_dir.name, sharded=True).prepare()
+        stats = self._handler("iter/images").download_files_by_extension([".jpg"])
+
+        self.assertEqual((stats.objects, stats.bytes, stats.errors), (10, 45, {}))
+        layout = DatasetLayout(self.temp_dir.name)
+        self.assertEqual(len(list(layout.names())), 10)
+        with open(layout.path("3.jpg"), "rb") as f:
+            self.assertEqual(f.read(), b"xxx")
+
+    def test_download_all_files_keeps_relative_paths(self):
+        stats = self._handler("iter/labels").download_all_files()
+
+        self.assertEqual(stats.objects, 11)
+        self.assertTrue(
+            os.path.exists(os.path.join(self.temp_dir.name, "nested", "a.txt"))
+        )
+
+    def test_failures_are_aggregated(self):
+        handler = self._handler("iter/images")
+        download_file = handler.s3_client.download_file
+
+        def flaky_download(bucket, key, *args, **kwargs):
+            if key.endswith("5.jpg"):
+                raise OSError("disk full")
+            return download_file(bucket, key, *args, **kwargs)
+
+        with patch.object(handler.s3_client, "download_file", flaky_download):
+            with self.assertLogs(handler.logger, level="ERROR") as logs:
+                stats = handler.download_files_by_extension([".jpg"])
+
+        self.assertEqual(stats.objects, 9)
+        self.assertEqual(stats.errors, {"iter/images/5.jpg": "disk full"})
+        self.assertEqual(len(logs.records), 1)
+
+    def test_sync_downloads_only_changes(self):
+        handler = self._handler("iter/images")
+        self.assertEqual(
+            handler.download_files_by_extension([".jpg"], sync=True).objects, 10
+        )
+        self.assertEqual(
+            handler.download_files_by_extension([".jpg"], sync=True).objects, 0
+        )
+
+        client = handler.s3_client
+        client.put_object(Bucket=BUCKET, Key="iter/images/1.jpg", Body=b"changed")
+        client.delete_object(Bucket=BUCKET, Key="iter/images/2.jpg")
+        os.remove(os.path.join(self.temp_dir.name, "3.jpg"))
+        stats = handler.download_files_by_extension(
+            [".jpg"], sync=True, delete_removed=True
+        )
+
+        self.assertEqual(stats.objects, 2)
+        with open(os.path.join(self.temp_dir.name, "1.jpg"), "rb") as f:
+            self.assertEqual(f.read(), b"changed")
+        self.assertFalse(os.path.exists(os.path.join(self.temp_dir.name, "2.jpg")))
+        self.assertEqual(len(list(DatasetLayout(self.temp_dir.name).names())), 9)
+
+    def test_sync_delete_removed_mirrors_the_listing(self):
+        """Files the sync state never recorded are deleted too, dotfiles aside."""
+        self._write("leftover.jpg", b"old run")
+        self._write(".sharded", b"")
+
+        stats = self._handler("iter/images").download_files_by_extension(
+            [".jpg"], sync=True, delete_removed=True
+        )
+
+        self.assertEqual(stats.objects, 10)
+        self.assertFalse(
+            os.path.exists(os.path.join(self.temp_dir.name, "leftover.jpg"))
+        )
+        self.assertTrue(os.path.exists(os.path.join(self.temp_dir.name, ".sharded")))
+
+    def test_syncs_of_two_prefixes_do_not_interfere(self):
+        """Train and test prefixes sync into their own mirrors and stay no-ops."""
+        client = boto3.client("s3")
+        handlers = []
+        for mode in ["train", "test"]:
+            paths = Paths(local_data_path=self.temp_dir.name, mode=mode)
+            for i in range(3):
+                client.put_object(
+                    Bucket=BUCKET, Key=f"{paths.s3_image_folder}/{mode}_{i}.jpg"
+                )
+            handlers.append(
+                S3Handler(paths.s3_image_folder, paths.s3_mirror_image_folder)
+            )
+
+        def sync(handler):
+            return handler.download_files_by_extension(
+                [".jpg"], sync=True, delete_removed=True
+            ).objects
+
+        self.assertEqual([sync(handler) for handler in handlers], [3, 3])
+        self.assertEqual([sync(handler) for handler in handlers], [0, 0])
+        for handler, mode in zip(handlers, ["train", "test"]):
+            self.assertEqual(
+                sorted(DatasetLayout(handler.local_dir).names()),
+                [f"{mode}_{i}.jpg" for i in range(3)],
+            )
+
+    def _write(self, relative_path, content):
+        path = os.path.join(self.temp_dir.name, relative_path)
+        os.makedirs(os.path.dirname(path), exist_ok=True)
+        with open(path, "wb") as f:
+            f.write(content)
+
+    def _keys(self, prefix):
+        response = boto3.client("s3").list_objects_v2(Bucket=BUCKET, Prefix=prefix)
+        return sorted(obj["Key"] for obj in response.get("Contents", []))
+
+    def test_upload_directory_with_includes(self):
+        self._write("results.png", b"png")
+        self._write("weights/best.pt", os.urandom(6 * 1024 * 1024))
+        self._write("notes.txt", b"skip me")
+        handler = S3Handler(
+            "runs/1",
+            self.temp_dir.name,
+            transfer_config=S3TransferConfig(
+                max_concurrency=4, multipart_threshold_mb=5, multipart_chunksize_mb=5
+            ),
+        )
+
+        stats = handler.upload_directory(includes=["*.png", "weights/*.pt"])
+
+        self.assertEqual((stats.objects, stats.errors), (2, {}))
+        self.assertEqual(
+            self._keys("runs/1"), ["runs/1/results.png", "runs/1/weights/best.pt"]
+        )
+        # The multipart ETag is reproduced locally, so nothing is uploaded again
+        stats = handler.upload_directory(
+            includes=["*.png", "weights/*.pt"], skip_unchanged=True
+        )
+        self.assertEqual(stats.objects, 0)
+
+    def test_upload_directory_skips_dotfiles(self):
+        self._write("a.jpg", b"a")
+        self._write(".sharded", b"")
+        self._write(".s3_sync.json", b"{}")
+        self._write(".trash/old.jpg", b"old")
+
+        stats = self._handler("data/images").upload_directory()
+
+        self.assertEqual(stats.objects, 1)
+        self.assertEqual(self._keys("data/images"), ["data/images/a.jpg"])
+
+    def test_directory_uploads_send_parts_serially(self):
+        """Concurrent file uploads do not open a part pool per file."""
+        self._write("weights/best.pt", os.urandom(11 * 1024 * 1024))
+        handler = S3Handler(
+            "runs/1",
+            self.temp_dir.name,
+            transfer_config=S3TransferConfig(
+                max_concurrency=4, multipart_threshold_mb=5, multipart_chunksize_mb=5
+            ),
+        )
+        upload_part = handler._upload_part
+        part_threads = []
+
+        def record_thread(*args):
+            part_threads.append(threading.get_ident())
+            return upload_part(*args)
+
+        with patch.object(handler, "_upload_part", side_effect=record_thread):
+            stats = handler.upload_directory()
+
+        self.assertEqual((stats.objects, stats.errors), (1, {}))
+        self.assertEqual(len(part_threads), 3)
+        self.assertEqual(len(set(part_threads)), 1)
+        # Single-file uploads still send parts concurrently
+        local_path = os.path.join(self.temp_dir.name, "weights", "best.pt")
+        self.assertTrue(handler.upload_file(local_path, "runs/2/best.pt"))
+
+    def test_upload_directory_skips_only_unchanged(self):
+        self._write("a.jpg", b"a")
+        self._write("b.jpg", b"b")
+        handler = self._handler("data/images")
+        handler.upload_directory()
+
+        self._write("b.jpg", b"changed")
+        stats = handler.upload_directory(skip_unchanged=True)
+
+        self.assertEqual(stats.objects, 1)
+        body = boto3.client("s3").get_object(Bucket=BUCKET, Key="data/images/b.jpg")
+        self.assertEqual(body["Body"].read(), b"changed")
+
+    def test_upload_file_verifies_etag(self):
+        self._write("model.pt", b"weights")
+        handler = self._handler("models")
+        local_path = os.path.join(self.temp_dir.name, "model.pt")
+
+        self.assertTrue(handler.upload_file(local_path, "models/model.pt"))
+        with patch.object(
+            handler.s3_client, "put_object", return_value={"ETag": '"0"'}
+        ):
+            with self.assertRaises(ValueError):
+                handler.upload_file(local_path, "models/model.pt")
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,69 @@
+import os
+import unittest
+from unittest.mock import patch
+
+from moto import mock_aws
+
+from prompt2yolo.utils.s3_clients import clear_s3_clients, get_s3_client
+from prompt2yolo.utils.s3_listing import (
+    clear_listing_memo,
+    iter_objects,
+    iter_prefixes,
+)
+from prompt2yolo.utils.utils import list_model_ids
+from tests.utils.test_s3_handler import BUCKET, S3_ENV
+
+
+class TestS3Listing(unittest.TestCase):
+    def setUp(self):
+        env = patch.dict(os.environ, S3_ENV)
+        env.start()
+        self.addCleanup(env.stop)
+        mock = mock_aws()
+        mock.start()
+        self.addCleanup(mock.stop)
+        clear_s3_clients()
+        clear_listing_memo()
+        self.addCleanup(clear_listing_memo)
+
+        self.client = get_s3_client()
+        self.client.create_bucket(Bucket=BUCKET)
+        prefix = "projects/p/models"
+        for model_id in range(3):
+            for name in ["weights/best.pt", "results.png"]:
+                self.client.put_object(
+                    Bucket=BUCKET, Key=f"{prefix}/{model_id}/{name}", Body=b"0"
+                )
+
+    def test_listing_is_paginated(self):
+        for i in range(1005):
+            self.client.put_object(Bucket=BUCKET, Key=f"many/{i}.txt", Body=b"")
+        keys = [obj["Key"] for obj in iter_objects(self.client, BUCKET, "many/")]
+        self.assertEqual(len(keys), 1005)
+
+    def test_suffix_filter_and_prefixes(self):
+        keys = [
+            obj["Key"]
+            for obj in iter_objects(self.client, BUCKET, "projects/", suffixes=(".pt",))
+        ]
+        self.assertEqual(len(keys), 3)
+        self.assertEqual(
+            list(iter_prefixes(self.client, BUCKET, "projects/p/models/")),
+            [f"projects/p/models/{i}/" for i in range(3)],
+        )
+        self.assertEqual(list_model_ids(self.client, BUCKET, "p"), ["0", "1", "2"])
+
+    def test_complete_listings_are_memoized(self):
+        with patch.object(
+            self.client, "get_paginator", wraps=self.client.get_paginator
+        ) as get_paginator:
+            first = list(iter_objects(self.client, BUCKET, "projects/", ttl=60))
+            second = list(iter_objects(self.client, BUCKET, "projects/", ttl=60))
+            list(iter_objects(self.client, BUCKET, "projects/"))
+
+        self.assertEqual(first, second)
+        self.assertEqual(get_paginator.call_count, 2)
+
+
+if __name__ == "__main__":
+    unittest.main()